@@ -1,25 +1,85 @@
+import json
+import time
+import asyncio
 import asyncpg
-from typing import Optional
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional, AsyncIterator
 
 from app.config import BaseConfig
-from app.utils import SingletonMeta
+from app.metrics import get_metrics
+from app.queries import get_query_registry
+from app.slow_queries import get_slow_query_log
+from app.utils import SingletonMeta, LRUCache
+
+
+current_session: ContextVar[Optional[tuple[int, int]]] = ContextVar("current_session", default=None)
 
 
 class Database(metaclass=SingletonMeta):
     def __init__(self):
         self._pool: Optional[asyncpg.Pool] = None
+        self._read_pools: list[asyncpg.Pool] = []
+        self._next_replica = 0
+        self._connect_lock = asyncio.Lock()
+        self.waiters = Counter()
+        self._replica_connections: set[int] = set()
+        self._after_commit: dict[int, list[Callable[[], None]]] = {}
+        self.recent_writers = LRUCache(
+            maxsize=int(BaseConfig.get("DB_REPLICA_STICKY_SESSIONS") or 10000),
+            ttl=float(BaseConfig.get("DB_REPLICA_STICKY_SECONDS") or 5)
+        )
 
     async def connect(self):
-        if not self._pool:
-            if BaseConfig.get("TESTING") == 1:
-                dsn = f"postgresql://{BaseConfig.get('DB_USER_TEST')}:{BaseConfig.get('DB_PASSWORD_TEST')}@{BaseConfig.get('DB_HOST_TEST')}:{BaseConfig.get('DB_PORT_TEST')}/{BaseConfig.get('DB_NAME_TEST')}"
+        if self._pool:
+            return
+
+        async with self._connect_lock:
+            if self._pool:
+                return
+
+            replica_hosts = [host.strip() for host in (BaseConfig.get("DB_REPLICA_HOSTS") or "").split(",") if host.strip()]
+            read_pools = []
+            for host in replica_hosts:
+                read_pools.append(await asyncpg.create_pool(
+                    dsn=self.build_dsn(host),
+                    **self.pool_options(server_settings={"default_transaction_read_only": "on"})
+                ))
+
+            self._read_pools = read_pools
+            self._pool = await asyncpg.create_pool(dsn=self.build_dsn(), **self.pool_options())
+
+    def build_dsn(self, host: Optional[str] = None) -> str:
+        if BaseConfig.get("TESTING") == 1:
+            return f"postgresql://{BaseConfig.get('DB_USER_TEST')}:{BaseConfig.get('DB_PASSWORD_TEST')}@{host or BaseConfig.get('DB_HOST_TEST')}:{BaseConfig.get('DB_PORT_TEST')}/{BaseConfig.get('DB_NAME_TEST')}"
+
+        return f"postgresql://{BaseConfig.get('DB_USER')}:{BaseConfig.get('DB_PASSWORD')}@{host or BaseConfig.get('DB_HOST')}:{BaseConfig.get('DB_PORT')}/{BaseConfig.get('DB_NAME')}"
 
-            else:
-                dsn = f"postgresql://{BaseConfig.get('DB_USER')}:{BaseConfig.get('DB_PASSWORD')}@{BaseConfig.get('DB_HOST')}:{BaseConfig.get('DB_PORT')}/{BaseConfig.get('DB_NAME')}"
+    def pool_options(self, server_settings: Optional[dict] = None) -> dict:
+        return {
+            "min_size": int(BaseConfig.get("DB_POOL_MIN_SIZE") or 10),
+            "max_size": int(BaseConfig.get("DB_POOL_MAX_SIZE") or 10),
+            "command_timeout": float(BaseConfig.get("DB_COMMAND_TIMEOUT") or 60),
+            "statement_cache_size": get_query_registry().statement_cache_size,
+            "max_inactive_connection_lifetime": float(BaseConfig.get("DB_POOL_MAX_INACTIVE_LIFETIME") or 300),
+            "server_settings": {"application_name": BaseConfig.get("DB_APPLICATION_NAME") or "book-management-system", **(server_settings or {})},
+            "init": self.init_connection
+        }
 
-            self._pool = await asyncpg.create_pool(dsn=dsn)
+    async def init_connection(self, conn: asyncpg.Connection):
+        for type_name in ("json", "jsonb"):
+            await conn.set_type_codec(type_name, encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+
+        await get_query_registry().prepare_all(conn)
+        conn.add_query_logger(get_metrics().observe_query)
+        conn.add_query_logger(get_slow_query_log().observe)
 
     async def disconnect(self):
+        for pool in self._read_pools:
+            await pool.close()
+        self._read_pools = []
+
         if self._pool:
             await self._pool.close()
             self._pool = None
@@ -28,8 +88,107 @@ class Database(metaclass=SingletonMeta):
         if not self._pool:
             raise RuntimeError("Database not initialized.")
         return self._pool
-    
-    
+
+    def get_write_pool(self) -> asyncpg.Pool:
+        self.mark_write()
+        return self.get_pool()
+
+    def mark_write(self) -> None:
+        session = current_session.get()
+        if session is not None and self._read_pools:
+            self.recent_writers.set(session[0], True)
+
+    def get_read_pool(self) -> asyncpg.Pool:
+        if not self._read_pools:
+            return self.get_pool()
+
+        session = current_session.get()
+        if session is None:
+            return self._read_pools[self.next_replica()]
+
+        user_id, replica = session
+        if self.recent_writers.get(user_id) is not None:
+            return self.get_pool()
+
+        return self._read_pools[replica % len(self._read_pools)]
+
+    @asynccontextmanager
+    async def acquire(self, conn: Optional[asyncpg.Connection] = None, read: bool = False, write: bool = False,
+                      pool: Optional[asyncpg.Pool] = None) -> AsyncIterator[asyncpg.Connection]:
+        if conn is not None:
+            if write:
+                self.mark_write()
+
+            yield conn
+            return
+
+        if not self._pool:
+            await self.connect()
+
+        pool = pool or (self.get_read_pool() if read else self.get_write_pool() if write else self.get_pool())
+        replica = pool is not self._pool
+        name = f"replica{self._read_pools.index(pool)}" if replica else "primary"
+        started_at = time.perf_counter()
+        self.waiters[name] += 1
+        try:
+            conn = await pool.acquire()
+
+        finally:
+            self.waiters[name] -= 1
+
+        get_metrics().observe_acquire(name, time.perf_counter() - started_at)
+        if replica:
+            self._replica_connections.add(id(conn))
+        try:
+            yield conn
+
+        finally:
+            self._replica_connections.discard(id(conn))
+            self.run_after_commit(conn)
+            await pool.release(conn)
+
+    @asynccontextmanager
+    async def transaction(self, conn: asyncpg.Connection) -> AsyncIterator[asyncpg.Connection]:
+        async with conn.transaction():
+            yield conn
+
+        if not conn.is_in_transaction():
+            self.run_after_commit(conn)
+
+    def after_commit(self, conn: asyncpg.Connection, callback: Callable[[], None]) -> None:
+        # Readers on other connections can refill a cache with the old rows until the transaction commits
+        callback()
+        if conn.is_in_transaction():
+            self._after_commit.setdefault(id(conn), []).append(callback)
+
+    def run_after_commit(self, conn: asyncpg.Connection) -> None:
+        for callback in self._after_commit.pop(id(conn), []):
+            callback()
+
+    def can_cache(self, conn: asyncpg.Connection) -> bool:
+        return not conn.is_in_transaction() and id(conn) not in self._replica_connections
+
+    def pool_stats(self) -> list[dict]:
+        pools = [("primary", self._pool)] + [(f"replica{i}", pool) for i, pool in enumerate(self._read_pools)]
+        return [
+            {
+                "pool": name,
+                "size": pool.get_size(),
+                "idle": pool.get_idle_size(),
+                "max_size": pool.get_max_size(),
+                "waiters": self.waiters[name]
+            }
+            for name, pool in pools if pool is not None
+        ]
+
+    def next_replica(self) -> int:
+        self._next_replica = (self._next_replica + 1) % max(len(self._read_pools), 1)
+        return self._next_replica
+
+    def begin_session(self, user_id: int) -> None:
+        current_session.set((user_id, self.next_replica()))
+
+
 _db_instance: Optional[Database] = None
 
 def get_database() -> Database:
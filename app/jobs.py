@@ -0,0 +1,32 @@
+import json
+import asyncio
+import argparse
+
+from app.database import get_database
+from app.services import recommendation_service
+
+
+async def rebuild_recommendations(full: bool) -> dict:
+    db = get_database()
+    await db.connect()
+
+    try:
+        return await recommendation_service.rebuild(full=full)
+
+    finally:
+        await db.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline jobs")
+    jobs = parser.add_subparsers(dest="job", required=True)
+    recommendations = jobs.add_parser("recommendations", help="Rebuild the precomputed top-K similar books")
+    recommendations.add_argument("--full", action="store_true", help="Recompute every book instead of only books touched by new activity")
+    args = parser.parse_args()
+
+    if args.job == "recommendations":
+        print(json.dumps(asyncio.run(rebuild_recommendations(args.full)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,4 +1,7 @@
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-limiter = Limiter(key_func=get_remote_address)
\ No newline at end of file
+from app.config import BaseConfig
+
+
+limiter = Limiter(key_func=get_remote_address, enabled=(BaseConfig.get("RATE_LIMIT_ENABLED") or "true").lower() in ("1", "true"))
\ No newline at end of file
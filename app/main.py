@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from slowapi import _rate_limit_exceeded_handler
@@ -5,29 +6,48 @@ from slowapi.errors import RateLimitExceeded
 from mangum import Mangum
 
 
+from app import BaseConfig
 from app.database import get_database
 from app.limiter import limiter
-from app.routes import auth, author, books, genre, admin
+from app.middleware import MetricsMiddleware
+from app.routes import auth, author, books, genre, recommendations, admin, metrics
+from app.services import activity_service, import_service
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     db = get_database()
     await db.connect()
+    await import_service.resume_jobs()
     yield
+    await import_service.shutdown()
+    await activity_service.shutdown()
     await db.disconnect()
     
 
 app = FastAPI(lifespan=lifespan)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+app.add_middleware(MetricsMiddleware)
 
 
 app.include_router(auth.router)
 app.include_router(author.router)
 app.include_router(books.router)
 app.include_router(genre.router)
+app.include_router(recommendations.router)
 app.include_router(admin.router)
+app.include_router(metrics.router)
 
 
-handler = Mangum(app)
\ No newline at end of file
+lazy_startup = (BaseConfig.get("LAZY_STARTUP") or "").lower() in ("1", "true")
+asgi_handler = Mangum(app, lifespan="off" if lazy_startup else "auto")
+
+
+def handler(event, context):
+    try:
+        return asgi_handler(event, context)
+
+    finally:
+        if activity_service.pending:
+            asyncio.get_event_loop().run_until_complete(activity_service.flush())
\ No newline at end of file
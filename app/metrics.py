@@ -0,0 +1,103 @@
+from collections import Counter
+from typing import Optional
+
+from app.queries import get_query_registry
+from app.utils import SingletonMeta, Histogram
+
+
+class Metrics(metaclass=SingletonMeta):
+    def __init__(self):
+        self.buckets = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+        self.in_flight = 0
+        self.requests: dict[tuple[str, str], Histogram] = {}
+        self.responses = Counter()
+        self.queries: dict[str, Histogram] = {}
+        self.query_errors = Counter()
+        self.acquires: dict[str, Histogram] = {}
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        histogram = self.requests.get((method, route))
+        if histogram is None:
+            histogram = self.requests[(method, route)] = Histogram(self.buckets)
+
+        histogram.observe(seconds)
+        self.responses[(method, route, status)] += 1
+
+    def observe_query(self, record) -> None:
+        name = get_query_registry().name_of(record.query)
+        histogram = self.queries.get(name)
+        if histogram is None:
+            histogram = self.queries[name] = Histogram(self.buckets)
+
+        histogram.observe(record.elapsed)
+        if record.exception is not None:
+            self.query_errors[name] += 1
+
+    def observe_acquire(self, pool: str, seconds: float) -> None:
+        histogram = self.acquires.get(pool)
+        if histogram is None:
+            histogram = self.acquires[pool] = Histogram(self.buckets)
+
+        histogram.observe(seconds)
+
+    def render(self, pools: list[dict]) -> str:
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, labels: str, value: Histogram) -> None:
+            for bound, count in value.cumulative():
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {value.sum}")
+            lines.append(f"{name}_count{{{labels}}} {value.count}")
+
+        metric("http_requests_in_flight", "gauge", "Requests currently being handled")
+        lines.append(f"http_requests_in_flight {self.in_flight}")
+
+        metric("http_requests_total", "counter", "Responses by route and status")
+        for (method, route, status), count in sorted(self.responses.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+
+        metric("http_request_duration_seconds", "histogram", "Request latency by route")
+        for (method, route), value in sorted(self.requests.items()):
+            histogram("http_request_duration_seconds", f'method="{method}",route="{route}"', value)
+
+        registry = get_query_registry()
+        metric("db_query_duration_seconds", "histogram", "Query latency by statement")
+        for name, value in sorted(self.queries.items()):
+            histogram("db_query_duration_seconds", f'statement="{name}"', value)
+
+        metric("db_query_errors_total", "counter", "Failed queries by statement")
+        for name, count in sorted(self.query_errors.items()):
+            lines.append(f'db_query_errors_total{{statement="{name}"}} {count}')
+
+        metric("db_query_rows_total", "counter", "Rows returned by registered statements")
+        for name, count in sorted(registry.rows.items()):
+            lines.append(f'db_query_rows_total{{statement="{name}"}} {count}')
+
+        metric("db_pool_acquire_seconds", "histogram", "Time spent waiting for a pooled connection")
+        for pool, value in sorted(self.acquires.items()):
+            histogram("db_pool_acquire_seconds", f'pool="{pool}"', value)
+
+        for key, kind, help_text in (
+            ("size", "gauge", "Open connections"),
+            ("idle", "gauge", "Idle connections"),
+            ("max_size", "gauge", "Maximum connections"),
+            ("waiters", "gauge", "Requests waiting for a connection")
+        ):
+            metric(f"db_pool_{key}", kind, help_text)
+            for pool in pools:
+                lines.append(f'db_pool_{key}{{pool="{pool["pool"]}"}} {pool[key]}')
+
+        return "\n".join(lines) + "\n"
+
+
+_metrics_instance: Optional[Metrics] = None
+
+def get_metrics() -> Metrics:
+    global _metrics_instance
+    if _metrics_instance is None:
+        _metrics_instance = Metrics()
+    return _metrics_instance
\ No newline at end of file
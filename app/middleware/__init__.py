@@ -1,4 +1,6 @@
 from .auth_required import middleware_get_current_user
 from .admin_perm import middleware_get_current_admin_user
+from .connection import middleware_get_connection
+from .metrics import MetricsMiddleware
 
-__all__ = ["middleware_get_current_user", "middleware_get_current_admin_user"]
\ No newline at end of file
+__all__ = ["middleware_get_current_user", "middleware_get_current_admin_user", "middleware_get_connection", "MetricsMiddleware"]
\ No newline at end of file
@@ -1,7 +1,8 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 
-from app.services import AuthService
+from app.database import get_database
+from app.services import auth_service
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
@@ -14,12 +15,13 @@ async def middleware_get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    payload = AuthService.decode_access_token(token)
+    payload = auth_service.decode_access_token(token)
     user_id: int = payload.get("id")
     username: str = payload.get("sub")
     is_admin: bool = payload.get("is_admin", False)
 
     if user_id is None or username is None:
         raise credentials_exception
-    
+
+    get_database().begin_session(user_id)
     return {"id": user_id, "username": username, "is_admin": is_admin}
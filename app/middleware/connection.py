@@ -0,0 +1,10 @@
+from typing import AsyncIterator
+
+import asyncpg
+
+from app.database import get_database
+
+
+async def middleware_get_connection() -> AsyncIterator[asyncpg.Connection]:
+    async with get_database().acquire() as conn:
+        yield conn
\ No newline at end of file
@@ -0,0 +1,33 @@
+import time
+
+from app.metrics import get_metrics
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        metrics = get_metrics()
+        status = 500
+        started_at = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+
+        finally:
+            metrics.in_flight -= 1
+            route = scope.get("route")
+            metrics.observe_request(
+                scope["method"], getattr(route, "path", "unmatched"), status, time.perf_counter() - started_at
+            )
\ No newline at end of file
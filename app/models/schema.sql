@@ -1,3 +1,6 @@
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+
 CREATE TABLE users(
     id SERIAL PRIMARY KEY,
     username VARCHAR(50) NOT NULL UNIQUE,
@@ -26,6 +29,8 @@ CREATE TABLE books(
     genre_id INTEGER REFERENCES genres(id) ON DELETE SET NULL,
     published_year INTEGER CHECK(published_year >= 1800 AND published_year <= EXTRACT(YEAR FROM CURRENT_DATE)),
     created_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    first_author_name VARCHAR(60) NOT NULL DEFAULT '',
+    search_vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', title)) STORED,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -37,6 +42,62 @@ CREATE TABLE book_authors(
 );
 
 
+CREATE TABLE import_jobs(
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+    author_id INTEGER REFERENCES authors(id) ON DELETE CASCADE,
+    filename VARCHAR(255) NOT NULL,
+    file_path TEXT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    rows_done INTEGER NOT NULL DEFAULT 0,
+    rows_failed INTEGER NOT NULL DEFAULT 0,
+    bytes_done BIGINT NOT NULL DEFAULT 0,
+    bytes_total BIGINT NOT NULL DEFAULT 0,
+    errors JSONB NOT NULL DEFAULT '[]',
+    error TEXT,
+    heartbeat_at TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+
+CREATE TABLE user_activity(
+    id BIGSERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    book_id INTEGER NOT NULL REFERENCES books(id) ON DELETE CASCADE,
+    action VARCHAR(20) NOT NULL CHECK(action IN ('view', 'open', 'favorite', 'export')),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE book_recommendations(
+    book_id INTEGER REFERENCES books(id) ON DELETE CASCADE,
+    similar_book_id INTEGER NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (book_id, similar_book_id)
+);
+
+
+CREATE TABLE table_versions(
+    name VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+
+CREATE INDEX idx_books_title_id ON books (title, id);
+CREATE INDEX idx_books_published_year_id ON books ((COALESCE(published_year, 0)), id);
+CREATE INDEX idx_books_first_author_name_id ON books (first_author_name, id);
+CREATE INDEX idx_book_authors_author_id_book_id ON book_authors (author_id, book_id);
+CREATE INDEX idx_books_search_vector ON books USING GIN (search_vector);
+CREATE INDEX idx_books_title_trgm ON books USING GIN (title gin_trgm_ops);
+CREATE INDEX idx_authors_name_trgm ON authors USING GIN (name gin_trgm_ops);
+CREATE INDEX idx_user_activity_user_id_id ON user_activity (user_id, id DESC);
+CREATE INDEX idx_user_activity_book_id ON user_activity (book_id);
+CREATE INDEX idx_import_jobs_status ON import_jobs (status) WHERE status IN ('queued', 'running');
+
+
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
 BEGIN
@@ -46,6 +107,67 @@ END;
 $$ LANGUAGE plpgsql;
 
 
+CREATE OR REPLACE FUNCTION bump_catalog_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- One row per backend pid shard, so concurrent writers rarely wait on the same row
+    INSERT INTO table_versions (name, version, updated_at)
+    VALUES ('catalog:' || pg_backend_pid() % 16, 1, clock_timestamp())
+    ON CONFLICT (name) DO UPDATE
+    SET version = table_versions.version + 1,
+        updated_at = GREATEST(table_versions.updated_at, EXCLUDED.updated_at);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE OR REPLACE FUNCTION refresh_first_author_name(book_ids INTEGER[])
+RETURNS VOID AS $$
+BEGIN
+    UPDATE books b
+    SET first_author_name = f.name
+    FROM (
+        SELECT ids.id, COALESCE(min(a.name), '') AS name
+        FROM unnest(book_ids) AS ids(id)
+        LEFT JOIN book_authors ba ON ba.book_id = ids.id
+        LEFT JOIN authors a ON a.id = ba.author_id
+        GROUP BY ids.id
+    ) f
+    WHERE b.id = f.id;
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE OR REPLACE FUNCTION sync_first_author_name_links()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_first_author_name(ARRAY(SELECT DISTINCT book_id FROM new_links));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM refresh_first_author_name(ARRAY(SELECT DISTINCT book_id FROM old_links));
+    ELSE
+        PERFORM refresh_first_author_name(ARRAY(SELECT book_id FROM old_links UNION SELECT book_id FROM new_links));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE OR REPLACE FUNCTION sync_first_author_name_authors()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_first_author_name(ARRAY(
+        SELECT DISTINCT ba.book_id
+        FROM new_authors n
+        JOIN old_authors o ON o.id = n.id
+        JOIN book_authors ba ON ba.author_id = n.id
+        WHERE (n.name, n.user_id) IS DISTINCT FROM (o.name, o.user_id)
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
 CREATE TRIGGER set_updated_at_users
 BEFORE UPDATE ON users
 FOR EACH ROW
@@ -59,4 +181,50 @@ EXECUTE FUNCTION update_updated_at_column();
 CREATE TRIGGER set_updated_at_books
 BEFORE UPDATE ON books
 FOR EACH ROW
-EXECUTE FUNCTION update_updated_at_column();
\ No newline at end of file
+EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER set_updated_at_import_jobs
+BEFORE UPDATE ON import_jobs
+FOR EACH ROW
+EXECUTE FUNCTION update_updated_at_column();
+
+
+CREATE TRIGGER bump_version_books
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON books
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_catalog_version();
+
+CREATE TRIGGER bump_version_book_authors
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON book_authors
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_catalog_version();
+
+CREATE TRIGGER bump_version_authors
+AFTER UPDATE OR DELETE OR TRUNCATE ON authors
+FOR EACH STATEMENT
+EXECUTE FUNCTION bump_catalog_version();
+
+
+CREATE TRIGGER sync_first_author_name_insert
+AFTER INSERT ON book_authors
+REFERENCING NEW TABLE AS new_links
+FOR EACH STATEMENT
+EXECUTE FUNCTION sync_first_author_name_links();
+
+CREATE TRIGGER sync_first_author_name_update
+AFTER UPDATE ON book_authors
+REFERENCING OLD TABLE AS old_links NEW TABLE AS new_links
+FOR EACH STATEMENT
+EXECUTE FUNCTION sync_first_author_name_links();
+
+CREATE TRIGGER sync_first_author_name_delete
+AFTER DELETE ON book_authors
+REFERENCING OLD TABLE AS old_links
+FOR EACH STATEMENT
+EXECUTE FUNCTION sync_first_author_name_links();
+
+CREATE TRIGGER sync_first_author_name_authors
+AFTER UPDATE ON authors
+REFERENCING OLD TABLE AS old_authors NEW TABLE AS new_authors
+FOR EACH STATEMENT
+EXECUTE FUNCTION sync_first_author_name_authors();
\ No newline at end of file
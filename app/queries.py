@@ -0,0 +1,98 @@
+import re
+from collections import Counter
+from typing import Any, Optional
+
+import asyncpg
+
+from app.config import BaseConfig
+from app.utils import SingletonMeta
+
+
+class QueryRegistry(metaclass=SingletonMeta):
+    def __init__(self):
+        self.queries: dict[str, str] = {}
+        self.names: dict[str, str] = {}
+        self.hot: set[str] = set()
+        self.prepare_statements = (BaseConfig.get("DB_PGBOUNCER") or "").lower() not in ("1", "true")
+        self.statement_cache_size = int(BaseConfig.get("DB_STATEMENT_CACHE_SIZE") or 100) if self.prepare_statements else 0
+        self.max_shapes = int(BaseConfig.get("QUERY_MAX_SHAPES") or 1000)
+        self.executions = Counter()
+        self.rows = Counter()
+        self.prepares = Counter()
+
+    def register(self, name: str, sql: str, hot: bool = True) -> None:
+        self.queries[name] = sql
+        self.names[sql] = name
+        if hot:
+            self.hot.add(name)
+
+    async def prepare_all(self, conn: asyncpg.Connection) -> None:
+        if not self.prepare_statements:
+            return
+
+        # Parsing takes relation locks that are only released when the transaction ends
+        async with conn.transaction():
+            for name in self.hot:
+                try:
+                    async with conn.transaction():
+                        # An empty executemany parses into the statement cache without running anything
+                        await conn.executemany(self.queries[name], [])
+
+                except asyncpg.PostgresError:
+                    continue
+
+                self.prepares[name] += 1
+
+    async def run(self, conn: asyncpg.Connection, method: str, name: str, args: tuple, sql: Optional[str] = None) -> Any:
+        if name not in self.queries and sql is not None and len(self.queries) < self.max_shapes:
+            self.queries[name] = sql
+            self.names[sql] = name
+
+        self.executions[name] += 1
+        result = await getattr(conn, method)(sql or self.queries[name], *args)
+        self.rows[name] += len(result) if method == "fetch" else int(result is not None)
+        return result
+
+    async def fetch(self, conn: asyncpg.Connection, name: str, *args, sql: Optional[str] = None) -> list[asyncpg.Record]:
+        return await self.run(conn, "fetch", name, args, sql)
+
+    async def fetchrow(self, conn: asyncpg.Connection, name: str, *args, sql: Optional[str] = None) -> Optional[asyncpg.Record]:
+        return await self.run(conn, "fetchrow", name, args, sql)
+
+    async def fetchval(self, conn: asyncpg.Connection, name: str, *args, sql: Optional[str] = None) -> Any:
+        return await self.run(conn, "fetchval", name, args, sql)
+
+    def name_of(self, sql: str) -> str:
+        if sql in self.names:
+            return self.names[sql]
+
+        verb = sql.split(None, 1)[0].lower() if sql.strip() else "unknown"
+        tables = re.findall(r"\b(?:FROM|INTO|UPDATE)\s+([\w.]+)", sql, re.IGNORECASE)
+        return ":".join([verb] + tables[:1])
+
+    def stats(self) -> dict:
+        statements = {}
+        for name in sorted(set(self.executions) | self.hot):
+            statements[name] = {
+                "executions": self.executions[name],
+                "rows": self.rows[name],
+                "prepares": self.prepares[name],
+                "hot": name in self.hot
+            }
+
+        return {
+            "prepare_statements": self.prepare_statements,
+            "statement_cache_size": self.statement_cache_size,
+            "max_shapes": self.max_shapes,
+            "shapes": len(self.queries),
+            "statements": statements
+        }
+
+
+_registry_instance: Optional[QueryRegistry] = None
+
+def get_query_registry() -> QueryRegistry:
+    global _registry_instance
+    if _registry_instance is None:
+        _registry_instance = QueryRegistry()
+    return _registry_instance
\ No newline at end of file
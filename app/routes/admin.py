@@ -6,10 +6,14 @@ from app.schemas import (
     AdminAuthorCreateRequest, AdminAuthorUpdateRequest,
     AdminGenreCreateRequest, AdminGenreUpdateRequest,
     AdminBookCreateRequest, AdminBookUpdateRequest,
+    AdminBookBulkRequest, AdminBookBulkGenreRequest, AdminBookBulkCreatorRequest, AdminBookBulkResponse,
+    RecommendationRebuildResponse,
     AuthorReadResponse, GenreReadResponse, BookReadResponse,
     UserReadResponse
 )
-from app.services import author_service, book_service, genre_service
+from app.queries import get_query_registry
+from app.slow_queries import get_slow_query_log
+from app.services import activity_service, auth_service, author_service, book_service, genre_service, recommendation_service
 
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
@@ -154,4 +158,129 @@ async def delete_book(request: Request, book_id: int,
         return {"success": True}
 
     except Exception:
-        raise HTTPException(status_code=400, detail="Book deletion failed")
\ No newline at end of file
+        raise HTTPException(status_code=400, detail="Book deletion failed")
+
+
+@router.post("/books/bulk/delete", response_model=AdminBookBulkResponse)
+@limiter.limit("5/minute")
+async def bulk_delete_books(request: Request, selection: AdminBookBulkRequest,
+                            current_user: UserReadResponse = Depends(middleware_get_current_admin_user)):
+    try:
+        book_ids = await book_service.bulk_delete_books(
+            book_ids=selection.ids,
+            title=selection.title,
+            author_name=selection.author_name,
+            genre_id=selection.genre_id,
+            year_from=selection.year_from,
+            year_to=selection.year_to,
+            dry_run=selection.dry_run
+        )
+        return {"affected": len(book_ids), "dry_run": selection.dry_run, "book_ids": book_ids}
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except Exception:
+        raise HTTPException(status_code=400, detail="Bulk book deletion failed")
+
+
+@router.post("/books/bulk/genre", response_model=AdminBookBulkResponse)
+@limiter.limit("5/minute")
+async def bulk_update_genre(request: Request, selection: AdminBookBulkGenreRequest,
+                            current_user: UserReadResponse = Depends(middleware_get_current_admin_user)):
+    try:
+        book_ids = await book_service.bulk_update_genre(
+            new_genre_id=selection.new_genre_id,
+            book_ids=selection.ids,
+            title=selection.title,
+            author_name=selection.author_name,
+            genre_id=selection.genre_id,
+            year_from=selection.year_from,
+            year_to=selection.year_to,
+            dry_run=selection.dry_run
+        )
+        return {"affected": len(book_ids), "dry_run": selection.dry_run, "book_ids": book_ids}
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except Exception:
+        raise HTTPException(status_code=400, detail="Bulk genre update failed")
+
+
+@router.post("/books/bulk/created-by", response_model=AdminBookBulkResponse)
+@limiter.limit("5/minute")
+async def bulk_set_created_by(request: Request, selection: AdminBookBulkCreatorRequest,
+                              current_user: UserReadResponse = Depends(middleware_get_current_admin_user)):
+    try:
+        book_ids = await book_service.bulk_set_created_by(
+            created_by=selection.created_by,
+            book_ids=selection.ids,
+            title=selection.title,
+            author_name=selection.author_name,
+            genre_id=selection.genre_id,
+            year_from=selection.year_from,
+            year_to=selection.year_to,
+            dry_run=selection.dry_run
+        )
+        return {"affected": len(book_ids), "dry_run": selection.dry_run, "book_ids": book_ids}
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except Exception:
+        raise HTTPException(status_code=400, detail="Bulk created_by update failed")
+
+
+@router.get("/cache")
+@limiter.limit("5/minute")
+async def get_cache_stats(request: Request, current_user: UserReadResponse = Depends(middleware_get_current_admin_user)):
+    return {
+        "books": book_service.book_cache.stats(),
+        "book_counts": book_service.count_cache.stats(),
+        "authors": author_service.author_cache.stats(),
+        "genres": genre_service.genre_cache.stats(),
+        "auth_tokens": auth_service.token_cache.stats()
+    }
+
+
+@router.get("/password-hash")
+@limiter.limit("5/minute")
+async def get_password_hash_stats(request: Request, current_user: UserReadResponse = Depends(middleware_get_current_admin_user)):
+    return auth_service.password_executor.stats()
+
+
+@router.get("/activity")
+@limiter.limit("5/minute")
+async def get_activity_stats(request: Request, current_user: UserReadResponse = Depends(middleware_get_current_admin_user)):
+    return activity_service.stats()
+
+
+@router.get("/queries")
+@limiter.limit("5/minute")
+async def get_query_stats(request: Request, current_user: UserReadResponse = Depends(middleware_get_current_admin_user)):
+    return get_query_registry().stats()
+
+
+@router.get("/slow-queries")
+@limiter.limit("5/minute")
+async def get_slow_queries(request: Request, current_user: UserReadResponse = Depends(middleware_get_current_admin_user)):
+    return get_slow_query_log().stats()
+
+
+@router.delete("/slow-queries")
+@limiter.limit("5/minute")
+async def clear_slow_queries(request: Request, current_user: UserReadResponse = Depends(middleware_get_current_admin_user)):
+    get_slow_query_log().clear()
+    return {"success": True}
+
+
+@router.post("/recommendations/rebuild", response_model=RecommendationRebuildResponse)
+@limiter.limit("5/minute")
+async def rebuild_recommendations(request: Request, full: bool = False,
+                                  current_user: UserReadResponse = Depends(middleware_get_current_admin_user)):
+    try:
+        return await recommendation_service.rebuild(full=full)
+
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
\ No newline at end of file
@@ -4,6 +4,7 @@ from app.limiter import limiter
 from app.schemas import UserCreateRequest, UserLoginRequest, TokenResponse, UserReadResponse
 from app.services import auth_service
 from app.middleware import middleware_get_current_user
+from app.utils import ExecutorFull
 
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
@@ -15,6 +16,9 @@ async def register(request: Request, user: UserCreateRequest):
     try:
         created_user = await auth_service.create_user(user.username, user.password_1)
         return created_user
+
+    except ExecutorFull:
+        raise HTTPException(status_code=503, detail="Too many concurrent requests, try again later")
     
     except Exception:
         raise HTTPException(status_code=400, detail="User with this username already exists")
@@ -23,7 +27,12 @@ async def register(request: Request, user: UserCreateRequest):
 @router.post("/login", response_model=TokenResponse)
 @limiter.limit("5/minute")
 async def login(request: Request, user: UserLoginRequest):
-    auth_user = await auth_service.authenticate_user(user.username, user.password)
+    try:
+        auth_user = await auth_service.authenticate_user(user.username, user.password)
+
+    except ExecutorFull:
+        raise HTTPException(status_code=503, detail="Too many concurrent requests, try again later")
+
     if not auth_user:
         raise HTTPException(status_code=401, detail="Invalid username or password")
 
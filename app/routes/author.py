@@ -1,9 +1,10 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 
 from app.limiter import limiter
 from app.middleware import middleware_get_current_user
-from app.schemas import AuthorCreateUpdateRequest, AuthorReadResponse
-from app.services import author_service
+from app.schemas import AuthorCreateUpdateRequest, AuthorReadResponse, AuthorBookListResponse
+from app.services import author_service, book_service
 
 
 router = APIRouter(prefix="/author", tags=["Author"])
@@ -38,6 +39,31 @@ async def get_author(request: Request, author_id: int, current_user: dict = Depe
     return author_service.generate_response(author)
 
 
+@router.get("/{author_id}/books", response_model=AuthorBookListResponse)
+@limiter.limit("5/minute")
+async def list_author_books(
+    request: Request,
+    author_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    sort_by: str = Query("year", pattern="^(id|title|year)$"),
+    sort_order: str = Query("asc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = Query(None),
+    current_user: dict = Depends(middleware_get_current_user)
+):
+
+    author = await author_service.select_author(author_id)
+    if not author:
+        raise HTTPException(status_code=404, detail="Author not found")
+
+    try:
+        books, next_cursor = await book_service.list_author_books(author_id, limit, sort_by, sort_order, cursor)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return AuthorBookListResponse(books=books, limit=limit, next_cursor=next_cursor)
+
+
 @router.patch("/{author_id}", response_model=AuthorReadResponse)
 @limiter.limit("5/minute")
 async def update_author(request: Request, author_id: int, author: AuthorCreateUpdateRequest, current_user: dict = Depends(middleware_get_current_user)):
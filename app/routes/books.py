@@ -1,11 +1,14 @@
-from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile, File, Request
-from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
+import asyncpg
+from typing import Optional, Union
+from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile, File, Request, Response
+from fastapi.responses import StreamingResponse
 
 from app.limiter import limiter
-from app.middleware import middleware_get_current_user
-from app.schemas import BookCreateRequest, BookUpdateRequest, BookReadResponse, BookListResponse, BookDeleteResponse, BookImportResponse
-from app.services import book_service
+from app.middleware import middleware_get_current_user, middleware_get_connection
+from app.schemas import BookCreateRequest, BookUpdateRequest, BookReadResponse, BookListResponse, BookBatchResponse, BookDeleteResponse, BookImportResponse, ImportJobResponse
+from app.services import activity_service, book_service, import_service
+from app.utils import make_etag, is_not_modified, cache_headers, not_modified
 
 
 router = APIRouter(prefix="/books", tags=["Books"])
@@ -13,9 +16,9 @@ router = APIRouter(prefix="/books", tags=["Books"])
 
 @router.post("/create", response_model=BookReadResponse)
 @limiter.limit("5/minute")
-async def create_book(request: Request, book: BookCreateRequest, current_user: dict = Depends(middleware_get_current_user)):
+async def create_book(request: Request, book: BookCreateRequest, current_user: dict = Depends(middleware_get_current_user), conn: asyncpg.Connection = Depends(middleware_get_connection)):
 
-    author = await book_service.get_user_author(current_user["id"])
+    author = await book_service.get_user_author(current_user["id"], conn=conn)
     if not author:
         raise HTTPException(status_code=404, detail="Author not found for the current user")
 
@@ -28,7 +31,8 @@ async def create_book(request: Request, book: BookCreateRequest, current_user: d
             genre_id=book.genre_id,
             published_year=book.published_year,
             author_ids=book.author_ids,
-            created_by=current_user["id"]
+            created_by=current_user["id"],
+            conn=conn
         )
         if not created_book:
             raise HTTPException(status_code=404, detail="Book not found")
@@ -39,14 +43,36 @@ async def create_book(request: Request, book: BookCreateRequest, current_user: d
         raise HTTPException(status_code=400, detail="Book creation failed")
     
 
+@router.get("/batch", response_model=BookBatchResponse)
+@limiter.limit("5/minute")
+async def get_books_batch(request: Request, ids: str = Query(..., pattern=r"^\d+(,\d+)*$"), current_user: dict = Depends(middleware_get_current_user)):
+
+    book_ids = [int(book_id) for book_id in ids.split(",")]
+    if len(book_ids) > book_service.batch_max_ids:
+        raise HTTPException(status_code=400, detail=f"At most {book_service.batch_max_ids} ids are allowed")
+
+    books = await book_service.get_books(book_ids)
+    items = [{"id": book_id, "found": book_id in books, "book": books.get(book_id)} for book_id in book_ids]
+    found_count = sum(item["found"] for item in items)
+
+    return BookBatchResponse(books=items, found_count=found_count, missing_count=len(items) - found_count)
+
+
 @router.get("/{book_id}", response_model=BookReadResponse)
 @limiter.limit("5/minute")
-async def get_book(request: Request, book_id: int, current_user: dict = Depends(middleware_get_current_user)):
+async def get_book(request: Request, response: Response, book_id: int, current_user: dict = Depends(middleware_get_current_user)):
 
     book = await book_service.get_book(book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
 
+    activity_service.record(current_user["id"], book_id, "view")
+
+    etag = make_etag(book)
+    if is_not_modified(request, etag, book["updated_at"]):
+        return not_modified(etag, book["updated_at"])
+
+    response.headers.update(cache_headers(etag, book["updated_at"]))
     return book
 
 
@@ -54,6 +80,7 @@ async def get_book(request: Request, book_id: int, current_user: dict = Depends(
 @limiter.limit("5/minute")
 async def list_books(
     request: Request, 
+    response: Response,
     page: int = 1,
     limit: int = 10,
     sort_by: str = "id",
@@ -63,53 +90,89 @@ async def list_books(
     genre_id: Optional[int] = Query(None),
     year_from: Optional[int] = Query(None),
     year_to: Optional[int] = Query(None),
-    export: Optional[str] = Query(None, regex="^(json|csv)$"),
+    cursor: Optional[str] = Query(None),
+    search_mode: str = Query("substring", pattern="^(substring|fuzzy)$"),
+    total_mode: str = Query("exact", pattern="^(exact|estimated)$"),
+    export: Optional[str] = Query(None, pattern="^(json|ndjson|csv)$"),
     current_user: dict = Depends(middleware_get_current_user)
 ):
 
-    books = await book_service.list_books(
-        page=page,
-        limit=limit,
-        sort_by=sort_by,
-        sort_order=sort_order,
-        title=title,
-        author_name=author_name,
-        genre_id=genre_id,
-        year_from=year_from,
-        year_to=year_to
-    )
-    if not books:
-        raise HTTPException(status_code=404, detail="No books found")
-
-    if not export:
-        return BookListResponse(books=books, total=len(books), page=page, limit=limit)
-
-    if export == "json":
-        return JSONResponse(content=book_service.serialize_export_json(books),
-            media_type="text/json",
-            headers={"Content-Disposition": "attachment; filename=books.json"}
+    if export:
+        rows = book_service.stream_books(
+            sort_by=sort_by,
+            sort_order=sort_order,
+            title=title,
+            author_name=author_name,
+            genre_id=genre_id,
+            year_from=year_from,
+            year_to=year_to,
+            search_mode=search_mode
         )
-    
-    elif export == "csv":
+        encoder, media_type = {
+            "json": (book_service.export_json, "text/json"),
+            "ndjson": (book_service.export_ndjson, "application/x-ndjson"),
+            "csv": (book_service.export_csv, "text/csv")
+        }[export]
+
         return StreamingResponse(
-            book_service.generate_export_csv(books),
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=books.csv"}
+            encoder(activity_service.record_each(rows, current_user["id"], "export")),
+            media_type=media_type,
+            headers={"Content-Disposition": f"attachment; filename=books.{export}"}
         )
 
-    else:
-        raise HTTPException(status_code=400, detail="Invalid export format. Use 'json' or 'csv'.")    
+    async with book_service.catalog_snapshot() as conn:
+        version, last_modified = await book_service.get_catalog_version(conn)
+        etag = make_etag("books", version, last_modified, sorted(request.query_params.multi_items()))
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(etag, last_modified)
+
+        try:
+            (books, next_cursor), (total, total_estimated) = await asyncio.gather(
+                book_service.list_books(
+                    page=page,
+                    limit=limit,
+                    sort_by=sort_by,
+                    sort_order=sort_order,
+                    title=title,
+                    author_name=author_name,
+                    genre_id=genre_id,
+                    year_from=year_from,
+                    year_to=year_to,
+                    cursor=cursor,
+                    search_mode=search_mode,
+                    conn=conn
+                ),
+                book_service.count_books(
+                    title=title,
+                    author_name=author_name,
+                    genre_id=genre_id,
+                    year_from=year_from,
+                    year_to=year_to,
+                    estimated=total_mode == "estimated",
+                    search_mode=search_mode
+                )
+            )
+
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    if not books:
+        raise HTTPException(status_code=404, detail="No books found")
+
+    response.headers.update(cache_headers(etag, last_modified))
+    return BookListResponse(books=books, total=total, total_estimated=total_estimated,
+                            page=page, limit=limit, next_cursor=next_cursor)
 
 
 @router.put("/{book_id}", response_model=BookReadResponse)
 @limiter.limit("5/minute")
-async def update_book(request: Request, book_id: int, book: BookUpdateRequest, current_user: dict = Depends(middleware_get_current_user)):
+async def update_book(request: Request, book_id: int, book: BookUpdateRequest, current_user: dict = Depends(middleware_get_current_user), conn: asyncpg.Connection = Depends(middleware_get_connection)):
 
-    is_creator = await book_service.check_book_creator(book_id, current_user["id"])
+    is_creator = await book_service.check_book_creator(book_id, current_user["id"], conn=conn)
     if not is_creator:
         raise HTTPException(status_code=406, detail="Only the creator can update the book")
 
-    author = await book_service.get_user_author(current_user["id"])
+    author = await book_service.get_user_author(current_user["id"], conn=conn)
     if not author:
         raise HTTPException(status_code=404, detail="Author not found for the current user")
 
@@ -122,7 +185,8 @@ async def update_book(request: Request, book_id: int, book: BookUpdateRequest, c
             title=book.title,
             genre_id=book.genre_id,
             published_year=book.published_year,
-            author_ids=book.author_ids
+            author_ids=book.author_ids,
+            conn=conn
         )
         if not updated_book:
             raise HTTPException(status_code=404, detail="Book not found")
@@ -135,67 +199,75 @@ async def update_book(request: Request, book_id: int, book: BookUpdateRequest, c
 
 @router.delete("/{book_id}", response_model=BookDeleteResponse)
 @limiter.limit("5/minute")
-async def delete_book(request: Request, book_id: int, current_user: dict = Depends(middleware_get_current_user)):
+async def delete_book(request: Request, book_id: int, current_user: dict = Depends(middleware_get_current_user), conn: asyncpg.Connection = Depends(middleware_get_connection)):
 
-    is_creator = await book_service.check_book_creator(book_id, current_user["id"])
+    is_creator = await book_service.check_book_creator(book_id, current_user["id"], conn=conn)
     if not is_creator:
         raise HTTPException(status_code=406, detail="Only the creator can update the book")
 
     try:
-        await book_service.delete_book(book_id)
+        await book_service.delete_book(book_id, conn=conn)
         return BookDeleteResponse(success=True)
 
     except Exception:
         raise HTTPException(status_code=400, detail="Book deletion failed")
     
 
-@router.post("/import", response_model=BookImportResponse)
+@router.post("/import", response_model=Union[BookImportResponse, ImportJobResponse])
 @limiter.limit("5/minute")
-async def import_books(request: Request, file: UploadFile = File(...), current_user: dict = Depends(middleware_get_current_user)):
+async def import_books(request: Request, file: UploadFile = File(...), run_async: bool = Query(False, alias="async"),
+                       current_user: dict = Depends(middleware_get_current_user)):
 
     author = await book_service.get_user_author(current_user["id"])
     if not author:
         raise HTTPException(status_code=404, detail="Author not found for the current user")
 
-    content = await file.read()
-
-    if file.filename.endswith('.csv'):
-        books = book_service.parse_csv_file(content, author_id=author["id"])
-
-    elif file.filename.endswith('.json'):
-        books = book_service.parse_json_file(content, author_id=author["id"])
-
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported file format. Only CSV and JSON are allowed.")
-    
-    if "error" in books[0]:
-        raise HTTPException(status_code=409, detail=f"Error on book '{books[0]["title"]}': {books[0]["error"]}")
-    
-    created_books = []
-    error_books = []
+    if not file.filename.endswith(import_service.formats):
+        raise HTTPException(status_code=400, detail="Unsupported file format. Only CSV, JSON and NDJSON are allowed.")
 
-    for book in books:
+    if run_async:
         try:
-            created_book = await book_service.create_book(
-                title=book["title"],
-                genre_id=book.get("genre_id"),
-                published_year=book["published_year"],
-                author_ids=book["author_ids"],
-                created_by=current_user["id"]
-            )
-            if not created_book:
-                error_books.append({"title": book["title"], "error": "Book not found"})
-            
-            else:
-                created_books.append(created_book)
+            return await import_service.create_job(file.file, file.filename, author_id=author["id"], user_id=current_user["id"])
 
         except Exception:
-            error_books.append({"title": book["title"], "error": "Book creation failed"})
-            continue
+            raise HTTPException(status_code=400, detail="Import job creation failed")
+
+    try:
+        created_books, error_books = await import_service.import_file(
+            file.file, file.filename, author_id=author["id"], created_by=current_user["id"]
+        )
+
+    except Exception:
+        raise HTTPException(status_code=400, detail="Book import failed")
     
     return BookImportResponse(
         created_books=created_books,
         error_books=error_books,
         created_count=len(created_books),
         error_count=len(error_books)
-    )
\ No newline at end of file
+    )
+
+
+@router.get("/import/{job_id}", response_model=ImportJobResponse)
+@limiter.limit("5/minute")
+async def get_import_job(request: Request, job_id: int, current_user: dict = Depends(middleware_get_current_user)):
+
+    job = await import_service.get_job(job_id)
+    if not job or (job["user_id"] != current_user["id"] and not current_user.get("is_admin")):
+        raise HTTPException(status_code=404, detail="Import job not found")
+
+    return job
+
+
+@router.post("/import/{job_id}/cancel", response_model=ImportJobResponse)
+@limiter.limit("5/minute")
+async def cancel_import_job(request: Request, job_id: int, current_user: dict = Depends(middleware_get_current_user)):
+
+    job = await import_service.get_job(job_id)
+    if not job or (job["user_id"] != current_user["id"] and not current_user.get("is_admin")):
+        raise HTTPException(status_code=404, detail="Import job not found")
+
+    if job["status"] not in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Import job is already {job['status']}")
+
+    return await import_service.cancel_job(job_id)
\ No newline at end of file
@@ -1,10 +1,11 @@
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 
 from app.limiter import limiter
 from app.middleware import middleware_get_current_user
 from app.schemas import GenreReadResponse, GenreListResponse
 from app.services import genre_service
+from app.utils import make_etag, is_not_modified, cache_headers, not_modified
 
 
 router = APIRouter(prefix="/genre", tags=["Genre"])
@@ -12,12 +13,17 @@ router = APIRouter(prefix="/genre", tags=["Genre"])
 
 @router.get("/", response_model=GenreListResponse)
 @limiter.limit("5/minute")
-async def get_genre(request: Request, current_user: dict = Depends(middleware_get_current_user)):
+async def get_genre(request: Request, response: Response, current_user: dict = Depends(middleware_get_current_user)):
     genres = await genre_service.select_genre()
 
     if not genres:
         raise HTTPException(status_code=404, detail="No genres found")
-    
+
+    etag = make_etag(genres)
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
+    response.headers.update(cache_headers(etag))
     return GenreListResponse(genres=genres)
 
 
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import PlainTextResponse
+
+from app.database import get_database
+from app.limiter import limiter
+from app.metrics import get_metrics
+from app.middleware import middleware_get_current_admin_user
+from app.schemas import UserReadResponse
+
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+@limiter.limit("5/minute")
+async def get_metrics_text(request: Request, current_user: UserReadResponse = Depends(middleware_get_current_admin_user)):
+    return PlainTextResponse(get_metrics().render(get_database().pool_stats()), media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+
+from app.limiter import limiter
+from app.middleware import middleware_get_current_user
+from app.schemas import RecommendationListResponse
+from app.services import recommendation_service
+
+
+router = APIRouter(prefix="/recommendations", tags=["Recommendations"])
+
+
+@router.get("/", response_model=RecommendationListResponse)
+@limiter.limit("5/minute")
+async def get_recommendations(request: Request, limit: int = Query(10, ge=1, le=50), current_user: dict = Depends(middleware_get_current_user)):
+
+    recommendations = await recommendation_service.recommend(current_user["id"], limit)
+    if not recommendations:
+        raise HTTPException(status_code=404, detail="No recommendations found")
+
+    return RecommendationListResponse(recommendations=recommendations)
\ No newline at end of file
@@ -1,12 +1,15 @@
 from .auth import UserCreateRequest, UserLoginRequest, TokenResponse, UserReadResponse
 from .author import AuthorCreateUpdateRequest, AuthorReadResponse
-from .books import BookCreateRequest, BookUpdateRequest, BookReadResponse, BookListResponse, BookDeleteResponse, BookImportResponse
+from .books import BookCreateRequest, BookUpdateRequest, BookReadResponse, BookListResponse, AuthorBookListResponse, BookBatchItemResponse, BookBatchResponse, BookDeleteResponse, BookImportResponse, ImportJobResponse
 from .genre import GenreReadResponse, GenreListResponse
-from .admin import AdminAuthorCreateRequest, AdminAuthorUpdateRequest, AdminGenreCreateRequest, AdminGenreUpdateRequest, AdminBookCreateRequest, AdminBookUpdateRequest
+from .recommendations import BookRecommendationResponse, RecommendationListResponse, RecommendationRebuildResponse
+from .admin import AdminAuthorCreateRequest, AdminAuthorUpdateRequest, AdminGenreCreateRequest, AdminGenreUpdateRequest, AdminBookCreateRequest, AdminBookUpdateRequest, AdminBookBulkRequest, AdminBookBulkGenreRequest, AdminBookBulkCreatorRequest, AdminBookBulkResponse
 
 
 __all__ = ["UserCreateRequest", "UserLoginRequest", "TokenResponse", "UserReadResponse",
            "AuthorCreateUpdateRequest", "AuthorReadResponse",
-           "BookCreateRequest", "BookUpdateRequest", "BookReadResponse", "BookListResponse", "BookDeleteResponse", "BookImportResponse",
+           "BookCreateRequest", "BookUpdateRequest", "BookReadResponse", "BookListResponse", "AuthorBookListResponse", "BookBatchItemResponse", "BookBatchResponse", "BookDeleteResponse", "BookImportResponse", "ImportJobResponse",
            "GenreReadResponse", "GenreListResponse",
-           "AdminAuthorCreateRequest", "AdminAuthorUpdateRequest", "AdminGenreCreateRequest", "AdminGenreUpdateRequest", "AdminBookCreateRequest", "AdminBookUpdateRequest"]
\ No newline at end of file
+           "BookRecommendationResponse", "RecommendationListResponse", "RecommendationRebuildResponse",
+           "AdminAuthorCreateRequest", "AdminAuthorUpdateRequest", "AdminGenreCreateRequest", "AdminGenreUpdateRequest", "AdminBookCreateRequest", "AdminBookUpdateRequest",
+           "AdminBookBulkRequest", "AdminBookBulkGenreRequest", "AdminBookBulkCreatorRequest", "AdminBookBulkResponse"]
\ No newline at end of file
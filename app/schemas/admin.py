@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel, field_validator
+from typing import Optional, List
+from pydantic import BaseModel, field_validator, model_validator
 
 from app.schemas.author import AuthorCreateUpdateRequest
 from app.schemas.books import BookCreateRequest
@@ -47,4 +47,41 @@ class AdminBookCreateRequest(BookCreateRequest):
     
 
 class AdminBookUpdateRequest(AdminBookCreateRequest):
-    pass
\ No newline at end of file
+    pass
+
+
+class AdminBookBulkRequest(BaseModel):
+    ids: Optional[List[int]] = None
+    title: Optional[str] = None
+    author_name: Optional[str] = None
+    genre_id: Optional[int] = None
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    dry_run: bool = False
+
+    @model_validator(mode="after")
+    def validate_selection(self) -> "AdminBookBulkRequest":
+        if not (self.ids or self.title or self.author_name or self.genre_id or self.year_from or self.year_to):
+            raise ValueError("ids or at least one filter is required")
+        return self
+
+
+class AdminBookBulkGenreRequest(AdminBookBulkRequest):
+    new_genre_id: Optional[int]
+
+
+class AdminBookBulkCreatorRequest(AdminBookBulkRequest):
+    created_by: int
+
+    @field_validator("created_by")
+    @classmethod
+    def validate_created_by(cls, value: int) -> int:
+        if value < 1:
+            raise ValueError("created_by must be a positive integer")
+        return value
+
+
+class AdminBookBulkResponse(BaseModel):
+    affected: int
+    dry_run: bool
+    book_ids: List[int]
\ No newline at end of file
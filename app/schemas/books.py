@@ -37,8 +37,28 @@ class BookReadResponse(BaseModel):
 class BookListResponse(BaseModel):
     books: Optional[List[BookReadResponse]]
     total: int
+    total_estimated: bool = False
     page: int
     limit: int
+    next_cursor: Optional[str] = None
+
+
+class AuthorBookListResponse(BaseModel):
+    books: List[BookReadResponse]
+    limit: int
+    next_cursor: Optional[str] = None
+
+
+class BookBatchItemResponse(BaseModel):
+    id: int
+    found: bool
+    book: Optional[BookReadResponse] = None
+
+
+class BookBatchResponse(BaseModel):
+    books: List[BookBatchItemResponse]
+    found_count: int
+    missing_count: int
 
 
 class BookDeleteResponse(BaseModel):
@@ -54,4 +74,22 @@ class BookImportResponse(BaseModel):
     created_books: Optional[List[BookReadResponse]] = None
     error_books: Optional[List[BookImportErrorResponse]] = None
     created_count: int = 0
-    error_count: int = 0
\ No newline at end of file
+    error_count: int = 0
+
+
+class ImportJobResponse(BaseModel):
+    id: int
+    user_id: Optional[int]
+    filename: str
+    status: str
+    rows_done: int
+    rows_failed: int
+    bytes_done: int
+    bytes_total: int
+    throughput: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    errors: List[BookImportErrorResponse] = []
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
\ No newline at end of file
@@ -0,0 +1,21 @@
+from typing import List
+from pydantic import BaseModel
+
+from app.schemas.books import BookReadResponse
+
+
+class BookRecommendationResponse(BaseModel):
+    book: BookReadResponse
+    score: float
+
+
+class RecommendationListResponse(BaseModel):
+    recommendations: List[BookRecommendationResponse]
+
+
+class RecommendationRebuildResponse(BaseModel):
+    full: bool
+    books: int
+    neighbours: int
+    activity_id: int
+    seconds: float
\ No newline at end of file
@@ -1,14 +1,20 @@
+from .activity import ActivityService
 from .auth import AuthService
 from .author import AuthorService
 from .books import BookService
 from .genre import GenreService
+from .imports import ImportService
+from .recommendations import RecommendationService
 
 
+activity_service = ActivityService()
 auth_service = AuthService()
 author_service = AuthorService()
 book_service = BookService()
 genre_service = GenreService()
+import_service = ImportService()
+recommendation_service = RecommendationService()
 
 
-__all__ = ["auth_service", "AuthService",
-           "author_service", "book_service", "genre_service"]
\ No newline at end of file
+__all__ = ["activity_service", "auth_service", "AuthService",
+           "author_service", "book_service", "genre_service", "import_service", "recommendation_service"]
\ No newline at end of file
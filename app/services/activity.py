@@ -0,0 +1,141 @@
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+
+import asyncpg
+
+from app import BaseConfig
+from app.database import get_database
+from app.utils import SingletonMeta
+
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityService(metaclass=SingletonMeta):
+
+    def __init__(self):
+        self.max_pending = int(BaseConfig.get("ACTIVITY_BUFFER_SIZE") or 10000)
+        self.flush_size = int(BaseConfig.get("ACTIVITY_FLUSH_SIZE") or 500)
+        self.flush_interval = float(BaseConfig.get("ACTIVITY_FLUSH_INTERVAL") or 2)
+        self.pending: list[tuple] = []
+        self.flush_lock = asyncio.Lock()
+        self.flush_task: Optional[asyncio.Task] = None
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+        self.flushes = 0
+        self.flush_total = 0.0
+
+
+    def record(self, user_id: int, book_id: int, action: str) -> bool:
+        if len(self.pending) >= self.max_pending:
+            self.dropped += 1
+            return False
+
+        self.pending.append((user_id, book_id, action, datetime.now(timezone.utc).replace(tzinfo=None)))
+        self.recorded += 1
+
+        if len(self.pending) >= self.flush_size:
+            self.schedule_flush()
+
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.flush_interval, self.schedule_flush)
+
+        return True
+
+
+    async def record_each(self, rows: AsyncIterator[asyncpg.Record], user_id: int, action: str) -> AsyncIterator[asyncpg.Record]:
+        async for row in rows:
+            self.record(user_id, row["id"], action)
+            yield row
+
+
+    def schedule_flush(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        if self.flush_task is None or self.flush_task.done():
+            self.flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+
+    async def flush(self) -> int:
+        written = 0
+
+        async with self.flush_lock:
+            while self.pending:
+                batch = self.pending[:self.flush_size]
+                del self.pending[:self.flush_size]
+                started_at = time.perf_counter()
+
+                try:
+                    inserted = await self.write_batch(batch)
+
+                except (asyncpg.PostgresError, OSError, asyncio.TimeoutError):
+                    logger.exception("Activity flush failed")
+                    self.failed_flushes += 1
+                    requeued = batch[:max(self.max_pending - len(self.pending), 0)]
+                    self.dropped += len(batch) - len(requeued)
+                    self.pending[:0] = requeued
+
+                    if self.timer is None:
+                        self.timer = asyncio.get_running_loop().call_later(self.flush_interval, self.schedule_flush)
+                    break
+
+                self.flushes += 1
+                self.flush_total += time.perf_counter() - started_at
+                self.dropped += len(batch) - inserted
+                self.written += inserted
+                written += inserted
+
+        return written
+
+
+    async def write_batch(self, batch: list[tuple]) -> int:
+        async with get_database().acquire() as conn:
+            try:
+                await conn.copy_records_to_table("user_activity", records=batch, columns=["user_id", "book_id", "action", "created_at"])
+                return len(batch)
+
+            except asyncpg.ForeignKeyViolationError:
+                user_ids, book_ids, actions, created_at = (list(column) for column in zip(*batch))
+                result = await conn.execute(
+                    """
+                    INSERT INTO user_activity (user_id, book_id, action, created_at)
+                    SELECT a.user_id, a.book_id, a.action, a.created_at
+                    FROM unnest($1::int[], $2::int[], $3::text[], $4::timestamp[]) AS a(user_id, book_id, action, created_at)
+                    WHERE EXISTS (SELECT 1 FROM users u WHERE u.id = a.user_id)
+                    AND EXISTS (SELECT 1 FROM books b WHERE b.id = a.book_id)
+                    """,
+                    user_ids, book_ids, actions, created_at
+                )
+                return int(result.split()[-1])
+
+
+    async def shutdown(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        if self.flush_task is not None and not self.flush_task.done():
+            await self.flush_task
+
+        await self.flush()
+
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self.pending),
+            "max_pending": self.max_pending,
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "avg_flush_ms": self.flush_total / self.flushes * 1000 if self.flushes else 0.0
+        }
\ No newline at end of file
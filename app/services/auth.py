@@ -1,16 +1,46 @@
+import time
 from typing import Optional
 from datetime import timedelta, datetime, timezone
-from jose import jwt, JWTError
-from passlib.context import CryptContext
 
 from app import BaseConfig
 from app.database import get_database
-from app.utils import SingletonMeta
+from app.queries import get_query_registry
+from app.utils import SingletonMeta, LRUCache, BoundedExecutor
 
 
 class AuthService(metaclass=SingletonMeta):
     def __init__(self):
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.bcrypt_rounds = int(BaseConfig.get("BCRYPT_ROUNDS") or 12)
+        self._pwd_context = None
+        self.password_executor = BoundedExecutor(
+            max_workers=int(BaseConfig.get("PASSWORD_HASH_WORKERS") or 2),
+            max_queue=int(BaseConfig.get("PASSWORD_HASH_MAX_QUEUE") or 64),
+            name="password-hash"
+        )
+        self.secret_key = BaseConfig.get("JWT_SECRET_KEY")
+        self.algorithm = BaseConfig.get("JWT_ALGORITHM")
+        self.access_token_expire_minutes = int(BaseConfig.get("JWT_ACCESS_TOKEN_EXPIRE_MINUTES") or 30)
+        self.token_cache = LRUCache(
+            maxsize=int(BaseConfig.get("AUTH_TOKEN_CACHE_SIZE") or 4096),
+            ttl=float(BaseConfig.get("AUTH_TOKEN_CACHE_TTL") or 300)
+        )
+        self.queries = get_query_registry()
+        self.queries.register("users.by_username", "SELECT id, username, password, is_admin FROM users WHERE username = $1")
+
+
+    @property
+    def pwd_context(self):
+        if self._pwd_context is None:
+            from passlib.context import CryptContext
+
+            self._pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=self.bcrypt_rounds)
+
+        return self._pwd_context
+
+
+    @pwd_context.setter
+    def pwd_context(self, value) -> None:
+        self._pwd_context = value
 
 
     def hash_password(self, password: str) -> str:
@@ -22,8 +52,9 @@ class AuthService(metaclass=SingletonMeta):
 
 
     async def create_user(self, username: str, password: str) -> dict:
-        async with get_database().get_pool().acquire() as conn:
-            hashed_password = self.hash_password(password)
+        hashed_password = await self.password_executor.run(self.hash_password, password)
+
+        async with get_database().acquire(write=True) as conn:
             query = "INSERT INTO users (username, password) VALUES ($1, $2) RETURNING id, username, is_admin"
             row = await conn.fetchrow(query, username, hashed_password)
 
@@ -35,30 +66,51 @@ class AuthService(metaclass=SingletonMeta):
 
 
     async def authenticate_user(self, username: str, password: str) -> Optional[dict]:
-        async with get_database().get_pool().acquire() as conn:
-            query = "SELECT id, username, password, is_admin FROM users WHERE username = $1"
-            row = await conn.fetchrow(query, username)
+        async with get_database().acquire() as conn:
+            row = await self.queries.fetchrow(conn, "users.by_username", username)
 
-            if row and self.verify_password(password, row['password']):
-                return dict(row)
-            
+        if not row:
+            return None
+
+        is_valid, new_hash = await self.password_executor.run(self.pwd_context.verify_and_update, password, row["password"])
+        if not is_valid:
             return None
+
+        if new_hash:
+            async with get_database().acquire(write=True) as conn:
+                await conn.execute("UPDATE users SET password = $1 WHERE id = $2 AND password = $3", new_hash, row["id"], row["password"])
+
+        return dict(row)
         
 
-    @staticmethod
-    def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
+        from jose import jwt
+
         to_encode = data.copy()
-        expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=int(BaseConfig.get("JWT_ACCESS_TOKEN_EXPIRE_MINUTES"))))
+        expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=self.access_token_expire_minutes))
         to_encode.update({"exp": expire})
 
-        return jwt.encode(to_encode, BaseConfig.get("JWT_SECRET_KEY"), algorithm=BaseConfig.get("JWT_ALGORITHM"))
+        return jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
     
 
-    @staticmethod
-    def decode_access_token(token: str) -> dict:
+    def decode_access_token(self, token: str) -> dict:
+        payload = self.token_cache.get(token)
+        if payload is not None:
+            return dict(payload)
+
+        from jose import jwt, JWTError
+
         try:
-            payload = jwt.decode(token, BaseConfig.get("JWT_SECRET_KEY"), algorithms=[BaseConfig.get("JWT_ALGORITHM")])
-            return payload
-        
+            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+
         except JWTError:
-            return {}
\ No newline at end of file
+            return {}
+
+        ttl = self.token_cache.ttl
+        if isinstance(payload.get("exp"), (int, float)):
+            ttl = min(ttl, payload["exp"] - time.time())
+
+        if ttl > 0:
+            self.token_cache.set(token, payload, ttl=ttl)
+
+        return dict(payload)
\ No newline at end of file
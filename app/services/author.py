@@ -1,7 +1,12 @@
 from typing import Optional
 
+import asyncpg
+
+from app import BaseConfig
 from app.database import get_database
-from app.utils import SingletonMeta
+from app.queries import get_query_registry
+from app.services.books import BookService
+from app.utils import SingletonMeta, LRUCache
 
 
 class AuthorService(metaclass=SingletonMeta):
@@ -14,9 +19,15 @@ class AuthorService(metaclass=SingletonMeta):
         LEFT JOIN users u ON a.user_id = u.id
         WHERE a.id = $1
         """
-
-    async def create_author(self, name: str, user_id: int) -> Optional[dict]:
-        async with get_database().get_pool().acquire() as conn:
+        self.author_cache = LRUCache(
+            maxsize=int(BaseConfig.get("READ_CACHE_SIZE") or 1024),
+            ttl=float(BaseConfig.get("READ_CACHE_TTL") or 60)
+        )
+        self.queries = get_query_registry()
+        self.queries.register("authors.select", self.select_author_query)
+
+    async def create_author(self, name: str, user_id: int, conn: Optional[asyncpg.Connection] = None) -> Optional[dict]:
+        async with get_database().acquire(conn, write=True) as conn:
             try:
                 insert_query = "INSERT INTO authors (name, user_id) VALUES ($1, $2) RETURNING id, name, user_id"
                 insert_row = await conn.fetchrow(insert_query, name, user_id)
@@ -28,7 +39,7 @@ class AuthorService(metaclass=SingletonMeta):
             if not insert_row or not author_id:
                 raise ValueError("Author creation failed")
             
-            row = await conn.fetchrow(self.select_author_query, author_id)
+            row = await self.queries.fetchrow(conn, "authors.select", author_id)
 
             if row:
                 return dict(row)
@@ -36,8 +47,8 @@ class AuthorService(metaclass=SingletonMeta):
             return None
         
 
-    async def update_author(self, author_id: int, name: str, user_id: Optional[int] = -1) -> Optional[dict]:
-        async with get_database().get_pool().acquire() as conn:
+    async def update_author(self, author_id: int, name: str, user_id: Optional[int] = -1, conn: Optional[asyncpg.Connection] = None) -> Optional[dict]:
+        async with get_database().acquire(conn, write=True) as conn:
             if user_id != -1:
                 update_query = "UPDATE authors SET name = $1, user_id = $2 WHERE id = $3 RETURNING id, name, user_id"
                 update_row = await conn.fetchrow(update_query, name, user_id, author_id)
@@ -50,8 +61,10 @@ class AuthorService(metaclass=SingletonMeta):
 
             if not update_row or not author_id:
                 raise ValueError("Author update failed")
+
+            get_database().after_commit(conn, lambda: self.invalidate(author_id))
             
-            row = await conn.fetchrow(self.select_author_query, author_id)
+            row = await self.queries.fetchrow(conn, "authors.select", author_id)
 
             if row:
                 return dict(row)
@@ -59,27 +72,41 @@ class AuthorService(metaclass=SingletonMeta):
             return None
         
 
-    async def select_author(self, author_id: int) -> Optional[dict]:
-        async with get_database().get_pool().acquire() as conn:
-            row = await conn.fetchrow(self.select_author_query, author_id)
+    async def select_author(self, author_id: int, conn: Optional[asyncpg.Connection] = None) -> Optional[dict]:
+        author = self.author_cache.get(author_id)
+        if author is not None:
+            return author
+
+        generation = self.author_cache.generation
+        async with get_database().acquire(conn, read=True) as conn:
+            row = await self.queries.fetchrow(conn, "authors.select", author_id)
 
             if row:
-                return dict(row)
+                author = dict(row)
+                if get_database().can_cache(conn):
+                    self.author_cache.set(author_id, author, generation=generation)
+                return author
             
             return None
         
     
-    async def delete_author(self, author_id: int) -> bool:
-        async with get_database().get_pool().acquire() as conn:
+    async def delete_author(self, author_id: int, conn: Optional[asyncpg.Connection] = None) -> bool:
+        async with get_database().acquire(conn, write=True) as conn:
             try:
                 await conn.execute("DELETE FROM authors WHERE id = $1", author_id)
 
             except Exception:
                 raise ValueError("Author deletion failed")
 
+            get_database().after_commit(conn, lambda: self.invalidate(author_id))
             return True
         
     
+    def invalidate(self, author_id: int) -> None:
+        self.author_cache.delete(author_id)
+        BookService().invalidate_author(author_id)
+
+
     def generate_response(self, author: dict) -> dict:
         return {
             "id": author["author_id"],
@@ -1,309 +1,769 @@
 import json, csv, io
-from typing import Optional, Iterator
+from contextlib import asynccontextmanager
+from typing import Optional, AsyncIterator
+from datetime import datetime
 
+import asyncpg
+
+from app import BaseConfig
 from app.database import get_database
-from app.utils import SingletonMeta
+from app.queries import get_query_registry
+from app.utils import SingletonMeta, LRUCache, DataLoader, encode_cursor, decode_cursor
 
 
 class BookService(metaclass=SingletonMeta):
-    async def create_book(self, title: str, genre_id: Optional[int], published_year: int, author_ids: list[int], created_by: int) -> Optional[dict]:
-        async with get_database().get_pool().acquire() as conn:
-            async with conn.transaction():
-                row = await conn.fetchrow(
-                    """
-                    INSERT INTO books (title, genre_id, published_year, created_by)
-                    VALUES ($1, $2, $3, $4)
-                    RETURNING id, title, genre_id, published_year, created_by, created_at, updated_at
+
+    def __init__(self):
+        self.sort_map = {
+            "id": "b.id",
+            "title": "b.title",
+            "year": "COALESCE(b.published_year, 0)",
+            "author": "b.first_author_name"
+        }
+        self.count_cache = LRUCache(
+            maxsize=int(BaseConfig.get("BOOK_COUNT_CACHE_SIZE") or 1024),
+            ttl=float(BaseConfig.get("BOOK_COUNT_CACHE_TTL") or 60)
+        )
+        self.book_cache = LRUCache(
+            maxsize=int(BaseConfig.get("READ_CACHE_SIZE") or 1024),
+            ttl=float(BaseConfig.get("READ_CACHE_TTL") or 60)
+        )
+        self.estimate_threshold = int(BaseConfig.get("BOOK_COUNT_ESTIMATE_THRESHOLD") or 100000)
+        self.export_chunk_size = int(BaseConfig.get("BOOK_EXPORT_CHUNK_SIZE") or 1000)
+        self.import_batch_size = int(BaseConfig.get("BOOK_IMPORT_BATCH_SIZE") or 1000)
+        self.batch_max_ids = int(BaseConfig.get("BOOK_BATCH_MAX_IDS") or 100)
+        self.book_loader = DataLoader(self.load_books, max_batch_size=self.batch_max_ids)
+        self.authors_json = """
+            COALESCE((
+                SELECT json_agg(json_build_object(
+                    'id', a.id,
+                    'name', a.name,
+                    'user', CASE WHEN u.id IS NULL THEN NULL ELSE json_build_object(
+                        'id', u.id, 'username', u.username, 'is_admin', u.is_admin
+                    ) END
+                ) ORDER BY a.id)
+                FROM {links} l
+                JOIN authors a ON a.id = l.author_id
+                LEFT JOIN users u ON u.id = a.user_id
+                {condition}
+            ), '[]'::json) AS authors
+        """
+        self.book_columns = """
+            b.id, b.title, b.genre_id, b.published_year,
+            b.created_by, b.created_at, b.updated_at,
+        """ + self.authors_json.format(links="book_authors", condition="WHERE l.book_id = b.id")
+        self.written_book_columns = """
+            b.id, b.title, b.genre_id, b.published_year,
+            b.created_by, b.created_at, b.updated_at,
+        """ + self.authors_json.format(links="wanted", condition="")
+        self.queries = get_query_registry()
+        self.queries.register("books.get", f"SELECT {self.book_columns} FROM books b WHERE b.id = $1")
+        self.queries.register("books.get_many", f"SELECT {self.book_columns} FROM books b WHERE b.id = ANY($1::int[])")
+        self.queries.register(
+            "books.catalog_version",
+            "SELECT COALESCE(sum(version), 0) AS version, max(updated_at) AS updated_at FROM table_versions WHERE name LIKE 'catalog:%'"
+        )
+        self.queries.register("books.user_author", "SELECT id, name FROM authors WHERE user_id = $1")
+        self.queries.register("books.creator", "SELECT created_by FROM books WHERE id = $1")
+
+    async def create_book(self, title: str, genre_id: Optional[int], published_year: int, author_ids: list[int], created_by: int, conn: Optional[asyncpg.Connection] = None) -> Optional[dict]:
+        async with get_database().acquire(conn, write=True) as conn:
+            try:
+                rows = await conn.fetch(
+                    f"""
+                    WITH new_book AS (
+                        INSERT INTO books (title, genre_id, published_year, created_by)
+                        VALUES ($1, $2, $3, $4)
+                        RETURNING id, title, genre_id, published_year, created_by, created_at, updated_at
+                    ),
+                    wanted AS (
+                        SELECT DISTINCT unnest($5::int[]) AS author_id
+                    ),
+                    added AS (
+                        INSERT INTO book_authors (book_id, author_id)
+                        SELECT nb.id, w.author_id FROM new_book nb, wanted w
+                    )
+                    SELECT {self.written_book_columns} FROM new_book b
                     """,
-                    title, genre_id, published_year, created_by
+                    title, genre_id, published_year, created_by, author_ids
                 )
 
-                book_id = row["id"]
+            except asyncpg.ForeignKeyViolationError as e:
+                raise ValueError(self.foreign_key_error(e))
 
-                try:
-                    for author_id in author_ids:
-                        await conn.execute(
-                            "INSERT INTO book_authors (book_id, author_id) VALUES ($1, $2)",
-                            book_id, author_id
-                        )
+            get_database().after_commit(conn, self.invalidate_counts)
+            return dict(rows[0]) if rows else None
 
-                except Exception:
-                    raise ValueError("Author does not exist")
 
-        return await self.get_book(book_id)
+    async def bulk_create_books(self, books: list[dict], created_by: int) -> tuple[list[dict], list[dict]]:
+        created_books = []
+        error_books = []
+        batch_size = self.import_batch_size or len(books) or 1
 
+        for start in range(0, len(books), batch_size):
+            async with get_database().acquire(write=True) as conn:
+                async with conn.transaction():
+                    book_ids, errors = await self.insert_books_batch(conn, books[start:start + batch_size], created_by)
+                    created_books.extend(await self.fetch_books(conn, book_ids))
+                    error_books.extend(errors)
 
-    async def get_book(self, book_id: int) -> Optional[dict]:
-        async with get_database().get_pool().acquire() as conn:
-            book = await conn.fetchrow("SELECT * FROM books WHERE id = $1", book_id)
-            if not book:
-                return None
-            
-            author_rows = await conn.fetch(
-                """
-                SELECT a.id, a.name, 
-                    u.id as user_id, u.username, u.is_admin
-                FROM authors a
-                JOIN book_authors ba ON a.id = ba.author_id
-                LEFT JOIN users u ON a.user_id = u.id
-                WHERE ba.book_id = $1
-                """,
-                book_id
-            )
+        if created_books:
+            self.invalidate_counts()
+
+        return created_books, error_books
+
+
+    async def insert_books_batch(self, conn: asyncpg.Connection, books: list[dict], created_by: int) -> tuple[list[int], list[dict]]:
+        records = []
+        errors = []
+
+        for row_no, book in enumerate(books):
+            title = book.get("title")
+            if title is None or not str(title).strip():
+                errors.append({"title": "", "error": "Title and published_year are required"})
+                continue
+
+            try:
+                records.append((
+                    row_no,
+                    str(title),
+                    int(book["genre_id"]) if book.get("genre_id") is not None else None,
+                    int(book["published_year"]) if book.get("published_year") is not None else None,
+                    [int(author_id) for author_id in book.get("author_ids") or []]
+                ))
+
+            except Exception:
+                errors.append({"title": str(book.get("title") or ""), "error": "Invalid book format"})
+
+        if not records:
+            return [], errors
+
+        await conn.execute(
+            """
+            CREATE TEMP TABLE book_import_staging (
+                row_no INTEGER PRIMARY KEY,
+                book_id INTEGER,
+                title TEXT,
+                genre_id INTEGER,
+                published_year INTEGER,
+                author_ids INTEGER[],
+                error TEXT
+            ) ON COMMIT DROP
+            """
+        )
+        await conn.copy_records_to_table(
+            "book_import_staging",
+            records=records,
+            columns=["row_no", "title", "genre_id", "published_year", "author_ids"]
+        )
+        await conn.execute(
+            """
+            UPDATE book_import_staging s SET error = CASE
+                WHEN s.title = '' OR s.published_year IS NULL THEN 'Title and published_year are required'
+                WHEN length(s.title) > 150 THEN 'Title must be at most 150 symbols long'
+                WHEN s.published_year < 1800 OR s.published_year > EXTRACT(YEAR FROM CURRENT_DATE)
+                    THEN 'Published year must be between 1800 and current year'
+                WHEN s.genre_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM genres g WHERE g.id = s.genre_id)
+                    THEN 'Genre does not exist'
+                WHEN EXISTS (
+                    SELECT 1 FROM unnest(s.author_ids) AS aid
+                    WHERE NOT EXISTS (SELECT 1 FROM authors a WHERE a.id = aid)
+                ) THEN 'Author does not exist'
+            END
+            """
+        )
+        await conn.execute(
+            """
+            UPDATE book_import_staging SET book_id = nextval(pg_get_serial_sequence('books', 'id'))
+            WHERE error IS NULL
+            """
+        )
+        await conn.execute(
+            """
+            INSERT INTO books (id, title, genre_id, published_year, created_by)
+            SELECT book_id, title, genre_id, published_year, $1
+            FROM book_import_staging
+            WHERE error IS NULL
+            ORDER BY row_no
+            """,
+            created_by
+        )
+        await conn.execute(
+            """
+            INSERT INTO book_authors (book_id, author_id)
+            SELECT DISTINCT s.book_id, aid
+            FROM book_import_staging s, unnest(s.author_ids) AS aid
+            WHERE s.error IS NULL
+            """
+        )
+        rows = await conn.fetch("SELECT book_id, title, error FROM book_import_staging ORDER BY row_no")
+
+        book_ids = [row["book_id"] for row in rows if row["error"] is None]
+        errors.extend({"title": row["title"], "error": row["error"]} for row in rows if row["error"] is not None)
+
+        return book_ids, errors
+
+
+    async def fetch_books(self, conn: asyncpg.Connection, book_ids: list[int]) -> list[dict]:
+        if not book_ids:
+            return []
+
+        rows = await self.queries.fetch(conn, "books.get_many", book_ids)
+        books_dict = {row["id"]: dict(row) for row in rows}
+
+        return [books_dict[book_id] for book_id in book_ids if book_id in books_dict]
+
+
+    async def get_book(self, book_id: int, conn: Optional[asyncpg.Connection] = None) -> Optional[dict]:
+        book = self.book_cache.get(book_id)
+        if book is not None:
+            return book
 
-            return self.generate_response(dict(book), list(author_rows))
+        if conn is None:
+            return await self.book_loader.load(book_id, get_database().get_read_pool())
+
+        generation = self.book_cache.generation
+        async with get_database().acquire(conn, read=True) as conn:
+            row = await self.queries.fetchrow(conn, "books.get", book_id)
+
+            if row:
+                book = dict(row)
+                if get_database().can_cache(conn):
+                    self.book_cache.set(book_id, book, generation=generation)
+                return book
+
+            return None
+
+
+    async def get_books(self, book_ids: list[int]) -> dict[int, dict]:
+        books = {}
+        missing = []
+
+        for book_id in dict.fromkeys(book_ids):
+            book = self.book_cache.get(book_id)
+            if book is not None:
+                books[book_id] = book
+
+            else:
+                missing.append(book_id)
+
+        if missing:
+            books.update(await self.load_books(missing))
+
+        return {book_id: books[book_id] for book_id in dict.fromkeys(book_ids) if book_id in books}
+
+
+    async def load_books(self, book_ids: list[int], pool: Optional[asyncpg.Pool] = None) -> dict[int, dict]:
+        generation = self.book_cache.generation
+        async with get_database().acquire(read=True, pool=pool) as conn:
+            rows = await self.queries.fetch(conn, "books.get_many", book_ids)
+            cacheable = get_database().can_cache(conn)
+
+        books = {}
+        for row in rows:
+            book = dict(row)
+            if cacheable:
+                self.book_cache.set(book["id"], book, generation=generation)
+            books[book["id"]] = book
+
+        return books
+
+
+    @asynccontextmanager
+    async def catalog_snapshot(self) -> AsyncIterator[asyncpg.Connection]:
+        async with get_database().acquire(read=True) as conn:
+            async with conn.transaction(isolation="repeatable_read", readonly=True):
+                yield conn
+
+
+    async def get_catalog_version(self, conn: Optional[asyncpg.Connection] = None) -> tuple[int, Optional[datetime]]:
+        async with get_database().acquire(conn, read=True) as conn:
+            row = await self.queries.fetchrow(conn, "books.catalog_version")
+
+        return row["version"], row["updated_at"]
 
 
     async def list_books(self, page: int, limit: int, sort_by: str, sort_order: str,
                          title: Optional[str], author_name: Optional[str], genre_id: Optional[int],
-                         year_from: Optional[int], year_to: Optional[int]) -> Optional[list[dict]]:
-        async with get_database().get_pool().acquire() as conn:
-            offset = (page - 1) * limit
-            sort_map = {
-                "id": "b.id",
-                "title": "b.title",
-                "year": "b.published_year",
-                "author": "a.name"
-            }
-            order_field = sort_map.get(sort_by, "b.title")
-            order_dir = "DESC" if sort_order.lower() == "desc" else "ASC"
-
-            filters = []
-            params = []
-
-            if title:
-                filters.append("b.title ILIKE $%d" % (len(params) + 1))
-                params.append(f"%{title}%")
-            if author_name:
-                filters.append("a.name ILIKE $%d" % (len(params) + 1))
-                params.append(f"%{author_name}%")
-            if genre_id:
-                filters.append("b.genre_id = $%d" % (len(params) + 1))
-                params.append(genre_id)
-            if year_from:
-                filters.append("b.published_year >= $%d" % (len(params) + 1))
-                params.append(year_from)
-            if year_to:
-                filters.append("b.published_year <= $%d" % (len(params) + 1))
-                params.append(year_to)
-
-            filter_sql = " AND ".join(filters)
-            if filter_sql:
-                filter_sql = "WHERE " + filter_sql
+                         year_from: Optional[int], year_to: Optional[int],
+                         cursor: Optional[str] = None, search_mode: str = "substring",
+                         conn: Optional[asyncpg.Connection] = None) -> tuple[list[dict], Optional[str]]:
+        async with get_database().acquire(conn, read=True) as conn:
+            filters, params, shape = self.build_list_filters(title, author_name, genre_id, year_from, year_to, search_mode)
+            sort_by, order_field, order_dir = self.resolve_order(sort_by, sort_order, title, author_name, params)
+
+            if cursor:
+                position = decode_cursor(cursor)
+                if position.get("sort_by") != sort_by or position.get("order") != order_dir or "id" not in position:
+                    raise ValueError("Cursor does not match the requested sorting")
+
+                filters.append("(%s, b.id) %s ($%d, $%d)" % (
+                    order_field, "<" if order_dir == "DESC" else ">", len(params) + 1, len(params) + 2
+                ))
+                params.extend([position.get("key"), position["id"]])
+                offset = 0
+
+            else:
+                offset = (page - 1) * limit
 
             query = f"""
-                SELECT
-                    b.id, b.title, b.genre_id, b.published_year,
-                    b.created_by, b.created_at, b.updated_at,
-                    a.id AS author_id, a.name AS author_name,
-                    u.id as user_id, u.username, u.is_admin
-                FROM books b
-                LEFT JOIN book_authors ba ON b.id = ba.book_id
-                LEFT JOIN authors a ON a.id = ba.author_id
-                LEFT JOIN users u ON a.user_id = u.id
-                {filter_sql}
-                ORDER BY {order_field} {order_dir}
-                LIMIT ${len(params)+1} OFFSET ${len(params)+2}
+                WITH page AS (
+                    SELECT
+                        b.id, b.title, b.genre_id, b.published_year,
+                        b.created_by, b.created_at, b.updated_at,
+                        {order_field} AS sort_key
+                    FROM books b
+                    WHERE {" AND ".join(filters)}
+                    ORDER BY sort_key {order_dir}, b.id {order_dir}
+                    LIMIT ${len(params)+1} OFFSET ${len(params)+2}
+                )
+                SELECT b.sort_key, {self.book_columns}
+                FROM page b
+                ORDER BY b.sort_key {order_dir}, b.id {order_dir}
             """
 
-            params.extend([limit, offset])
-            rows = await conn.fetch(query, *params)
-
-            books_dict = {}
-            for row in rows:
-                book_id = row["id"]
-                if book_id not in books_dict:
-                    books_dict[book_id] = {
-                        "id": book_id,
-                        "title": row["title"],
-                        "genre_id": row["genre_id"],
-                        "published_year": row["published_year"],
-                        "created_by": row["created_by"],
-                        "created_at": row["created_at"],
-                        "updated_at": row["updated_at"],
-                        "authors": []
-                    }
-                if row["author_id"]:
-                    books_dict[book_id]["authors"].append({
-                        "id": row["author_id"], 
-                        "name": row["author_name"],
-                        "user": {
-                            "id": row["user_id"],
-                            "username": row["username"],
-                            "is_admin": row["is_admin"]
-                        } if row["user_id"] else None
-                    })
-
-            return list(books_dict.values()) or None
+            params.extend([limit + 1, offset])
+            name = f"books.list:{shape}:{sort_by}:{order_dir.lower()}:{'cursor' if cursor else 'page'}"
+            rows = await self.queries.fetch(conn, name, *params, sql=query)
+
+            books = []
+            for row in rows[:limit]:
+                book = dict(row)
+                book.pop("sort_key")
+                books.append(book)
+
+            next_cursor = None
+            if len(rows) > limit:
+                last = rows[limit - 1]
+                next_cursor = encode_cursor({
+                    "sort_by": sort_by,
+                    "order": order_dir,
+                    "key": last["sort_key"],
+                    "id": last["id"]
+                })
+
+            return books, next_cursor
+
+
+    async def list_author_books(self, author_id: int, limit: int, sort_by: str, sort_order: str,
+                                cursor: Optional[str] = None) -> tuple[list[dict], Optional[str]]:
+        sort_by = sort_by if sort_by in ("id", "title", "year") else "year"
+        order_field = self.sort_map[sort_by]
+        order_dir = "DESC" if sort_order.lower() == "desc" else "ASC"
+        filters = ["ba.author_id = $1"]
+        params = [author_id]
+
+        if cursor:
+            position = decode_cursor(cursor)
+            if position.get("sort_by") != sort_by or position.get("order") != order_dir or "id" not in position:
+                raise ValueError("Cursor does not match the requested sorting")
+
+            filters.append("(%s, b.id) %s ($2, $3)" % (order_field, "<" if order_dir == "DESC" else ">"))
+            params.extend([position.get("key"), position["id"]])
+
+        query = f"""
+            WITH page AS (
+                SELECT b.id, {order_field} AS sort_key
+                FROM book_authors ba
+                JOIN books b ON b.id = ba.book_id
+                WHERE {" AND ".join(filters)}
+                ORDER BY sort_key {order_dir}, b.id {order_dir}
+                LIMIT ${len(params)+1}
+            )
+            SELECT p.sort_key, {self.book_columns}
+            FROM page p
+            JOIN books b ON b.id = p.id
+            ORDER BY p.sort_key {order_dir}, b.id {order_dir}
+        """
+
+        params.append(limit + 1)
+        name = f"books.by_author:{sort_by}:{order_dir.lower()}:{'cursor' if cursor else 'first'}"
+        async with get_database().acquire(read=True) as conn:
+            rows = await self.queries.fetch(conn, name, *params, sql=query)
+
+        books = []
+        for row in rows[:limit]:
+            book = dict(row)
+            book.pop("sort_key")
+            books.append(book)
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor({
+                "sort_by": sort_by,
+                "order": order_dir,
+                "key": last["sort_key"],
+                "id": last["id"]
+            })
 
+        return books, next_cursor
+
+
+    async def count_books(self, title: Optional[str], author_name: Optional[str], genre_id: Optional[int],
+                          year_from: Optional[int], year_to: Optional[int], estimated: bool = False,
+                          search_mode: str = "substring") -> tuple[int, bool]:
+        filters, params, shape = self.build_list_filters(title, author_name, genre_id, year_from, year_to, search_mode)
+        cache_key = (shape, tuple(params), estimated)
+        cached = self.count_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        generation = self.count_cache.generation
+        filter_sql = "WHERE " + " AND ".join(filters)
+
+        async with get_database().acquire(read=True) as conn:
+            result = None
+
+            if estimated:
+                table_rows = await conn.fetchval("SELECT reltuples::bigint FROM pg_class WHERE oid = 'books'::regclass")
+
+                if table_rows is not None and table_rows >= self.estimate_threshold:
+                    if all(param is None for param in params):
+                        result = (table_rows, True)
 
-    async def update_book(self, book_id: int, title: str, genre_id: Optional[int], published_year: int, 
-                          author_ids: list[int], created_by: Optional[int] = None) -> Optional[dict]:
-        async with get_database().get_pool().acquire() as conn:
-            async with conn.transaction():
-                try:
-                    if created_by:
-                        await conn.fetchrow(
-                            """
-                            UPDATE books SET title = $1, genre_id = $2, published_year = $3, created_by = $4
-                            WHERE id = $5
-                            RETURNING id, title, genre_id, published_year, created_at, updated_at
-                            """,
-                            title, genre_id, published_year, created_by, book_id
-                        )
-                        
                     else:
-                        await conn.fetchrow(
-                            """
-                            UPDATE books SET title = $1, genre_id = $2, published_year = $3
-                            WHERE id = $4
-                            RETURNING id, title, genre_id, published_year, created_at, updated_at
-                            """,
-                            title, genre_id, published_year, book_id
-                        )
-                
-                except Exception:
-                    raise ValueError("Book update failed")
-
-                await conn.execute("DELETE FROM book_authors WHERE book_id = $1", book_id)
-
-                try:
-                    for author_id in author_ids:
-                        await conn.execute(
-                            "INSERT INTO book_authors (book_id, author_id) VALUES ($1, $2)",
-                            book_id, author_id
-                        )
-
-                except Exception:
-                    raise ValueError("Author does not exist")
-
-        return await self.get_book(book_id)
-
-
-    async def delete_book(self, book_id: int) -> bool:
-        async with get_database().get_pool().acquire() as conn:
+                        plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM books b {filter_sql}", *params)
+                        result = (int(plan[0]["Plan"]["Plan Rows"]), True)
+
+            if result is None:
+                total = await self.queries.fetchval(conn, f"books.count:{shape}", *params, sql=f"SELECT count(*) FROM books b {filter_sql}")
+                result = (total, False)
+
+            cacheable = get_database().can_cache(conn)
+
+        if cacheable:
+            self.count_cache.set(cache_key, result, generation=generation)
+        return result
+
+
+    async def stream_books(self, sort_by: str, sort_order: str,
+                           title: Optional[str], author_name: Optional[str], genre_id: Optional[int],
+                           year_from: Optional[int], year_to: Optional[int],
+                           search_mode: str = "substring") -> AsyncIterator[asyncpg.Record]:
+        filters, params, _ = self.build_list_filters(title, author_name, genre_id, year_from, year_to, search_mode)
+        _, order_field, order_dir = self.resolve_order(sort_by, sort_order, title, author_name, params)
+
+        query = f"""
+            SELECT
+                b.id, b.title, b.genre_id, b.published_year, b.created_at, b.updated_at,
+                ARRAY(
+                    SELECT a.name FROM book_authors ba
+                    JOIN authors a ON a.id = ba.author_id
+                    WHERE ba.book_id = b.id
+                    ORDER BY a.id
+                ) AS authors
+            FROM books b
+            WHERE {" AND ".join(filters)}
+            ORDER BY {order_field} {order_dir}, b.id {order_dir}
+        """
+
+        async with get_database().acquire(read=True) as conn:
+            async with conn.transaction():
+                async for row in conn.cursor(query, *params, prefetch=self.export_chunk_size):
+                    yield row
+
+
+    def invalidate_counts(self) -> None:
+        self.count_cache.clear()
+
+
+    def invalidate_book(self, book_id: int) -> None:
+        self.invalidate_counts()
+        self.book_cache.delete(book_id)
+
+
+    def invalidate_author(self, author_id: int) -> None:
+        self.invalidate_counts()
+        self.book_cache.delete_where(lambda book: any(author["id"] == author_id for author in book["authors"]))
+
+
+    def invalidate_genre(self, genre_id: int) -> None:
+        self.invalidate_counts()
+        self.book_cache.delete_where(lambda book: book["genre_id"] == genre_id)
+
+
+    def build_list_filters(self, title: Optional[str], author_name: Optional[str], genre_id: Optional[int],
+                           year_from: Optional[int], year_to: Optional[int],
+                           search_mode: str = "substring") -> tuple[list[str], list, str]:
+        filters = []
+        params = []
+        shape = []
+
+        if title:
+            if search_mode == "fuzzy":
+                filters.append(
+                    "(b.search_vector @@ websearch_to_tsquery('simple', $%d) OR $%d <%% b.title)" % (len(params) + 1, len(params) + 1)
+                )
+                params.append(title)
+
+            else:
+                filters.append("b.title ILIKE $%d" % (len(params) + 1))
+                params.append(f"%{title}%")
+            shape.append("title")
+        if author_name:
+            condition = "$%d <%% fa.name" if search_mode == "fuzzy" else "fa.name ILIKE $%d"
+            filters.append(
+                """EXISTS (
+                    SELECT 1 FROM book_authors fba
+                    JOIN authors fa ON fa.id = fba.author_id
+                    WHERE fba.book_id = b.id AND %s
+                )""" % (condition % (len(params) + 1))
+            )
+            params.append(author_name if search_mode == "fuzzy" else f"%{author_name}%")
+            shape.append("author")
+
+        filters.append("($%d::int IS NULL OR b.genre_id = $%d)" % (len(params) + 1, len(params) + 1))
+        params.append(genre_id or None)
+        filters.append("($%d::int IS NULL OR b.published_year >= $%d)" % (len(params) + 1, len(params) + 1))
+        params.append(year_from or None)
+        filters.append("($%d::int IS NULL OR b.published_year <= $%d)" % (len(params) + 1, len(params) + 1))
+        params.append(year_to or None)
+
+        return filters, params, "+".join([search_mode] + shape) if shape else "all"
+
+
+    def resolve_order(self, sort_by: str, sort_order: str, title: Optional[str], author_name: Optional[str],
+                      params: list) -> tuple[str, str, str]:
+        if sort_by == "relevance" and (title or author_name):
+            return sort_by, self.build_relevance(title, author_name, params), "DESC"
+
+        sort_by = sort_by if sort_by in self.sort_map else "title"
+        return sort_by, self.sort_map[sort_by], "DESC" if sort_order.lower() == "desc" else "ASC"
+
+
+    def build_relevance(self, title: Optional[str], author_name: Optional[str], params: list) -> str:
+        scores = []
+
+        if title:
+            params.append(title)
+            scores.append(
+                "ts_rank(b.search_vector, websearch_to_tsquery('simple', $%d)) + word_similarity($%d, b.title)" % (len(params), len(params))
+            )
+        if author_name:
+            params.append(author_name)
+            scores.append(
+                """COALESCE((
+                    SELECT max(word_similarity($%d, ra.name)) FROM book_authors rba
+                    JOIN authors ra ON ra.id = rba.author_id
+                    WHERE rba.book_id = b.id
+                ), 0)""" % len(params)
+            )
+
+        return "(" + " + ".join(scores) + ")"
+
+
+    async def update_book(self, book_id: int, title: str, genre_id: Optional[int], published_year: int, 
+                          author_ids: list[int], created_by: Optional[int] = None, conn: Optional[asyncpg.Connection] = None) -> Optional[dict]:
+        async with get_database().acquire(conn, write=True) as conn:
+            try:
+                rows = await conn.fetch(
+                    f"""
+                    WITH updated AS (
+                        UPDATE books SET title = $1, genre_id = $2, published_year = $3,
+                            created_by = COALESCE($4, created_by)
+                        WHERE id = $5
+                        RETURNING id, title, genre_id, published_year, created_by, created_at, updated_at
+                    ),
+                    wanted AS (
+                        SELECT DISTINCT unnest($6::int[]) AS author_id
+                    ),
+                    removed AS (
+                        DELETE FROM book_authors ba
+                        USING updated
+                        WHERE ba.book_id = updated.id AND ba.author_id <> ALL($6::int[])
+                    ),
+                    added AS (
+                        INSERT INTO book_authors (book_id, author_id)
+                        SELECT updated.id, w.author_id FROM updated, wanted w
+                        ON CONFLICT DO NOTHING
+                    )
+                    SELECT {self.written_book_columns} FROM updated b
+                    """,
+                    title, genre_id, published_year, created_by or None, book_id, author_ids
+                )
+
+            except asyncpg.ForeignKeyViolationError as e:
+                raise ValueError(self.foreign_key_error(e))
+
+            except Exception:
+                raise ValueError("Book update failed")
+
+            get_database().after_commit(conn, lambda: self.invalidate_book(book_id))
+            return dict(rows[0]) if rows else None
+
+
+    async def delete_book(self, book_id: int, conn: Optional[asyncpg.Connection] = None) -> bool:
+        async with get_database().acquire(conn, write=True) as conn:
             try:
                 await conn.execute("DELETE FROM books WHERE id = $1", book_id)
 
             except Exception:
                 raise ValueError("Book deletion failed")
 
+            get_database().after_commit(conn, lambda: self.invalidate_book(book_id))
             return True
 
 
-    async def get_user_author(self, user_id: int) -> Optional[dict]:
-        async with get_database().get_pool().acquire() as conn:
-            row = await conn.fetchrow("SELECT id, name FROM authors WHERE user_id = $1", user_id)
+    async def bulk_delete_books(self, book_ids: Optional[list[int]], title: Optional[str], author_name: Optional[str],
+                                genre_id: Optional[int], year_from: Optional[int], year_to: Optional[int],
+                                dry_run: bool = False) -> list[int]:
+        filters, params = self.build_bulk_filters(book_ids, title, author_name, genre_id, year_from, year_to)
+        return await self.run_bulk(f"DELETE FROM books b WHERE {' AND '.join(filters)} RETURNING b.id", filters, params, dry_run)
+
+
+    async def bulk_update_genre(self, new_genre_id: Optional[int], book_ids: Optional[list[int]], title: Optional[str],
+                                author_name: Optional[str], genre_id: Optional[int], year_from: Optional[int],
+                                year_to: Optional[int], dry_run: bool = False) -> list[int]:
+        filters, params = self.build_bulk_filters(book_ids, title, author_name, genre_id, year_from, year_to)
+        filters.append("b.genre_id IS DISTINCT FROM $%d::int" % (len(params) + 1))
+        params.append(new_genre_id)
+        return await self.run_bulk(
+            f"UPDATE books b SET genre_id = ${len(params)} WHERE {' AND '.join(filters)} RETURNING b.id",
+            filters, params, dry_run
+        )
+
+
+    async def bulk_set_created_by(self, created_by: int, book_ids: Optional[list[int]], title: Optional[str],
+                                  author_name: Optional[str], genre_id: Optional[int], year_from: Optional[int],
+                                  year_to: Optional[int], dry_run: bool = False) -> list[int]:
+        filters, params = self.build_bulk_filters(book_ids, title, author_name, genre_id, year_from, year_to)
+        filters.append("b.created_by IS DISTINCT FROM $%d::int" % (len(params) + 1))
+        params.append(created_by)
+        return await self.run_bulk(
+            f"UPDATE books b SET created_by = ${len(params)} WHERE {' AND '.join(filters)} RETURNING b.id",
+            filters, params, dry_run
+        )
+
+
+    def build_bulk_filters(self, book_ids: Optional[list[int]], title: Optional[str], author_name: Optional[str],
+                           genre_id: Optional[int], year_from: Optional[int], year_to: Optional[int]) -> tuple[list[str], list]:
+        if not (book_ids or title or author_name or genre_id or year_from or year_to):
+            raise ValueError("ids or at least one filter is required")
+
+        filters, params, _ = self.build_list_filters(title, author_name, genre_id, year_from, year_to)
+        if book_ids:
+            filters.append("b.id = ANY($%d::int[])" % (len(params) + 1))
+            params.append(book_ids)
+
+        return filters, params
+
+
+    async def run_bulk(self, statement: str, filters: list[str], params: list, dry_run: bool) -> list[int]:
+        async with get_database().acquire(write=True) as conn:
+            try:
+                async with conn.transaction():
+                    if dry_run:
+                        rows = await conn.fetch(f"SELECT b.id FROM books b WHERE {' AND '.join(filters)}", *params)
+
+                    else:
+                        rows = await conn.fetch(statement, *params)
+
+            except asyncpg.ForeignKeyViolationError as e:
+                raise ValueError(self.foreign_key_error(e))
+
+        book_ids = sorted(row["id"] for row in rows)
+        if book_ids and not dry_run:
+            affected = set(book_ids)
+            self.invalidate_counts()
+            self.book_cache.delete_where(lambda book: book["id"] in affected)
+
+        return book_ids
+
+
+    async def get_user_author(self, user_id: int, conn: Optional[asyncpg.Connection] = None) -> Optional[dict]:
+        async with get_database().acquire(conn) as conn:
+            row = await self.queries.fetchrow(conn, "books.user_author", user_id)
             if not row:
                 return None
             
             return dict(row)
 
 
-    async def check_book_creator(self, book_id: int, user_id: int) -> bool:
-        async with get_database().get_pool().acquire() as conn:
-            row = await conn.fetchrow("SELECT created_by FROM books WHERE id = $1", book_id)
+    async def check_book_creator(self, book_id: int, user_id: int, conn: Optional[asyncpg.Connection] = None) -> bool:
+        async with get_database().acquire(conn) as conn:
+            row = await self.queries.fetchrow(conn, "books.creator", book_id)
             if not row:
                 return False
             
             return row["created_by"] == user_id
 
 
-    def generate_response(self, book: dict, authors: list) -> dict:
+    def foreign_key_error(self, error: asyncpg.ForeignKeyViolationError) -> str:
+        if error.table_name == "book_authors":
+            return "Author does not exist"
+
+        if "genre" in (error.constraint_name or ""):
+            return "Genre does not exist"
+
+        return "User does not exist"
+
+
+    def serialize_export_row(self, row: asyncpg.Record) -> dict:
         return {
-            "id": book["id"],
-            "title": book["title"],
-            "genre_id": book.get("genre_id"),
-            "published_year": book["published_year"],
-            "authors": [
-                {
-                    "id": author["id"], 
-                    "name": author["name"], 
-                    "user": {
-                        "id": author["user_id"],
-                        "username": author["username"],
-                        "is_admin": author["is_admin"]
-                    } if author["user_id"] else None
-                } for author in authors
-            ],
-            "created_at": book["created_at"],
-            "updated_at": book["updated_at"]
+            "id": row["id"],
+            "title": row["title"],
+            "genre_id": row["genre_id"],
+            "published_year": row["published_year"],
+            "authors": list(row["authors"]),
+            "created_at": row["created_at"].isoformat(),
+            "updated_at": row["updated_at"].isoformat()
         }
-    
 
-    def parse_json_file(self, content: bytes, author_id: int) -> Optional[list[dict]]:
-        data = json.loads(content.decode('utf-8'))
 
-        for book in data:
-            if not isinstance(book, dict):
-                return [{"title": None, "error": "Invalid book format in JSON file"}]
-            
-            if author_id not in book.get("author_ids", []):
-                return [{"title": book.get("title", None), "error": "Author must be one of the authors of the book"}]
-            
-        return data
+    async def export_json(self, rows: AsyncIterator[asyncpg.Record]) -> AsyncIterator[bytes]:
+        chunk = []
+        separator = ""
+        yield b"["
 
+        async for row in rows:
+            chunk.append(separator + json.dumps(self.serialize_export_row(row)))
+            separator = ","
 
-    def parse_csv_file(self, content: bytes, author_id: int) -> Optional[list[dict]]:
-        text = content.decode("utf-8").splitlines()
-        reader = csv.DictReader(text)
-        data = []
+            if len(chunk) >= self.export_chunk_size:
+                yield "".join(chunk).encode("utf-8")
+                chunk = []
 
-        for row in reader:
-            try:
-                authors_id = json.loads(row["author_ids"])
+        chunk.append("]")
+        yield "".join(chunk).encode("utf-8")
 
-            except Exception:
-                return [{"title": row.get("title", None), "error": "Invalid author_ids format in CSV file"}]
-            
-            if author_id not in authors_id:
-                return [{"title": row.get("title", None), "error": "Author must be one of the authors of the book"}]
-            
-            if not row["title"] or not row["published_year"]:
-                return [{"title": row.get("title", None), "error": "Title and published_year are required"}]
-            
-            data.append({
-                "title": row["title"],
-                "genre_id": int(row["genre_id"]) if row["genre_id"] else None,
-                "published_year": int(row["published_year"]),
-                "author_ids": authors_id
-            })
 
-        return data
-    
-
-    def serialize_export_json(self, books: list[dict]) -> list:
-        output = []
-
-        for book in books:
-            output.append({
-                "id": book["id"],
-                "title": book["title"],
-                "genre_id": book.get("genre_id"),
-                "published_year": book["published_year"],
-                "authors": [a["name"] for a in book.get("authors", [])],
-                "created_at": book["created_at"].isoformat(),
-                "updated_at": book["updated_at"].isoformat()
-            })
+    async def export_ndjson(self, rows: AsyncIterator[asyncpg.Record]) -> AsyncIterator[bytes]:
+        chunk = []
+
+        async for row in rows:
+            chunk.append(json.dumps(self.serialize_export_row(row)) + "\n")
 
-        return output
+            if len(chunk) >= self.export_chunk_size:
+                yield "".join(chunk).encode("utf-8")
+                chunk = []
 
+        if chunk:
+            yield "".join(chunk).encode("utf-8")
 
-    def generate_export_csv(self, books: list[dict]) -> Iterator[str]:
+
+    async def export_csv(self, rows: AsyncIterator[asyncpg.Record]) -> AsyncIterator[bytes]:
         output = io.StringIO()
         writer = csv.writer(output)
         writer.writerow(["id", "title", "genre_id", "published_year", "authors", "created_at", "updated_at"])
+        count = 0
 
-        for book in books:
+        async for row in rows:
+            book = self.serialize_export_row(row)
             writer.writerow([
                 book["id"],
                 book["title"],
-                book.get("genre_id"),
+                book["genre_id"],
                 book["published_year"],
-                "; ".join([a["name"] for a in book.get("authors", [])]),
-                book["created_at"].isoformat(),
-                book["updated_at"].isoformat()
+                "; ".join(book["authors"]),
+                book["created_at"],
+                book["updated_at"]
             ])
+            count += 1
+
+            if count % self.export_chunk_size == 0:
+                yield output.getvalue().encode("utf-8")
+                output.seek(0)
+                output.truncate(0)
 
-        output.seek(0)
-        return iter([output.getvalue()])
\ No newline at end of file
+        yield output.getvalue().encode("utf-8")
\ No newline at end of file
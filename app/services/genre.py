@@ -1,34 +1,64 @@
 from typing import Optional
 
+import asyncpg
+
+from app import BaseConfig
 from app.database import get_database
-from app.utils import SingletonMeta
+from app.queries import get_query_registry
+from app.services.books import BookService
+from app.utils import SingletonMeta, LRUCache
 
 
 class GenreService(metaclass=SingletonMeta):
 
-    async def select_genre(self) -> Optional[list]:
-        async with get_database().get_pool().acquire() as conn:
-            rows = await conn.fetch("SELECT * FROM genres")
+    def __init__(self):
+        self.genre_cache = LRUCache(
+            maxsize=int(BaseConfig.get("READ_CACHE_SIZE") or 1024),
+            ttl=float(BaseConfig.get("READ_CACHE_TTL") or 60)
+        )
+        self.queries = get_query_registry()
+        self.queries.register("genres.list", "SELECT * FROM genres")
+        self.queries.register("genres.get", "SELECT * FROM genres WHERE id = $1")
+
+    async def select_genre(self, conn: Optional[asyncpg.Connection] = None) -> Optional[list]:
+        genres = self.genre_cache.get("all")
+        if genres is not None:
+            return genres
+
+        generation = self.genre_cache.generation
+        async with get_database().acquire(conn, read=True) as conn:
+            rows = await self.queries.fetch(conn, "genres.list")
 
             if rows:
-                return [{
+                genres = [{
                     "id": row["id"],
                     "name": row["name"]
                 } for row in rows]
+                if get_database().can_cache(conn):
+                    self.genre_cache.set("all", genres, generation=generation)
+                return genres
 
             return None
         
     
-    async def get_genre(self, genre_id: int) -> Optional[dict]:
-        async with get_database().get_pool().acquire() as conn:
-            row = await conn.fetchrow("SELECT * FROM genres WHERE id = $1", genre_id)
+    async def get_genre(self, genre_id: int, conn: Optional[asyncpg.Connection] = None) -> Optional[dict]:
+        genre = self.genre_cache.get(genre_id)
+        if genre is not None:
+            return genre
+
+        generation = self.genre_cache.generation
+        async with get_database().acquire(conn, read=True) as conn:
+            row = await self.queries.fetchrow(conn, "genres.get", genre_id)
 
             if row:
-                return dict(row)
+                genre = dict(row)
+                if get_database().can_cache(conn):
+                    self.genre_cache.set(genre_id, genre, generation=generation)
+                return genre
 
 
-    async def create_genre(self, name: str) -> Optional[dict]:
-        async with get_database().get_pool().acquire() as conn:
+    async def create_genre(self, name: str, conn: Optional[asyncpg.Connection] = None) -> Optional[dict]:
+        async with get_database().acquire(conn, write=True) as conn:
             try:
                 create_query = "INSERT INTO genres (name) VALUES ($1) RETURNING id, name"
                 create_row = await conn.fetchrow(create_query, name)
@@ -36,14 +66,16 @@ class GenreService(metaclass=SingletonMeta):
             except Exception:
                 raise ValueError("Genre creation failed")
 
+            get_database().after_commit(conn, self.genre_cache.clear)
+
             if create_row:
                 return dict(create_row)
 
             return None
 
 
-    async def update_genre(self, name: str, genre_id: int) -> Optional[dict]:
-        async with get_database().get_pool().acquire() as conn:
+    async def update_genre(self, name: str, genre_id: int, conn: Optional[asyncpg.Connection] = None) -> Optional[dict]:
+        async with get_database().acquire(conn, write=True) as conn:
             try:
                 update_query = "UPDATE genres SET name = $1 WHERE id = $2 RETURNING id, name"
                 update_row = await conn.fetchrow(update_query, name, genre_id)
@@ -51,18 +83,26 @@ class GenreService(metaclass=SingletonMeta):
             except Exception:
                 raise ValueError("Genre updating failed")
 
+            get_database().after_commit(conn, self.genre_cache.clear)
+
             if update_row:
                 return dict(update_row)
 
             return None
 
 
-    async def delete_genre(self, genre_id: int) -> bool:
-        async with get_database().get_pool().acquire() as conn:
+    async def delete_genre(self, genre_id: int, conn: Optional[asyncpg.Connection] = None) -> bool:
+        async with get_database().acquire(conn, write=True) as conn:
             try:
                 await conn.execute("DELETE FROM genres WHERE id = $1", genre_id)
 
             except Exception:
                 raise ValueError("Genre deletion failed")
 
-            return True
\ No newline at end of file
+            get_database().after_commit(conn, lambda: self.invalidate(genre_id))
+            return True
+
+
+    def invalidate(self, genre_id: int) -> None:
+        self.genre_cache.clear()
+        BookService().invalidate_genre(genre_id)
\ No newline at end of file
@@ -0,0 +1,439 @@
+import os, json, csv, io, shutil, asyncio, logging, tempfile
+from contextlib import aclosing
+from itertools import islice
+from typing import Optional, Iterator, BinaryIO
+
+from starlette.concurrency import run_in_threadpool
+
+from app import BaseConfig
+from app.database import get_database
+from app.services.books import BookService
+from app.utils import SingletonMeta
+
+
+logger = logging.getLogger(__name__)
+
+
+class ImportService(metaclass=SingletonMeta):
+
+    def __init__(self):
+        self.batch_size = int(BaseConfig.get("BOOK_IMPORT_BATCH_SIZE") or 1000) or 1000
+        self.read_chunk_size = int(BaseConfig.get("BOOK_IMPORT_READ_CHUNK_SIZE") or 65536)
+        self.max_row_size = int(BaseConfig.get("BOOK_IMPORT_MAX_ROW_SIZE") or 1048576)
+        self.formats = (".csv", ".json", ".ndjson")
+        self.jobs_dir = BaseConfig.get("IMPORT_JOBS_DIR") or os.path.join(tempfile.gettempdir(), "book_imports")
+        self.max_job_errors = int(BaseConfig.get("IMPORT_JOB_MAX_ERRORS") or 100)
+        self.stale_job_seconds = int(BaseConfig.get("IMPORT_JOB_STALE_SECONDS") or 300)
+        self.workers = asyncio.Semaphore(int(BaseConfig.get("IMPORT_JOB_WORKERS") or 2))
+        self.tasks: dict[int, asyncio.Task] = {}
+        self.job_columns = """
+            id, user_id, author_id, filename, status, rows_done, rows_failed,
+            bytes_done, bytes_total, errors, error, started_at, finished_at, created_at, updated_at,
+            EXTRACT(EPOCH FROM (COALESCE(finished_at, CURRENT_TIMESTAMP) - started_at))::float AS elapsed
+        """
+
+
+    async def import_file(self, file: BinaryIO, filename: str, author_id: int, created_by: int) -> tuple[list[dict], list[dict]]:
+        created_books = []
+        error_books = []
+
+        async for books, errors in self.iter_batches(file, filename, author_id):
+            error_books.extend(errors)
+
+            if books:
+                created, errors = await BookService().bulk_create_books(books, created_by)
+                created_books.extend(created)
+                error_books.extend(errors)
+
+        return created_books, error_books
+
+
+    async def create_job(self, file: BinaryIO, filename: str, author_id: int, user_id: int) -> dict:
+        os.makedirs(self.jobs_dir, exist_ok=True)
+        fd, file_path = tempfile.mkstemp(dir=self.jobs_dir, suffix=os.path.splitext(filename)[1])
+
+        with os.fdopen(fd, "wb") as destination:
+            await run_in_threadpool(shutil.copyfileobj, file, destination)
+
+        async with get_database().acquire() as conn:
+            row = await conn.fetchrow(
+                f"""
+                INSERT INTO import_jobs (user_id, author_id, filename, file_path, bytes_total)
+                VALUES ($1, $2, $3, $4, $5)
+                RETURNING {self.job_columns}
+                """,
+                user_id, author_id, filename, file_path, os.path.getsize(file_path)
+            )
+
+        self.start_job(row["id"])
+        return self.generate_job_response(row)
+
+
+    async def get_job(self, job_id: int) -> Optional[dict]:
+        async with get_database().acquire() as conn:
+            row = await conn.fetchrow(f"SELECT {self.job_columns} FROM import_jobs WHERE id = $1", job_id)
+
+            if row:
+                return self.generate_job_response(row)
+
+            return None
+
+
+    async def cancel_job(self, job_id: int) -> Optional[dict]:
+        async with get_database().acquire() as conn:
+            row = await conn.fetchrow(
+                f"""
+                UPDATE import_jobs SET status = 'cancelled', finished_at = CURRENT_TIMESTAMP
+                WHERE id = $1 AND status IN ('queued', 'running')
+                RETURNING {self.job_columns}, file_path
+                """,
+                job_id
+            )
+
+        if not row:
+            return await self.get_job(job_id)
+
+        task = self.tasks.get(job_id)
+        if task:
+            task.cancel()
+
+        if os.path.exists(row["file_path"]):
+            os.remove(row["file_path"])
+
+
+        return self.generate_job_response(row)
+
+
+    def start_job(self, job_id: int) -> None:
+        if job_id not in self.tasks:
+            task = asyncio.create_task(self.run_job(job_id))
+            self.tasks[job_id] = task
+            task.add_done_callback(lambda _: self.tasks.pop(job_id, None))
+
+
+    async def resume_jobs(self) -> None:
+        async with get_database().acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT id FROM import_jobs
+                WHERE status = 'queued'
+                    OR (status = 'running' AND heartbeat_at < CURRENT_TIMESTAMP - make_interval(secs => $1))
+                ORDER BY id
+                """,
+                self.stale_job_seconds
+            )
+
+        for row in rows:
+            self.start_job(row["id"])
+
+
+    async def shutdown(self) -> None:
+        job_ids = list(self.tasks)
+        for task in list(self.tasks.values()):
+            task.cancel()
+
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+
+        if job_ids:
+            async with get_database().acquire() as conn:
+                await conn.execute(
+                    "UPDATE import_jobs SET status = 'queued' WHERE id = ANY($1::int[]) AND status = 'running'",
+                    job_ids
+                )
+
+
+    async def run_job(self, job_id: int) -> None:
+        async with self.workers:
+            async with get_database().acquire() as conn:
+                job = await conn.fetchrow(
+                    """
+                    UPDATE import_jobs
+                    SET status = 'running', heartbeat_at = CURRENT_TIMESTAMP,
+                        started_at = COALESCE(started_at, CURRENT_TIMESTAMP)
+                    WHERE id = $1 AND (
+                        status = 'queued'
+                        OR (status = 'running' AND heartbeat_at < CURRENT_TIMESTAMP - make_interval(secs => $2))
+                    )
+                    RETURNING id, user_id, author_id, filename, file_path, rows_done, rows_failed
+                    """,
+                    job_id, self.stale_job_seconds
+                )
+
+            if not job:
+                return
+
+            try:
+                if not os.path.exists(job["file_path"]):
+                    raise FileNotFoundError("Import file is no longer available")
+
+                with open(job["file_path"], "rb") as file:
+                    batches = self.iter_batches(file, job["filename"], job["author_id"],
+                                                skip=job["rows_done"] + job["rows_failed"])
+
+                    async with aclosing(batches):
+                        async for books, errors in batches:
+                            if not await self.save_batch(job, books, errors, file.tell()):
+                                break
+
+                await self.finish_job(job_id, "completed")
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                logger.exception("Import job %s failed", job_id)
+                await self.finish_job(job_id, "failed", str(e))
+
+            else:
+                BookService().invalidate_counts()
+
+
+    async def save_batch(self, job: dict, books: list[dict], errors: list[dict], bytes_done: int) -> bool:
+        async with get_database().acquire(write=True) as conn:
+            async with conn.transaction():
+                status = await conn.fetchval("SELECT status FROM import_jobs WHERE id = $1 FOR UPDATE", job["id"])
+                if status != "running":
+                    return False
+
+                book_ids = []
+                if books:
+                    book_ids, insert_errors = await BookService().insert_books_batch(conn, books, job["user_id"])
+                    errors = errors + insert_errors
+
+                await conn.execute(
+                    """
+                    UPDATE import_jobs SET
+                        rows_done = rows_done + $2,
+                        rows_failed = rows_failed + $3,
+                        bytes_done = $4,
+                        errors = (
+                            SELECT COALESCE(jsonb_agg(e), '[]'::jsonb)
+                            FROM (SELECT e FROM jsonb_array_elements(errors || $5::jsonb) AS e LIMIT $6) AS t
+                        ),
+                        heartbeat_at = CURRENT_TIMESTAMP
+                    WHERE id = $1
+                    """,
+                    job["id"], len(book_ids), len(errors), bytes_done,
+                    errors[:self.max_job_errors], self.max_job_errors
+                )
+
+        return True
+
+
+    async def finish_job(self, job_id: int, status: str, error: Optional[str] = None) -> None:
+        async with get_database().acquire() as conn:
+            file_path = await conn.fetchval(
+                """
+                UPDATE import_jobs SET status = $2, error = $3, finished_at = CURRENT_TIMESTAMP
+                WHERE id = $1 AND status = 'running'
+                RETURNING file_path
+                """,
+                job_id, status, error
+            )
+
+            if file_path is None:
+                file_path = await conn.fetchval(
+                    "SELECT file_path FROM import_jobs WHERE id = $1 AND status = 'cancelled'", job_id
+                )
+
+        if file_path and os.path.exists(file_path):
+            os.remove(file_path)
+
+
+    def generate_job_response(self, job) -> dict:
+        processed = job["rows_done"] + job["rows_failed"]
+        throughput = None
+        eta_seconds = None
+
+        elapsed = job["elapsed"]
+        if elapsed:
+            if elapsed > 0 and processed:
+                throughput = processed / elapsed
+
+            if elapsed > 0 and job["bytes_done"] and job["status"] == "running":
+                bytes_per_second = job["bytes_done"] / elapsed
+                eta_seconds = max(job["bytes_total"] - job["bytes_done"], 0) / bytes_per_second
+
+        return {
+            "id": job["id"],
+            "user_id": job["user_id"],
+            "filename": job["filename"],
+            "status": job["status"],
+            "rows_done": job["rows_done"],
+            "rows_failed": job["rows_failed"],
+            "bytes_done": job["bytes_done"],
+            "bytes_total": job["bytes_total"],
+            "throughput": throughput,
+            "eta_seconds": eta_seconds,
+            "errors": job["errors"] or [],
+            "error": job["error"],
+            "created_at": job["created_at"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"]
+        }
+
+
+    async def iter_batches(self, file: BinaryIO, filename: str, author_id: int, skip: int = 0):
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        rows = islice(self.iter_rows(text, filename), skip, None)
+
+        try:
+            while True:
+                chunk = await run_in_threadpool(lambda: list(islice(rows, self.batch_size)))
+                if not chunk:
+                    break
+
+                books = []
+                errors = []
+
+                for row in chunk:
+                    book, error = self.validate_row(row, author_id)
+                    if error:
+                        errors.append(error)
+                    else:
+                        books.append(book)
+
+                yield books, errors
+
+        finally:
+            text.detach()
+
+
+    def iter_rows(self, text: io.TextIOBase, filename: str) -> Iterator:
+        if filename.endswith(".csv"):
+            return self.iter_csv_rows(text)
+
+        return self.iter_json_rows(text)
+
+
+    def iter_csv_rows(self, text: io.TextIOBase) -> Iterator:
+        reader = csv.DictReader(text)
+
+        try:
+            for row in reader:
+                yield row
+
+        except csv.Error as e:
+            yield {"title": None, "error": f"Invalid CSV file: {e}"}
+
+
+    def iter_json_rows(self, text: io.TextIOBase) -> Iterator:
+        decoder = json.JSONDecoder()
+        buffer = ""
+        pos = 0
+        offset = 0
+        eof = False
+
+        def read_more():
+            nonlocal buffer, pos, offset, eof
+            chunk = text.read(self.read_chunk_size)
+            eof = not chunk
+            buffer = buffer[pos:] + chunk
+            offset += pos
+            pos = 0
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos].isspace():
+                    pos += 1
+
+                if pos < len(buffer) or eof:
+                    return
+
+                read_more()
+
+        skip_whitespace()
+        in_array = pos < len(buffer) and buffer[pos] == "["
+        if in_array:
+            pos += 1
+
+        expect_comma = False
+
+        while True:
+            skip_whitespace()
+
+            if pos >= len(buffer):
+                if in_array:
+                    yield {"title": None, "error": "Invalid JSON file: unexpected end of file"}
+                return
+
+            if in_array and buffer[pos] == "]":
+                return
+
+            if expect_comma:
+                if in_array:
+                    if buffer[pos] != ",":
+                        yield {"title": None, "error": "Invalid JSON file: expected ',' between books"}
+                        return
+                    pos += 1
+
+                expect_comma = False
+                continue
+
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+
+            except json.JSONDecodeError as e:
+                if eof:
+                    yield {"title": None, "error": f"Invalid JSON file: {e.msg}"}
+                    return
+
+                if len(buffer) - pos > self.max_row_size:
+                    yield {"title": None, "error": f"Invalid JSON file: book at character {offset + pos} is larger than {self.max_row_size} characters"}
+                    return
+
+                read_more()
+                continue
+
+            if end == len(buffer) and not eof:
+                read_more()
+                continue
+
+            yield item
+            pos = end
+            expect_comma = True
+
+            if pos > self.read_chunk_size:
+                buffer = buffer[pos:]
+                offset += pos
+                pos = 0
+
+
+    def validate_row(self, row, author_id: int) -> tuple[Optional[dict], Optional[dict]]:
+        if not isinstance(row, dict):
+            return None, {"title": "", "error": "Invalid book format"}
+
+        title = row.get("title")
+        if "error" in row and title is None:
+            return None, {"title": "", "error": row["error"]}
+
+        author_ids = row.get("author_ids")
+        if isinstance(author_ids, str):
+            try:
+                author_ids = json.loads(author_ids)
+
+            except Exception:
+                return None, {"title": str(title or ""), "error": "Invalid author_ids format"}
+
+        if not isinstance(author_ids, list):
+            return None, {"title": str(title or ""), "error": "Invalid author_ids format"}
+
+        if author_id not in author_ids:
+            return None, {"title": str(title or ""), "error": "Author must be one of the authors of the book"}
+
+        if not title or not row.get("published_year"):
+            return None, {"title": str(title or ""), "error": "Title and published_year are required"}
+
+        try:
+            book = {
+                "title": str(title),
+                "genre_id": int(row["genre_id"]) if row.get("genre_id") not in (None, "") else None,
+                "published_year": int(row["published_year"]),
+                "author_ids": [int(i) for i in author_ids]
+            }
+
+        except (TypeError, ValueError):
+            return None, {"title": str(title), "error": "Invalid book format"}
+
+        return book, None
\ No newline at end of file
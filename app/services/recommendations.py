@@ -0,0 +1,271 @@
+import io
+import time
+import asyncio
+
+import asyncpg
+from starlette.concurrency import run_in_threadpool
+
+from app import BaseConfig
+from app.database import get_database
+from app.queries import get_query_registry
+from app.services.books import BookService
+from app.utils import SingletonMeta, LRUCache
+
+
+class RecommendationService(metaclass=SingletonMeta):
+
+    def __init__(self):
+        self.action_weights = {"view": 1.0, "open": 2.0, "favorite": 4.0, "export": 2.0}
+        self.top_k = int(BaseConfig.get("RECOMMENDATION_TOP_K") or 20)
+        self.content_weight = float(BaseConfig.get("RECOMMENDATION_CONTENT_WEIGHT") or 0.3)
+        self.history_size = int(BaseConfig.get("RECOMMENDATION_HISTORY_SIZE") or 20)
+        self.chunk_size = int(BaseConfig.get("RECOMMENDATION_CHUNK_SIZE") or 2000)
+        self.cache = LRUCache(
+            maxsize=int(BaseConfig.get("RECOMMENDATION_CACHE_SIZE") or 4096),
+            ttl=float(BaseConfig.get("RECOMMENDATION_CACHE_TTL") or 60)
+        )
+        self.rebuild_lock = asyncio.Lock()
+        self.queries = get_query_registry()
+        self.queries.register(
+            "recommendations.for_user",
+            """
+            WITH seen AS (
+                SELECT DISTINCT book_id FROM (
+                    SELECT book_id FROM user_activity
+                    WHERE user_id = $1
+                    ORDER BY id DESC
+                    LIMIT $2
+                ) recent
+            )
+            SELECT r.similar_book_id AS book_id, sum(r.score)::float AS score
+            FROM seen s
+            JOIN book_recommendations r ON r.book_id = s.book_id
+            WHERE NOT EXISTS (SELECT 1 FROM seen x WHERE x.book_id = r.similar_book_id)
+            GROUP BY r.similar_book_id
+            ORDER BY score DESC, r.similar_book_id
+            LIMIT $3
+            """
+        )
+
+
+    async def recommend(self, user_id: int, limit: int) -> list[dict]:
+        cached = self.cache.get((user_id, limit))
+        if cached is not None:
+            return cached
+
+        generation = self.cache.generation
+        async with get_database().acquire(read=True) as conn:
+            rows = await self.queries.fetch(conn, "recommendations.for_user", user_id, self.history_size, limit)
+            cacheable = get_database().can_cache(conn)
+
+        books = await BookService().get_books([row["book_id"] for row in rows])
+        recommendations = [{"book": books[row["book_id"]], "score": row["score"]} for row in rows if row["book_id"] in books]
+
+        if cacheable:
+            self.cache.set((user_id, limit), recommendations, generation=generation)
+        return recommendations
+
+
+    async def rebuild(self, full: bool = False) -> dict:
+        if self.rebuild_lock.locked():
+            raise RuntimeError("Recommendation rebuild is already running")
+
+        async with self.rebuild_lock:
+            started_at = time.perf_counter()
+
+            async with get_database().acquire(read=True) as conn:
+                async with conn.transaction(isolation="repeatable_read", readonly=True):
+                    last_id = await conn.fetchval("SELECT version FROM table_versions WHERE name = 'recommendations'") or 0
+                    max_id = await conn.fetchval("SELECT COALESCE(max(id), 0) FROM user_activity")
+
+                    if not full and max_id == last_id:
+                        return {"full": False, "books": 0, "neighbours": 0, "activity_id": max_id, "seconds": 0.0}
+
+                    activity = await self.read_matrix(
+                        conn, 3,
+                        """
+                        SELECT a.user_id, a.book_id, sum(w.weight)
+                        FROM user_activity a
+                        JOIN unnest($1::text[], $2::float8[]) AS w(action, weight) ON w.action = a.action
+                        WHERE a.id <= $3
+                        GROUP BY a.user_id, a.book_id
+                        """,
+                        list(self.action_weights), list(self.action_weights.values()), max_id
+                    )
+                    books = await self.read_matrix(conn, 3, "SELECT id, COALESCE(genre_id, 0), COALESCE(published_year, 0) FROM books ORDER BY id")
+                    book_authors = await self.read_matrix(conn, 2, "SELECT book_id, author_id FROM book_authors")
+
+                    if full or not last_id:
+                        dirty = books[:, 0]
+                        full = True
+
+                    else:
+                        dirty = await self.read_matrix(
+                            conn, 1,
+                            """
+                            SELECT DISTINCT book_id FROM user_activity
+                            WHERE id <= $2 AND user_id IN (SELECT user_id FROM user_activity WHERE id > $1 AND id <= $2)
+                            """,
+                            last_id, max_id
+                        )
+                        dirty = dirty[:, 0]
+
+            model = await run_in_threadpool(self.build_model, books, book_authors, activity)
+            rows = await run_in_threadpool(self.dirty_rows, model, dirty)
+            neighbours = 0
+
+            for start in range(0, len(rows), self.chunk_size):
+                chunk = rows[start:start + self.chunk_size]
+                book_ids, similar_ids, scores = await run_in_threadpool(self.score_chunk, model, chunk)
+
+                async with get_database().acquire(write=True) as conn:
+                    async with conn.transaction():
+                        await conn.execute("DELETE FROM book_recommendations WHERE book_id = ANY($1::int[])", model["book_ids"][chunk].tolist())
+                        await conn.copy_records_to_table(
+                            "book_recommendations",
+                            records=zip(book_ids.tolist(), similar_ids.tolist(), scores.tolist()),
+                            columns=["book_id", "similar_book_id", "score"]
+                        )
+
+                neighbours += len(scores)
+
+            async with get_database().acquire(write=True) as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO table_versions (name, version, updated_at) VALUES ('recommendations', $1, clock_timestamp())
+                    ON CONFLICT (name) DO UPDATE SET version = EXCLUDED.version, updated_at = EXCLUDED.updated_at
+                    """,
+                    max_id
+                )
+                await conn.execute("ANALYZE book_recommendations")
+
+            self.cache.clear()
+            return {
+                "full": full,
+                "books": len(rows),
+                "neighbours": neighbours,
+                "activity_id": max_id,
+                "seconds": time.perf_counter() - started_at
+            }
+
+
+    async def read_matrix(self, conn: asyncpg.Connection, columns: int, query: str, *args):
+        try:
+            import numpy as np
+
+        except ImportError:
+            raise RuntimeError("Recommendation rebuild requires the 'recommendations' extra (numpy, scipy)")
+
+        output = io.BytesIO()
+        await conn.copy_from_query(query, *args, output=output, format="csv")
+
+        if not output.getbuffer().nbytes:
+            return np.empty((0, columns))
+
+        output.seek(0)
+        return np.loadtxt(output, delimiter=",", ndmin=2)
+
+
+    def build_model(self, books, book_authors, activity) -> dict:
+        import numpy as np
+        from scipy import sparse
+
+        book_ids = books[:, 0].astype(np.int64)
+        genres = books[:, 1].astype(np.int64)
+        n = len(book_ids)
+
+        def inverse(values):
+            return np.divide(1.0, values, out=np.zeros_like(values, dtype=np.float64), where=values > 0)
+
+        positions, known = self.book_positions(book_ids, activity[:, 1])
+        users, user_rows = np.unique(activity[known, 0], return_inverse=True)
+        interactions = sparse.csr_matrix(
+            (np.log1p(activity[known, 2]), (user_rows, positions[known])), shape=(len(users), n)
+        )
+        popularity = np.asarray(interactions.sum(axis=0)).ravel()
+        norms = np.sqrt(np.asarray(interactions.multiply(interactions).sum(axis=0)).ravel())
+
+        positions, known = self.book_positions(book_ids, book_authors[:, 0])
+        authors, author_columns = np.unique(book_authors[known, 1], return_inverse=True)
+        written = sparse.csr_matrix(
+            (np.ones(known.sum()), (positions[known], author_columns)), shape=(n, len(authors))
+        )
+        author_counts = np.asarray(written.sum(axis=1)).ravel()
+
+        genre_values, genre_columns = np.unique(genres, return_inverse=True)
+        order = np.lexsort((book_ids, -popularity, genres))
+        sorted_genres = genres[order]
+        genre_rank = np.arange(n) - np.searchsorted(sorted_genres, sorted_genres)
+        popular = order[(genre_rank < self.top_k) & (sorted_genres > 0)]
+        popular_mask = np.zeros(n, dtype=bool)
+        popular_mask[popular] = True
+
+        return {
+            "book_ids": book_ids,
+            "genres": genres,
+            "years": books[:, 2],
+            "interactions_t": interactions.T.tocsr(),
+            "interactions": interactions,
+            "interaction_norms": inverse(norms),
+            "written": written,
+            "written_t": written.T.tocsr(),
+            "author_norms": inverse(np.sqrt(author_counts)),
+            "genre_members": sparse.csr_matrix((np.ones(n), (np.arange(n), genre_columns)), shape=(n, len(genre_values))),
+            "genre_popular": sparse.csr_matrix(
+                (np.ones(len(popular)), (genre_columns[popular], popular)), shape=(len(genre_values), n)
+            ),
+            "popular": popular_mask
+        }
+
+
+    def book_positions(self, book_ids, ids) -> tuple:
+        import numpy as np
+
+        ids = ids.astype(np.int64)
+        if not len(book_ids):
+            return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+
+        positions = np.minimum(np.searchsorted(book_ids, ids), len(book_ids) - 1)
+        return positions, book_ids[positions] == ids
+
+
+    def dirty_rows(self, model: dict, dirty):
+        import numpy as np
+
+        positions, known = self.book_positions(model["book_ids"], dirty)
+        return np.unique(positions[known])
+
+
+    def score_chunk(self, model: dict, rows) -> tuple:
+        import numpy as np
+        from scipy import sparse
+
+        norms = model["interaction_norms"]
+        cooccurrence = sparse.diags(norms[rows]) @ (model["interactions_t"][rows] @ model["interactions"]) @ sparse.diags(norms)
+
+        norms = model["author_norms"]
+        shared_authors = sparse.diags(norms[rows]) @ (model["written"][rows] @ model["written_t"]) @ sparse.diags(norms)
+
+        same_genre = model["genre_members"][rows] @ model["genre_popular"]
+        candidates = ((1 - self.content_weight) * cooccurrence + 0.5 * self.content_weight * shared_authors + same_genre).tocoo()
+        chunk_rows, columns = candidates.row, candidates.col
+        sources = rows[chunk_rows]
+
+        genres, years = model["genres"], model["years"]
+        genre_match = (genres[sources] == genres[columns]) & (genres[sources] > 0)
+        year_similarity = np.clip(1 - np.abs(years[sources] - years[columns]) / 10, 0, 1) * ((years[sources] > 0) & (years[columns] > 0))
+        scores = (
+            candidates.data - (genre_match & model["popular"][columns])
+            + self.content_weight * (0.3 * genre_match + 0.2 * year_similarity)
+        )
+
+        keep = (sources != columns) & (scores > 0)
+        chunk_rows, columns, scores = chunk_rows[keep], columns[keep], scores[keep]
+
+        order = np.lexsort((-scores, chunk_rows))
+        sorted_rows = chunk_rows[order]
+        rank = np.arange(len(order)) - np.searchsorted(sorted_rows, sorted_rows)
+        order = order[rank < self.top_k]
+
+        book_ids = model["book_ids"]
+        return book_ids[rows[chunk_rows[order]]], book_ids[columns[order]], scores[order]
\ No newline at end of file
@@ -0,0 +1,107 @@
+import re
+import time
+import random
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import asyncpg
+
+from app.config import BaseConfig
+from app.queries import get_query_registry
+from app.utils import SingletonMeta
+
+
+class SlowQueryLog(metaclass=SingletonMeta):
+    def __init__(self):
+        self.threshold = float(BaseConfig.get("SLOW_QUERY_MS") or 200) / 1000
+        self.sample_rate = float(BaseConfig.get("SLOW_QUERY_EXPLAIN_SAMPLE_RATE") or 0.1)
+        self.explain_interval = float(BaseConfig.get("SLOW_QUERY_EXPLAIN_INTERVAL") or 60)
+        self.explain_timeout = float(BaseConfig.get("SLOW_QUERY_EXPLAIN_TIMEOUT") or 10)
+        self.entries: deque[dict] = deque(maxlen=int(BaseConfig.get("SLOW_QUERY_LOG_SIZE") or 100))
+        self.shapes: dict[str, dict] = {}
+        self.explained_at: dict[str, float] = {}
+        self.explaining = False
+
+    def observe(self, record) -> None:
+        if record.elapsed < self.threshold or record.query.lstrip()[:7].upper() == "EXPLAIN":
+            return
+
+        name = get_query_registry().name_of(record.query)
+        read_only = self.is_read_only(record.query)
+        entry = {
+            "statement": name,
+            "sql": " ".join(record.query.split()),
+            "params": [self.format_param(arg) for arg in record.args] if read_only else None,
+            "elapsed_ms": record.elapsed * 1000,
+            "error": type(record.exception).__name__ if record.exception is not None else None,
+            "at": datetime.now(timezone.utc).isoformat(),
+            "plan": None
+        }
+        self.entries.append(entry)
+
+        shape = self.shapes.get(name)
+        if shape is None:
+            shape = self.shapes[name] = {"statement": name, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "plan": None}
+
+        shape["count"] += 1
+        shape["total_ms"] += entry["elapsed_ms"]
+        shape["max_ms"] = max(shape["max_ms"], entry["elapsed_ms"])
+
+        if read_only and record.exception is None and self.should_explain(name):
+            asyncio.get_running_loop().create_task(self.explain(entry, shape, record.query, record.args))
+
+    def is_read_only(self, sql: str) -> bool:
+        return bool(re.match(r"\s*(SELECT|WITH)\b", sql, re.IGNORECASE)) and not re.search(r"\b(INSERT|UPDATE|DELETE)\b", sql, re.IGNORECASE)
+
+    def format_param(self, value: Any) -> str:
+        value = repr(value)
+        return value if len(value) <= 100 else value[:97] + "..."
+
+    def should_explain(self, name: str) -> bool:
+        now = time.monotonic()
+        if self.explaining or random.random() >= self.sample_rate or now - self.explained_at.get(name, -self.explain_interval) < self.explain_interval:
+            return False
+
+        self.explained_at[name] = now
+        return True
+
+    async def explain(self, entry: dict, shape: dict, sql: str, args: tuple) -> None:
+        from app.database import get_database
+
+        self.explaining = True
+        try:
+            async with get_database().acquire(read=True) as conn:
+                async with conn.transaction(readonly=True):
+                    rows = await conn.fetch(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", *args, timeout=self.explain_timeout)
+
+            entry["plan"] = shape["plan"] = "\n".join(row[0] for row in rows)
+
+        except (asyncpg.PostgresError, OSError, asyncio.TimeoutError) as e:
+            entry["plan"] = f"EXPLAIN failed: {e}"
+
+        finally:
+            self.explaining = False
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.shapes.clear()
+        self.explained_at.clear()
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "explain_sample_rate": self.sample_rate,
+            "shapes": sorted(self.shapes.values(), key=lambda shape: shape["total_ms"], reverse=True),
+            "entries": list(reversed(self.entries))
+        }
+
+
+_slow_query_log_instance: Optional[SlowQueryLog] = None
+
+def get_slow_query_log() -> SlowQueryLog:
+    global _slow_query_log_instance
+    if _slow_query_log_instance is None:
+        _slow_query_log_instance = SlowQueryLog()
+    return _slow_query_log_instance
\ No newline at end of file
@@ -1,3 +1,9 @@
 from .singleton import SingletonMeta
+from .cursor import encode_cursor, decode_cursor
+from .cache import LRUCache
+from .executor import BoundedExecutor, ExecutorFull
+from .loader import DataLoader
+from .histogram import Histogram
+from .http_cache import make_etag, is_not_modified, cache_headers, not_modified
 
-__all__ = ["SingletonMeta"]
\ No newline at end of file
+__all__ = ["SingletonMeta", "encode_cursor", "decode_cursor", "LRUCache", "BoundedExecutor", "ExecutorFull", "DataLoader", "Histogram", "make_etag", "is_not_modified", "cache_headers", "not_modified"]
\ No newline at end of file
@@ -0,0 +1,21 @@
+import base64
+import json
+
+
+def encode_cursor(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(data, dict):
+        raise ValueError("Invalid cursor")
+
+    return data
\ No newline at end of file
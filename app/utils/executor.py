@@ -0,0 +1,58 @@
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+class ExecutorFull(RuntimeError):
+    pass
+
+
+class BoundedExecutor:
+    def __init__(self, max_workers: int, max_queue: int, name: str = "worker"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.run_total = 0.0
+
+    async def run(self, func: Callable, *args) -> Any:
+        if self.in_flight - self.max_workers >= self.max_queue:
+            self.rejected += 1
+            raise ExecutorFull("Executor queue is full")
+
+        submitted_at = time.perf_counter()
+
+        def call():
+            started_at = time.perf_counter()
+            return func(*args), started_at - submitted_at, time.perf_counter() - started_at
+
+        self.in_flight += 1
+        try:
+            result, waited, ran = await asyncio.get_running_loop().run_in_executor(self.executor, call)
+
+        finally:
+            self.in_flight -= 1
+
+        self.completed += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self.run_total += ran
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": min(self.in_flight, self.max_workers),
+            "queued": max(self.in_flight - self.max_workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": self.wait_total / self.completed * 1000 if self.completed else 0.0,
+            "max_wait_ms": self.wait_max * 1000,
+            "avg_run_ms": self.run_total / self.completed * 1000 if self.completed else 0.0
+        }
\ No newline at end of file
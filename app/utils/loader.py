@@ -0,0 +1,52 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class DataLoader:
+    def __init__(self, batch_fn: Callable[..., Awaitable[dict]], max_batch_size: int = 100):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.loads = 0
+        self.batches = 0
+        self._batches: dict[Hashable, dict] = {}
+        self._tasks: set = set()
+
+    async def load(self, key: Hashable, group: Hashable = None) -> Any:
+        self.loads += 1
+        batch = self._batches.setdefault(group, {})
+        future = batch.get(key)
+
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            batch[key] = future
+
+            if len(batch) == 1:
+                loop.call_soon(self.dispatch, group, batch)
+            if len(batch) >= self.max_batch_size:
+                del self._batches[group]
+
+        return await asyncio.shield(future)
+
+    def dispatch(self, group: Hashable, batch: dict) -> None:
+        if self._batches.get(group) is batch:
+            del self._batches[group]
+
+        task = asyncio.ensure_future(self.run(group, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def run(self, group: Hashable, batch: dict) -> None:
+        self.batches += 1
+        try:
+            results = await (self.batch_fn(list(batch)) if group is None else self.batch_fn(list(batch), group))
+
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(results.get(key))
\ No newline at end of file
@@ -0,0 +1,52 @@
+import os
+import time
+import argparse
+
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("JWT_ALGORITHM", "HS256")
+os.environ.setdefault("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+
+from jose import jwt
+
+from app import BaseConfig
+from app.services import auth_service
+
+
+def uncached_decode(token: str) -> dict:
+    return jwt.decode(token, BaseConfig.get("JWT_SECRET_KEY"), algorithms=[BaseConfig.get("JWT_ALGORITHM")])
+
+
+def cached_decode(token: str) -> dict:
+    return auth_service.decode_access_token(token)
+
+
+def run(decode, tokens: list[str], requests: int) -> float:
+    started = time.perf_counter()
+    for i in range(requests):
+        decode(tokens[i % len(tokens)])
+
+    return (time.perf_counter() - started) / requests * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request JWT verification overhead")
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+
+    tokens = [
+        auth_service.create_access_token({"sub": f"user{i}", "id": i, "is_admin": False})
+        for i in range(args.users)
+    ]
+
+    before = run(uncached_decode, tokens, args.requests)
+    after = run(cached_decode, tokens, args.requests)
+
+    print(f"requests: {args.requests}, distinct tokens: {args.users}")
+    print(f"before (verify every request): {before:.2f} us/request")
+    print(f"after (verified-claims cache): {after:.2f} us/request")
+    print(f"speedup: {before / after:.1f}x, cache hit rate: {auth_service.token_cache.stats()['hit_rate']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,93 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+
+def api_gateway_event(path: str, token: str) -> dict:
+    headers = {"host": "localhost", "authorization": f"Bearer {token}"}
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": "GET",
+        "headers": headers,
+        "multiValueHeaders": {key: [value] for key, value in headers.items()},
+        "queryStringParameters": None,
+        "multiValueQueryStringParameters": None,
+        "requestContext": {
+            "resourcePath": "/{proxy+}",
+            "httpMethod": "GET",
+            "path": path,
+            "stage": "bench",
+            "identity": {"sourceIp": "127.0.0.1"}
+        },
+        "body": None,
+        "isBase64Encoded": False
+    }
+
+
+def child(path: str) -> None:
+    started = time.perf_counter()
+    from app.main import handler
+    imported = time.perf_counter()
+
+    event = api_gateway_event(path, os.environ["BENCH_TOKEN"])
+    first = handler(event, None)
+    first_done = time.perf_counter()
+    handler(event, None)
+    second_done = time.perf_counter()
+
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "first_response_ms": (first_done - imported) * 1000,
+        "warm_response_ms": (second_done - first_done) * 1000,
+        "status": first["statusCode"]
+    }))
+
+
+def run_mode(lazy: bool, path: str, runs: int, token: str) -> dict:
+    env = {**os.environ, "LAZY_STARTUP": "1" if lazy else "0", "BENCH_TOKEN": token}
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--child", "--path", path],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    summary = {"status": results[-1]["status"]}
+    for key in ("import_ms", "first_response_ms", "warm_response_ms"):
+        summary[key] = statistics.median(result[key] for result in results)
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start import time and time to first response through the Lambda handler")
+    parser.add_argument("--path", default="/genre/")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true")
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.path)
+        return
+
+    from app.services import auth_service
+    token = auth_service.create_access_token({"sub": "bench", "id": 1, "is_admin": False})
+
+    print(f"GET {args.path}, median of {args.runs} cold starts")
+    for lazy in (False, True):
+        summary = run_mode(lazy, args.path, args.runs, token)
+        print(
+            f"{'lazy ' if lazy else 'eager'}: import {summary['import_ms']:.1f} ms, "
+            f"first response {summary['first_response_ms']:.1f} ms, "
+            f"warm response {summary['warm_response_ms']:.1f} ms (status {summary['status']})"
+        )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,587 @@
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+from collections import Counter
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+
+import httpx
+
+from benchmarks.seed import ADJECTIVES, NOUNS, FIRST_NAMES, LAST_NAMES, PASSWORD
+
+
+class Exhausted(Exception):
+    pass
+
+
+@dataclass
+class Session:
+    client: httpx.AsyncClient
+    rng: random.Random
+    run_id: str
+    admin: dict = field(default_factory=dict)
+    user: dict = field(default_factory=dict)
+    user_id: int = 0
+    author_id: int = 0
+    book_ids: list[int] = field(default_factory=list)
+    author_ids: list[int] = field(default_factory=list)
+    genre_ids: list[int] = field(default_factory=list)
+    total_books: int = 0
+    next_cursor: Optional[str] = None
+    books_etag: Optional[str] = None
+    registered: list[str] = field(default_factory=list)
+    fresh_users: list[dict] = field(default_factory=list)
+    created_authors: list[int] = field(default_factory=list)
+    created_books: list[int] = field(default_factory=list)
+    import_jobs: list[int] = field(default_factory=list)
+    admin_genres: list[int] = field(default_factory=list)
+    admin_authors: list[int] = field(default_factory=list)
+    admin_books: list[int] = field(default_factory=list)
+    counter: int = 0
+
+    def unique(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}_{self.run_id}_{self.counter}"
+
+    def pick(self, values: list) -> int:
+        if not values:
+            raise Exhausted()
+        return self.rng.choice(values)
+
+    def pop(self, values: list) -> int:
+        if not values:
+            raise Exhausted()
+        return values.pop()
+
+    def word(self) -> str:
+        return self.rng.choice(ADJECTIVES + NOUNS)
+
+    def book(self, author_ids: list[int]) -> dict:
+        return {
+            "title": f"{self.rng.choice(ADJECTIVES)} {self.rng.choice(NOUNS)} {self.unique('load')}",
+            "genre_id": self.pick(self.genre_ids) if self.genre_ids else None,
+            "published_year": self.rng.randint(1950, datetime.now().year),
+            "author_ids": author_ids
+        }
+
+    def selection(self) -> dict:
+        return {"ids": self.rng.sample(self.admin_books, min(len(self.admin_books), 5)) or self.rng.sample(self.book_ids, 5)}
+
+
+@dataclass
+class Scenario:
+    name: str
+    call: Callable[[Session], Awaitable[httpx.Response]]
+    writes: bool = False
+    max_requests: Optional[int] = None
+    concurrency: Optional[int] = None
+    explicit: bool = False
+
+
+def scenario(name: str, writes: bool = False, max_requests: Optional[int] = None, concurrency: Optional[int] = None, explicit: bool = False):
+    def register(call):
+        SCENARIOS.append(Scenario(name, call, writes, max_requests, concurrency, explicit))
+        return call
+    return register
+
+
+SCENARIOS: list[Scenario] = []
+
+
+@scenario("POST /auth/register", writes=True, max_requests=50)
+async def register(s: Session):
+    username = s.unique("load")
+    response = await s.client.post("/auth/register", json={"username": username, "password_1": PASSWORD, "password_2": PASSWORD})
+    if response.status_code == 200:
+        s.registered.append(username)
+    return response
+
+
+@scenario("POST /auth/login", max_requests=50)
+async def login(s: Session):
+    username = s.registered.pop() if s.registered else "bench_admin"
+    response = await s.client.post("/auth/login", json={"username": username, "password": PASSWORD})
+    if response.status_code == 200 and username != "bench_admin":
+        s.fresh_users.append({"Authorization": f"Bearer {response.json()['access_token']}"})
+    return response
+
+
+@scenario("GET /auth/me")
+async def me(s: Session):
+    return await s.client.get("/auth/me", headers=s.user)
+
+
+@scenario("POST /author/create", writes=True)
+async def create_author(s: Session):
+    headers = s.pop(s.fresh_users)
+    response = await s.client.post("/author/create", json={"name": f"{s.rng.choice(FIRST_NAMES)} {s.rng.choice(LAST_NAMES)}"}, headers=headers)
+    if response.status_code == 200:
+        s.created_authors.append(response.json()["id"])
+    return response
+
+
+@scenario("PATCH /author/{author_id}", writes=True)
+async def update_author(s: Session):
+    author_id = s.pick(s.created_authors or [s.author_id])
+    return await s.client.patch(f"/author/{author_id}", json={"name": f"{s.rng.choice(FIRST_NAMES)} {s.rng.choice(LAST_NAMES)}"}, headers=s.user)
+
+
+@scenario("GET /author/{author_id}")
+async def get_author(s: Session):
+    return await s.client.get(f"/author/{s.pick(s.author_ids)}", headers=s.user)
+
+
+@scenario("GET /author/{author_id}/books")
+async def list_author_books(s: Session):
+    return await s.client.get(f"/author/{s.pick(s.author_ids)}/books", params={"limit": 20}, headers=s.user)
+
+
+@scenario("GET /genre/")
+async def list_genres(s: Session):
+    return await s.client.get("/genre/", headers=s.user)
+
+
+@scenario("GET /genre/{genre_id}")
+async def get_genre(s: Session):
+    return await s.client.get(f"/genre/{s.pick(s.genre_ids)}", headers=s.user)
+
+
+@scenario("GET /books/ page")
+async def list_books(s: Session):
+    return await s.client.get("/books/", params={"page": s.rng.randint(1, 50), "limit": 20}, headers=s.user)
+
+
+@scenario("GET /books/ 304")
+async def list_books_not_modified(s: Session):
+    response = await s.client.get("/books/", params={"limit": 20}, headers={**s.user, "If-None-Match": s.books_etag or ""})
+    if response.status_code == 200:
+        s.books_etag = response.headers.get("etag")
+    return response
+
+
+@scenario("GET /books/ cursor")
+async def list_books_cursor(s: Session):
+    params = {"limit": 20, "sort_by": "title"}
+    if s.next_cursor:
+        params["cursor"] = s.next_cursor
+    response = await s.client.get("/books/", params=params, headers=s.user)
+    if response.status_code == 200:
+        s.next_cursor = response.json().get("next_cursor")
+    return response
+
+
+@scenario("GET /books/ title")
+async def list_books_title(s: Session):
+    return await s.client.get("/books/", params={"title": s.word(), "sort_by": "title", "limit": 20}, headers=s.user)
+
+
+@scenario("GET /books/ title fuzzy")
+async def list_books_fuzzy(s: Session):
+    return await s.client.get("/books/", params={"title": s.word()[:-1], "search_mode": "fuzzy", "limit": 20}, headers=s.user)
+
+
+@scenario("GET /books/ author_name")
+async def list_books_author(s: Session):
+    return await s.client.get("/books/", params={"author_name": s.rng.choice(LAST_NAMES), "limit": 20}, headers=s.user)
+
+
+@scenario("GET /books/ genre+year estimated")
+async def list_books_genre_year(s: Session):
+    year = s.rng.randint(1950, datetime.now().year - 5)
+    params = {"genre_id": s.pick(s.genre_ids), "year_from": year, "year_to": year + 5, "sort_by": "year",
+              "sort_order": "desc", "total_mode": "estimated", "limit": 20}
+    return await s.client.get("/books/", params=params, headers=s.user)
+
+
+@scenario("GET /books/ export csv", max_requests=20)
+async def export_books(s: Session):
+    params = {"export": "csv", "title": s.word(), "genre_id": s.pick(s.genre_ids), "year_from": datetime.now().year - 1}
+    return await s.client.get("/books/", params=params, headers=s.user)
+
+
+@scenario("GET /books/{book_id}")
+async def get_book(s: Session):
+    return await s.client.get(f"/books/{s.pick(s.book_ids)}", headers=s.user)
+
+
+@scenario("GET /books/batch")
+async def get_books_batch(s: Session):
+    ids = s.rng.sample(s.book_ids, min(len(s.book_ids), 20))
+    return await s.client.get("/books/batch", params={"ids": ",".join(map(str, ids))}, headers=s.user)
+
+
+@scenario("GET /recommendations/")
+async def recommendations(s: Session):
+    return await s.client.get("/recommendations/", params={"limit": 10}, headers=s.user)
+
+
+@scenario("POST /books/create", writes=True)
+async def create_book(s: Session):
+    response = await s.client.post("/books/create", json=s.book([s.author_id, s.pick(s.author_ids)]), headers=s.user)
+    if response.status_code == 200:
+        s.created_books.append(response.json()["id"])
+    return response
+
+
+@scenario("PUT /books/{book_id}", writes=True)
+async def update_book(s: Session):
+    return await s.client.put(f"/books/{s.pick(s.created_books)}", json=s.book([s.author_id]), headers=s.user)
+
+
+def import_file(s: Session, rows: int) -> bytes:
+    return "\n".join(json.dumps(s.book([s.author_id])) for _ in range(rows)).encode()
+
+
+@scenario("POST /books/import", writes=True, max_requests=50)
+async def import_books(s: Session):
+    files = {"file": ("books.ndjson", import_file(s, 20), "application/x-ndjson")}
+    return await s.client.post("/books/import", files=files, headers=s.user)
+
+
+@scenario("POST /books/import async", writes=True, max_requests=20)
+async def import_books_async(s: Session):
+    files = {"file": ("books.ndjson", import_file(s, 200), "application/x-ndjson")}
+    response = await s.client.post("/books/import", params={"async": "true"}, files=files, headers=s.user)
+    if response.status_code == 200:
+        s.import_jobs.append(response.json()["id"])
+    return response
+
+
+@scenario("GET /books/import/{job_id}")
+async def get_import_job(s: Session):
+    return await s.client.get(f"/books/import/{s.pick(s.import_jobs)}", headers=s.user)
+
+
+@scenario("POST /books/import/{job_id}/cancel", writes=True)
+async def cancel_import_job(s: Session):
+    return await s.client.post(f"/books/import/{s.pop(s.import_jobs)}/cancel", headers=s.user)
+
+
+@scenario("POST /admin/genre", writes=True)
+async def admin_create_genre(s: Session):
+    response = await s.client.post("/admin/genre", json={"name": s.unique("g")[:30]}, headers=s.admin)
+    if response.status_code == 200:
+        s.admin_genres.append(response.json()["id"])
+    return response
+
+
+@scenario("PUT /admin/genre/{genre_id}", writes=True)
+async def admin_update_genre(s: Session):
+    return await s.client.put(f"/admin/genre/{s.pick(s.admin_genres)}", json={"name": s.unique("g")[:30]}, headers=s.admin)
+
+
+@scenario("POST /admin/author", writes=True)
+async def admin_create_author(s: Session):
+    response = await s.client.post("/admin/author", json={"name": f"{s.rng.choice(FIRST_NAMES)} {s.unique('a')}"}, headers=s.admin)
+    if response.status_code == 200:
+        s.admin_authors.append(response.json()["id"])
+    return response
+
+
+@scenario("PUT /admin/author/{author_id}", writes=True)
+async def admin_update_author(s: Session):
+    return await s.client.put(f"/admin/author/{s.pick(s.admin_authors)}", json={"name": f"{s.rng.choice(LAST_NAMES)} {s.unique('a')}"}, headers=s.admin)
+
+
+@scenario("POST /admin/books", writes=True)
+async def admin_create_book(s: Session):
+    response = await s.client.post("/admin/books", json=s.book([s.pick(s.admin_authors or s.author_ids)]), headers=s.admin)
+    if response.status_code == 200:
+        s.admin_books.append(response.json()["id"])
+    return response
+
+
+@scenario("PUT /admin/books/{book_id}", writes=True)
+async def admin_update_book(s: Session):
+    return await s.client.put(f"/admin/books/{s.pick(s.admin_books)}", json=s.book([s.pick(s.author_ids)]), headers=s.admin)
+
+
+@scenario("POST /admin/books/bulk/genre", writes=True)
+async def admin_bulk_genre(s: Session):
+    return await s.client.post("/admin/books/bulk/genre", json={**s.selection(), "new_genre_id": s.pick(s.admin_genres or s.genre_ids)}, headers=s.admin)
+
+
+@scenario("POST /admin/books/bulk/created-by", writes=True)
+async def admin_bulk_created_by(s: Session):
+    return await s.client.post("/admin/books/bulk/created-by", json={**s.selection(), "created_by": s.user_id}, headers=s.admin)
+
+
+@scenario("POST /admin/books/bulk/delete dry_run")
+async def admin_bulk_delete_dry_run(s: Session):
+    year = s.rng.randint(1950, datetime.now().year)
+    return await s.client.post("/admin/books/bulk/delete", json={"genre_id": s.pick(s.genre_ids), "year_from": year, "year_to": year, "dry_run": True}, headers=s.admin)
+
+
+@scenario("DELETE /admin/books/{book_id}", writes=True)
+async def admin_delete_book(s: Session):
+    return await s.client.delete(f"/admin/books/{s.pop(s.admin_books)}", headers=s.admin)
+
+
+@scenario("DELETE /admin/author/{author_id}", writes=True)
+async def admin_delete_author(s: Session):
+    return await s.client.delete(f"/admin/author/{s.pop(s.admin_authors)}", headers=s.admin)
+
+
+@scenario("DELETE /admin/genre/{genre_id}", writes=True)
+async def admin_delete_genre(s: Session):
+    return await s.client.delete(f"/admin/genre/{s.pop(s.admin_genres)}", headers=s.admin)
+
+
+@scenario("DELETE /books/{book_id}", writes=True)
+async def delete_book(s: Session):
+    return await s.client.delete(f"/books/{s.pop(s.created_books)}", headers=s.user)
+
+
+@scenario("GET /admin/cache")
+async def admin_cache(s: Session):
+    return await s.client.get("/admin/cache", headers=s.admin)
+
+
+@scenario("GET /admin/password-hash")
+async def admin_password_hash(s: Session):
+    return await s.client.get("/admin/password-hash", headers=s.admin)
+
+
+@scenario("GET /admin/activity")
+async def admin_activity(s: Session):
+    return await s.client.get("/admin/activity", headers=s.admin)
+
+
+@scenario("GET /admin/queries")
+async def admin_queries(s: Session):
+    return await s.client.get("/admin/queries", headers=s.admin)
+
+
+@scenario("GET /admin/slow-queries")
+async def admin_slow_queries(s: Session):
+    return await s.client.get("/admin/slow-queries", headers=s.admin)
+
+
+@scenario("DELETE /admin/slow-queries", writes=True, max_requests=20)
+async def admin_clear_slow_queries(s: Session):
+    return await s.client.delete("/admin/slow-queries", headers=s.admin)
+
+
+@scenario("GET /metrics")
+async def metrics(s: Session):
+    return await s.client.get("/metrics", headers=s.admin)
+
+
+@scenario("POST /admin/recommendations/rebuild", writes=True, max_requests=1, concurrency=1, explicit=True)
+async def admin_rebuild_recommendations(s: Session):
+    return await s.client.post("/admin/recommendations/rebuild", headers=s.admin)
+
+
+async def login_headers(client: httpx.AsyncClient, username: str, password: str) -> dict:
+    response = await client.post("/auth/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def setup(s: Session, admin_username: str, password: str) -> None:
+    s.admin = await login_headers(s.client, admin_username, password)
+
+    username = s.unique("load")
+    response = await s.client.post("/auth/register", json={"username": username, "password_1": PASSWORD, "password_2": PASSWORD})
+    response.raise_for_status()
+    s.user_id = response.json()["id"]
+    s.user = await login_headers(s.client, username, PASSWORD)
+
+    response = await s.client.post("/author/create", json={"name": f"Load {s.run_id}"}, headers=s.user)
+    response.raise_for_status()
+    s.author_id = response.json()["id"]
+
+    for sort_order in ("asc", "desc"):
+        response = await s.client.get("/books/", params={"limit": 100, "sort_order": sort_order, "sort_by": "title"}, headers=s.user)
+        if response.status_code != 200:
+            raise SystemExit("No books found, seed the database first: python -m benchmarks.seed")
+
+        body = response.json()
+        s.total_books = body["total"]
+        s.next_cursor = s.next_cursor or body["next_cursor"]
+        for book in body["books"]:
+            s.book_ids.append(book["id"])
+            s.author_ids.extend(author["id"] for author in book["authors"])
+            if book["genre_id"] is not None:
+                s.genre_ids.append(book["genre_id"])
+
+    response = await s.client.get("/books/", params={"limit": 20}, headers=s.user)
+    s.books_etag = response.headers.get("etag")
+
+    response = await s.client.get("/genre/", headers=s.user)
+    if response.status_code == 200:
+        s.genre_ids.extend(genre["id"] for genre in response.json()["genres"])
+
+    s.author_ids = sorted(set(s.author_ids))
+    s.genre_ids = sorted(set(s.genre_ids))
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(p / 100 * len(values) + 0.5) - 1))]
+
+
+async def run_scenario(s: Session, scenario: Scenario, requests: int, concurrency: int) -> dict:
+    latencies, statuses = [], Counter()
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started_at = time.perf_counter()
+            try:
+                response = await scenario.call(s)
+
+            except Exhausted:
+                break
+
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+                continue
+
+            latencies.append(time.perf_counter() - started_at)
+            statuses[str(response.status_code)] += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started_at
+
+    latencies.sort()
+    completed = sum(statuses.values())
+    return {
+        "requests": completed,
+        "errors": sum(count for status, count in statuses.items() if not status.isdigit() or int(status) >= 400),
+        "status": dict(sorted(statuses.items())),
+        "concurrency": concurrency,
+        "seconds": round(seconds, 4),
+        "throughput_rps": round(completed / seconds, 2) if seconds else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+            **{f"p{p}": round(percentile(latencies, p) * 1000, 3) for p in (50, 95, 99)},
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0
+        }
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict) -> None:
+    print(f"\n{'endpoint':<42} {'p50 ms':>16} {'p95 ms':>16} {'p99 ms':>16} {'req/s':>16}")
+    for name, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if previous is None:
+            continue
+
+        cells = []
+        for before, after in (
+            *((previous["latency_ms"][p], current["latency_ms"][p]) for p in ("p50", "p95", "p99")),
+            (previous["throughput_rps"], current["throughput_rps"])
+        ):
+            change = (after - before) / before * 100 if before else 0.0
+            cells.append(f"{after:>8.2f} {change:>+6.1f}%")
+        print(f"{name:<42} {' '.join(cells)}")
+
+
+async def run(args) -> dict:
+    async with AsyncExitStack() as stack:
+        if args.url:
+            target = args.url
+            client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+
+        else:
+            from app.main import app
+
+            target = "asgi"
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url="http://bench", timeout=args.timeout)
+
+        await stack.enter_async_context(client)
+        s = Session(client=client, rng=random.Random(args.seed), run_id=uuid.uuid4().hex[:8])
+        await setup(s, args.admin_username, args.password)
+
+        selected = [
+            scenario for scenario in SCENARIOS
+            if (not args.read_only or not scenario.writes)
+            and (re.search(args.only, scenario.name) if args.only else not scenario.explicit)
+        ]
+
+        endpoints = {}
+        for scenario in selected:
+            requests = min(args.requests, scenario.max_requests or args.requests)
+            concurrency = min(scenario.concurrency or args.concurrency, requests)
+            result = await run_scenario(s, scenario, requests, concurrency)
+            if not result["requests"]:
+                print(f"{scenario.name:<42} skipped, nothing to act on")
+                continue
+
+            endpoints[scenario.name] = result
+            print(
+                f"{scenario.name:<42} {result['requests']:>5} req {result['throughput_rps']:>9.1f} req/s "
+                f"p50 {result['latency_ms']['p50']:>8.2f} ms p95 {result['latency_ms']['p95']:>8.2f} ms "
+                f"p99 {result['latency_ms']['p99']:>8.2f} ms {result['status']}"
+            )
+
+        return {
+            "meta": {
+                "commit": git_commit(),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "target": target,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "books": s.total_books,
+                "python": platform.python_version()
+            },
+            "endpoints": endpoints
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test every API route and report throughput and latency percentiles")
+    parser.add_argument("--url", help="base URL of a running server (start it with RATE_LIMIT_ENABLED=0), default in-process ASGI")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--only", help="regex on endpoint names, needed for the recommendation rebuild")
+    parser.add_argument("--read-only", action="store_true", help="skip endpoints that write")
+    parser.add_argument("--admin-username", default="bench_admin")
+    parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON artifact path, default benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", help="previous JSON artifact to diff against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    output = args.output or os.path.join("benchmarks", "results", f"{results['meta']['commit'] or 'latest'}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"\nwrote {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
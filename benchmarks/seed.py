@@ -0,0 +1,223 @@
+import time
+import random
+import asyncio
+import argparse
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+
+from app.database import get_database
+from app.services import auth_service
+
+
+ADJECTIVES = [
+    "Silent", "Hidden", "Broken", "Golden", "Lost", "Crimson", "Distant", "Endless", "Forgotten", "Frozen",
+    "Burning", "Quiet", "Wild", "Secret", "Last", "Northern", "Hollow", "Bright", "Dark", "Ancient"
+]
+NOUNS = [
+    "River", "Garden", "Empire", "Letter", "Mountain", "Library", "Harbor", "Kingdom", "Forest", "Machine",
+    "Orchard", "Station", "Winter", "Crown", "Island", "Signal", "Bridge", "Lantern", "Valley", "Archive"
+]
+PLACES = ["Avalon", "Brighton", "Carthage", "Dunmore", "Eldoria", "Florence", "Granada", "Hollowmere", "Ithaca", "Kyoto"]
+FIRST_NAMES = ["Anna", "Boris", "Clara", "David", "Elena", "Farid", "Grace", "Hugo", "Irina", "Jonas", "Keiko", "Liam", "Maria", "Nikolai", "Olga", "Pedro"]
+LAST_NAMES = ["Adams", "Bauer", "Costa", "Dubois", "Evans", "Fischer", "Garcia", "Hansen", "Ivanova", "Jensen", "Kowalski", "Larsen", "Moreau", "Novak"]
+GENRES = [
+    "Fantasy", "Science Fiction", "Mystery", "Thriller", "Romance", "Horror", "Historical", "Biography", "Poetry", "Drama",
+    "Adventure", "Classics", "Philosophy", "Travel", "Science", "History", "Children", "Young Adult", "Humor", "Essays"
+]
+AUTHOR_COUNTS = ([1, 2, 3, 4, 5], [70, 20, 6, 3, 1])
+ACTIONS = (["view", "open", "favorite", "export"], [60, 30, 7, 3])
+PASSWORD = "Password1"
+
+
+def skewed(rng: random.Random, count: int, power: float) -> int:
+    return min(int(count * rng.random() ** power), count - 1)
+
+
+def title(rng: random.Random) -> str:
+    value = f"The {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
+    if rng.random() < 0.4:
+        value += f" of {rng.choice(PLACES)}"
+    if rng.random() < 0.2:
+        value += f" {rng.randint(2, 9)}"
+    return value
+
+
+async def next_id(conn, table: str) -> int:
+    return await conn.fetchval(f"SELECT COALESCE(max(id), 0) + 1 FROM {table}")
+
+
+async def copy(conn, table: str, columns: list[str], records) -> float:
+    started_at = time.perf_counter()
+    await conn.copy_records_to_table(table, records=records, columns=columns)
+    return time.perf_counter() - started_at
+
+
+@asynccontextmanager
+async def without_constraints(conn, tables: list[str], timings: dict):
+    constraints = await conn.fetch(
+        """
+        SELECT conrelid::regclass::text AS table_name, conname AS name, pg_get_constraintdef(oid) AS definition
+        FROM pg_constraint
+        WHERE contype = 'f' AND conrelid = ANY($1::text[]::regclass[])
+        """,
+        tables
+    )
+    indexes = await conn.fetch(
+        """
+        SELECT indexrelid::regclass::text AS name, pg_get_indexdef(indexrelid) AS definition
+        FROM pg_index
+        WHERE NOT indisprimary AND NOT indisunique AND indrelid = ANY($1::text[]::regclass[])
+        """,
+        tables
+    )
+
+    for constraint in constraints:
+        await conn.execute(f'ALTER TABLE {constraint["table_name"]} DROP CONSTRAINT "{constraint["name"]}"')
+    for index in indexes:
+        await conn.execute(f"DROP INDEX {index['name']}")
+
+    try:
+        yield
+
+    finally:
+        started_at = time.perf_counter()
+        for index in indexes:
+            await conn.execute(index["definition"])
+        for constraint in constraints:
+            await conn.execute(f'ALTER TABLE {constraint["table_name"]} ADD CONSTRAINT "{constraint["name"]}" {constraint["definition"]}')
+        timings["constraints"] = time.perf_counter() - started_at
+
+
+async def copy_catalog(conn, rng: random.Random, books: int, authors: int, genres: int, users: int, activity: int,
+                       chunk_size: int, timings: dict) -> int:
+    password = auth_service.hash_password(PASSWORD)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    this_year = date.today().year
+
+    first_user, first_genre = await next_id(conn, "users"), await next_id(conn, "genres")
+    first_author, first_book = await next_id(conn, "authors"), await next_id(conn, "books")
+
+    timings["users"] = await copy(conn, "users", ["id", "username", "password"], (
+        (first_user + i, f"bench_{first_user + i}", password) for i in range(users)
+    ))
+    timings["genres"] = await copy(conn, "genres", ["id", "name"], (
+        (first_genre + i, f"{GENRES[i % len(GENRES)]} {first_genre + i}") for i in range(genres)
+    ))
+
+    linked = min(users, authors) // 2
+    timings["authors"] = await copy(conn, "authors", ["id", "name", "user_id"], (
+        (first_author + i, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", first_user + i if i < linked else None)
+        for i in range(authors)
+    ))
+
+    timings["books"] = timings["book_authors"] = 0.0
+    book_authors = 0
+
+    for start in range(0, books, chunk_size):
+        book_rows, author_rows = [], []
+        for book_id in range(first_book + start, first_book + min(start + chunk_size, books)):
+            picked = {skewed(rng, authors, 3) for _ in range(rng.choices(*AUTHOR_COUNTS)[0])}
+            author_rows.extend((book_id, first_author + author) for author in picked)
+            creator = min(picked)
+            book_rows.append((
+                book_id,
+                title(rng),
+                first_genre + skewed(rng, genres, 2) if genres and rng.random() > 0.05 else None,
+                max(1800, this_year - int(rng.expovariate(1 / 30))),
+                first_user + creator if creator < linked else None
+            ))
+
+        timings["books"] += await copy(conn, "books", ["id", "title", "genre_id", "published_year", "created_by"], book_rows)
+        timings["book_authors"] += await copy(conn, "book_authors", ["book_id", "author_id"], author_rows)
+        book_authors += len(author_rows)
+
+    span = timedelta(days=90).total_seconds()
+    timings["user_activity"] = await copy(conn, "user_activity", ["user_id", "book_id", "action", "created_at"], (
+        (
+            first_user + skewed(rng, users, 2),
+            first_book + skewed(rng, books, 3),
+            rng.choices(*ACTIONS)[0],
+            now - timedelta(seconds=span * (activity - i) / activity)
+        )
+        for i in range(activity)
+    ))
+
+    for table in ("users", "genres", "authors", "books"):
+        await conn.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(max(id), 0) + 1 FROM {table}), false)")
+
+    await conn.execute(
+        """
+        INSERT INTO users (username, password, is_admin) VALUES ('bench_admin', $1, TRUE)
+        ON CONFLICT (username) DO UPDATE SET password = EXCLUDED.password, is_admin = TRUE
+        """,
+        password
+    )
+    return book_authors
+
+
+async def seed(books: int, authors: int, genres: int, users: int, activity: int, reset: bool, seed_value: int,
+               chunk_size: int = 50000) -> dict:
+    rng = random.Random(seed_value)
+    activity = activity if users and books else 0
+    timings = {}
+
+    db = get_database()
+    await db.connect()
+    try:
+        async with db.acquire(write=True) as conn:
+            if reset:
+                tables = ["users", "genres", "authors", "books", "book_authors", "user_activity"]
+                await conn.execute(f"TRUNCATE {', '.join(tables)}, book_recommendations, import_jobs, table_versions RESTART IDENTITY CASCADE")
+                async with without_constraints(conn, tables, timings):
+                    book_authors = await copy_catalog(conn, rng, books, authors, genres, users, activity, chunk_size, timings)
+
+            else:
+                book_authors = await copy_catalog(conn, rng, books, authors, genres, users, activity, chunk_size, timings)
+
+            started_at = time.perf_counter()
+            await conn.execute("ANALYZE")
+            timings["analyze"] = time.perf_counter() - started_at
+
+        return {
+            "users": users,
+            "genres": genres,
+            "authors": authors,
+            "books": books,
+            "book_authors": book_authors,
+            "user_activity": activity,
+            "seconds": {table: round(seconds, 3) for table, seconds in timings.items()}
+        }
+
+    finally:
+        await db.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic catalog with COPY")
+    parser.add_argument("--books", type=int, default=100000)
+    parser.add_argument("--authors", type=int, help="default books / 8")
+    parser.add_argument("--genres", type=int, default=40)
+    parser.add_argument("--users", type=int, help="default books / 100, at least 10")
+    parser.add_argument("--activity", type=int, help="user activity events, default 2 per book")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="truncate all tables first")
+    args = parser.parse_args()
+
+    books = args.books
+    summary = asyncio.run(seed(
+        books=books,
+        authors=args.authors or max(books // 8, 1),
+        genres=args.genres,
+        users=args.users or max(books // 100, 10),
+        activity=args.activity if args.activity is not None else books * 2,
+        reset=args.reset,
+        seed_value=args.seed
+    ))
+
+    for table, seconds in summary.pop("seconds").items():
+        print(f"{table}: {summary.get(table, '')} {seconds:.2f} s")
+    print(f"admin: bench_admin / {PASSWORD}, users: bench_<id> / {PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
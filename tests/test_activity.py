@@ -0,0 +1,76 @@
+import uuid
+
+import pytest
+
+from app.database import get_database
+from app.limiter import limiter
+from app.services import activity_service, auth_service, book_service
+
+
+async def count_activity(user_id: int) -> int:
+    async with get_database().acquire() as conn:
+        return await conn.fetchval("SELECT count(*) FROM user_activity WHERE user_id = $1", user_id)
+
+
+@pytest.mark.asyncio
+async def test_activity_is_buffered_and_flushed_in_batches(monkeypatch):
+    user = await auth_service.create_user(f"{uuid.uuid4().hex[:8]}_active", "Password1")
+    book = await book_service.create_book("Activity Book", None, 2001, [], user["id"])
+    monkeypatch.setattr(activity_service, "flush_size", 2)
+
+    assert activity_service.record(user["id"], book["id"], "open")
+    assert await count_activity(user["id"]) == 0
+
+    assert activity_service.record(user["id"], book["id"], "view")
+    await activity_service.flush_task
+    assert await count_activity(user["id"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_activity_buffer_drops_when_full_and_skips_deleted_books(monkeypatch):
+    user = await auth_service.create_user(f"{uuid.uuid4().hex[:8]}_active", "Password1")
+    book = await book_service.create_book("Activity Book", None, 2001, [], user["id"])
+    monkeypatch.setattr(activity_service, "flush_size", 100)
+    monkeypatch.setattr(activity_service, "max_pending", 3)
+    dropped = activity_service.dropped
+
+    assert activity_service.record(user["id"], book["id"], "view")
+    assert activity_service.record(user["id"], book["id"], "view")
+    assert activity_service.record(user["id"], 2147483647, "view")
+    assert not activity_service.record(user["id"], book["id"], "view")
+    assert activity_service.dropped == dropped + 1
+
+    await activity_service.shutdown()
+    assert activity_service.dropped == dropped + 2
+    assert await count_activity(user["id"]) == 2
+    assert not activity_service.pending and activity_service.timer is None
+
+
+@pytest.mark.asyncio
+async def test_get_book_records_a_view(client):
+    limiter.reset()
+    user = await auth_service.create_user(f"{uuid.uuid4().hex[:8]}_active", "Password1")
+    book = await book_service.create_book("Activity Book", None, 2001, [], user["id"])
+    token = auth_service.create_access_token({"sub": user["username"], "id": user["id"], "is_admin": False})
+
+    result = await client.get(f"/books/{book['id']}", headers={"Authorization": f"Bearer {token}"})
+    assert result.status_code == 200
+
+    assert [entry[:3] for entry in activity_service.pending if entry[0] == user["id"]] == [(user["id"], book["id"], "view")]
+    await activity_service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_export_records_each_exported_book(client):
+    limiter.reset()
+    prefix = uuid.uuid4().hex[:8]
+    user = await auth_service.create_user(f"{prefix}_active", "Password1")
+    books = [await book_service.create_book(f"{prefix} {letter}", None, 2001, [], user["id"]) for letter in "AB"]
+    token = auth_service.create_access_token({"sub": user["username"], "id": user["id"], "is_admin": False})
+
+    result = await client.get("/books/", params={"title": prefix, "export": "ndjson"}, headers={"Authorization": f"Bearer {token}"})
+    assert len(result.text.splitlines()) == 2
+
+    exported = sorted(entry[1] for entry in activity_service.pending if entry[0] == user["id"] and entry[2] == "export")
+    assert exported == sorted(book["id"] for book in books)
+    await activity_service.shutdown()
\ No newline at end of file
@@ -1,5 +1,11 @@
 import re
+import uuid
+from datetime import timedelta
 
+import pytest
+from passlib.context import CryptContext
+
+from app.database import get_database
 from app.services import auth_service
 
 
@@ -28,4 +34,43 @@ def test_create_access_token():
     assert isinstance(token, str)
     assert decoded["sub"] == "testuser"
     assert decoded["user_id"] == 123
-    assert "exp" in decoded
\ No newline at end of file
+    assert "exp" in decoded
+
+
+def test_decode_access_token_caches_verified_claims():
+    token = auth_service.create_access_token({"sub": "cacheduser", "id": 7})
+    hits = auth_service.token_cache.hits
+
+    assert auth_service.decode_access_token(token)["sub"] == "cacheduser"
+    assert auth_service.decode_access_token(token)["id"] == 7
+    assert auth_service.token_cache.hits == hits + 1
+
+
+def test_decode_access_token_rejects_expired_and_tampered_tokens():
+    expired = auth_service.create_access_token({"sub": "expireduser"}, expires_delta=timedelta(seconds=-1))
+    token = auth_service.create_access_token({"sub": "tampereduser"})
+
+    assert auth_service.decode_access_token(expired) == {}
+    assert auth_service.decode_access_token(token[:-2] + "xx") == {}
+    assert auth_service.token_cache.get(expired) is None
+
+
+@pytest.mark.asyncio
+async def test_authenticate_user_rehashes_when_rounds_change():
+    username = f"rehash_{uuid.uuid4().hex[:8]}"
+    user = await auth_service.create_user(username, "Password1")
+    default_context = auth_service.pwd_context
+    auth_service.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=5)
+
+    try:
+        assert await auth_service.authenticate_user(username, "wrongpass") is None
+        assert (await auth_service.authenticate_user(username, "Password1"))["id"] == user["id"]
+
+    finally:
+        auth_service.pwd_context = default_context
+
+    async with get_database().get_pool().acquire() as conn:
+        stored = await conn.fetchval("SELECT password FROM users WHERE id = $1", user["id"])
+
+    assert stored.startswith("$2b$05$")
+    assert await auth_service.authenticate_user(username, "Password1") is not None
\ No newline at end of file
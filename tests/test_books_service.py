@@ -0,0 +1,390 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+import pytest_asyncio
+
+from app.database import get_database
+from app.limiter import limiter
+from app.queries import get_query_registry
+from app.services import auth_service, author_service, book_service
+
+
+@pytest_asyncio.fixture
+async def catalog():
+    prefix = uuid.uuid4().hex[:8]
+    user = await auth_service.create_user(f"{prefix}_user", "Password1")
+    co_user = await auth_service.create_user(f"{prefix}_co_user", "Password1")
+    author = await author_service.create_author("Catalog Author", user["id"])
+    co_author = await author_service.create_author("Catalog Co Author", co_user["id"])
+
+    books = []
+    for i, letter in enumerate("ABCDE"):
+        author_ids = [author["author_id"], co_author["author_id"]] if i % 2 == 0 else [author["author_id"]]
+        books.append(await book_service.create_book(
+            title=f"{prefix} {letter}",
+            genre_id=None,
+            published_year=2000 + i,
+            author_ids=author_ids,
+            created_by=user["id"]
+        ))
+
+    return {"prefix": prefix, "user": user, "author": author, "books": books}
+
+
+async def list_catalog(catalog: dict, **kwargs) -> tuple[list[dict], str]:
+    params = {
+        "page": 1, "limit": 2, "sort_by": "title", "sort_order": "asc",
+        "title": catalog["prefix"], "author_name": None, "genre_id": None, "year_from": None, "year_to": None
+    }
+    params.update(kwargs)
+    return await book_service.list_books(**params)
+
+
+@pytest.mark.asyncio
+async def test_list_books_pages_over_books_not_author_rows(catalog):
+    books, next_cursor = await list_catalog(catalog)
+
+    assert [book["title"] for book in books] == [f"{catalog['prefix']} A", f"{catalog['prefix']} B"]
+    assert len(books[0]["authors"]) == 2
+    assert next_cursor is not None
+
+
+@pytest.mark.asyncio
+async def test_list_books_cursor_walks_every_book(catalog):
+    for sort_by, sort_order in [("title", "asc"), ("year", "desc"), ("author", "asc"), ("id", "desc")]:
+        seen = []
+        cursor = None
+
+        while True:
+            books, cursor = await list_catalog(catalog, sort_by=sort_by, sort_order=sort_order, cursor=cursor)
+            seen.extend(book["id"] for book in books)
+            if not cursor:
+                break
+
+        assert sorted(seen) == sorted(book["id"] for book in catalog["books"])
+        assert len(seen) == len(set(seen))
+
+
+@pytest.mark.asyncio
+async def test_first_author_name_follows_author_links_and_renames(catalog):
+    ids = [book["id"] for book in catalog["books"]]
+
+    async def author_order() -> list[int]:
+        books, _ = await list_catalog(catalog, sort_by="author", limit=10)
+        return [book["id"] for book in books]
+
+    assert await author_order() == ids
+
+    async with get_database().acquire() as conn:
+        await conn.execute("UPDATE authors SET name = 'Zed Author' WHERE id = $1", catalog["author"]["author_id"])
+    assert await author_order() == [ids[0], ids[2], ids[4], ids[1], ids[3]]
+
+    async with get_database().acquire() as conn:
+        await conn.execute("DELETE FROM book_authors WHERE book_id = $1", ids[3])
+        names = await conn.fetch("SELECT id, first_author_name FROM books WHERE id = ANY($1) ORDER BY id", ids)
+    assert [row["first_author_name"] for row in names] == ["Catalog Co Author", "Zed Author", "Catalog Co Author", "", "Catalog Co Author"]
+    assert (await author_order())[0] == ids[3]
+
+
+@pytest.mark.asyncio
+async def test_list_books_rejects_foreign_cursor(catalog):
+    _, next_cursor = await list_catalog(catalog, sort_by="title")
+
+    with pytest.raises(ValueError):
+        await list_catalog(catalog, sort_by="year", cursor=next_cursor)
+
+    with pytest.raises(ValueError):
+        await list_catalog(catalog, cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_count_books_is_filtered_and_invalidated_by_writes(catalog):
+    filters = {"title": catalog["prefix"], "author_name": None, "genre_id": None, "year_from": 2002, "year_to": None}
+
+    assert await book_service.count_books(**filters) == (3, False)
+
+    await book_service.delete_book(catalog["books"][-1]["id"])
+    assert await book_service.count_books(**filters) == (2, False)
+
+
+@pytest.mark.asyncio
+async def test_count_books_keys_the_cache_on_the_sent_filter(catalog):
+    filters = {"author_name": None, "genre_id": None, "year_from": None, "year_to": None}
+
+    assert await book_service.count_books(title=catalog["prefix"], **filters) == (5, False)
+    assert await book_service.count_books(title=f" {catalog['prefix']}", **filters) == (0, False)
+
+
+@pytest.mark.asyncio
+async def test_export_streams_every_matching_book(catalog):
+    def rows():
+        return book_service.stream_books(
+            sort_by="title", sort_order="asc", title=catalog["prefix"],
+            author_name=None, genre_id=None, year_from=None, year_to=None
+        )
+
+    csv_body = b"".join([chunk async for chunk in book_service.export_csv(rows())]).decode("utf-8")
+    csv_lines = csv_body.splitlines()
+    assert csv_lines[0].startswith("id,title")
+    assert len(csv_lines) == len(catalog["books"]) + 1
+    assert "Catalog Author; Catalog Co Author" in csv_lines[1]
+
+    ndjson_body = b"".join([chunk async for chunk in book_service.export_ndjson(rows())]).decode("utf-8")
+    assert [json.loads(line)["title"] for line in ndjson_body.splitlines()] == [book["title"] for book in catalog["books"]]
+
+    json_body = b"".join([chunk async for chunk in book_service.export_json(rows())]).decode("utf-8")
+    assert len(json.loads(json_body)) == len(catalog["books"])
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_books_reports_errors_per_row(catalog):
+    author_id = catalog["author"]["author_id"]
+    prefix = catalog["prefix"]
+
+    created_books, error_books = await book_service.bulk_create_books([
+        {"title": f"{prefix} bulk 1", "genre_id": None, "published_year": 1999, "author_ids": [author_id]},
+        {"title": f"{prefix} bulk 2", "genre_id": None, "published_year": 1700, "author_ids": [author_id]},
+        {"title": f"{prefix} bulk 3", "genre_id": None, "published_year": 2001, "author_ids": [author_id, 0]},
+        {"title": f"{prefix} bulk 4", "genre_id": None, "published_year": "unknown", "author_ids": [author_id]},
+        {"title": f"{prefix} bulk 5", "genre_id": None, "published_year": 2010, "author_ids": [author_id, author_id]},
+        {"genre_id": None, "published_year": 2010, "author_ids": [author_id]},
+        {"title": None, "genre_id": None, "published_year": 2010, "author_ids": [author_id]},
+        {"title": "  ", "genre_id": None, "published_year": 2010, "author_ids": [author_id]}
+    ], created_by=catalog["user"]["id"])
+
+    assert [book["title"] for book in created_books] == [f"{prefix} bulk 1", f"{prefix} bulk 5"]
+    assert [len(book["authors"]) for book in created_books] == [1, 1]
+    assert sorted(error["error"] for error in error_books) == [
+        "Author does not exist", "Invalid book format", "Published year must be between 1800 and current year",
+        "Title and published_year are required", "Title and published_year are required", "Title and published_year are required"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_update_book_replaces_only_changed_authors(catalog):
+    book = catalog["books"][0]
+    author_id = catalog["author"]["author_id"]
+
+    updated = await book_service.update_book(
+        book_id=book["id"], title=book["title"] + " v2", genre_id=None,
+        published_year=book["published_year"], author_ids=[author_id, author_id]
+    )
+    assert updated["title"] == book["title"] + " v2"
+    assert [author["id"] for author in updated["authors"]] == [author_id]
+    assert [author["id"] for author in (await book_service.get_book(book["id"]))["authors"]] == [author_id]
+
+    with pytest.raises(ValueError, match="Author does not exist"):
+        await book_service.update_book(
+            book_id=book["id"], title=book["title"], genre_id=None,
+            published_year=book["published_year"], author_ids=[author_id, 0]
+        )
+
+    assert await book_service.update_book(
+        book_id=0, title="missing", genre_id=None, published_year=2000, author_ids=[author_id]
+    ) is None
+
+
+@pytest.mark.asyncio
+async def test_author_rename_invalidates_cached_books(catalog):
+    book = catalog["books"][1]
+    author_id = catalog["author"]["author_id"]
+
+    assert (await book_service.get_book(book["id"]))["authors"][0]["name"] == "Catalog Author"
+
+    await author_service.update_author(author_id, "Renamed Author")
+    assert (await book_service.get_book(book["id"]))["authors"][0]["name"] == "Renamed Author"
+
+
+@pytest.mark.asyncio
+async def test_catalog_version_changes_on_book_and_author_writes(catalog):
+    version, last_modified = await book_service.get_catalog_version()
+    assert last_modified is not None
+
+    await author_service.update_author(catalog["author"]["author_id"], "Versioned Author")
+    renamed_version, _ = await book_service.get_catalog_version()
+    assert renamed_version > version
+
+    await book_service.delete_book(catalog["books"][0]["id"])
+    deleted_version = (await book_service.get_catalog_version())[0]
+    assert deleted_version > renamed_version
+
+    async with get_database().acquire() as conn:
+        await conn.execute("UPDATE users SET password = password WHERE id = $1", catalog["user"]["id"])
+    assert (await book_service.get_catalog_version())[0] == deleted_version
+
+
+@pytest.mark.asyncio
+async def test_catalog_version_ignores_uncommitted_writes(catalog):
+    version, last_modified = await book_service.get_catalog_version()
+
+    async with get_database().get_pool().acquire() as conn:
+        async with conn.transaction():
+            await conn.execute("UPDATE books SET title = title || ' !' WHERE id = $1", catalog["books"][0]["id"])
+            assert await book_service.get_catalog_version() == (version, last_modified)
+
+    committed_version, committed_at = await book_service.get_catalog_version()
+    assert committed_version > version and committed_at >= last_modified
+
+
+@pytest.mark.asyncio
+async def test_catalog_version_does_not_serialize_writers(catalog):
+    pool = get_database().get_pool()
+    connections = [await pool.acquire() for _ in range(4)]
+    try:
+        first = connections[0]
+        second = next(conn for conn in connections[1:] if conn.get_server_pid() % 16 != first.get_server_pid() % 16)
+
+        async with first.transaction():
+            await first.execute("UPDATE books SET title = title || ' 1' WHERE id = $1", catalog["books"][0]["id"])
+            async with second.transaction():
+                await second.execute("UPDATE books SET title = title || ' 2' WHERE id = $1", catalog["books"][1]["id"], timeout=2)
+
+    finally:
+        for conn in connections:
+            await pool.release(conn)
+
+
+@pytest.mark.asyncio
+async def test_get_book_honours_if_modified_since(catalog, client):
+    limiter.reset()
+    book = catalog["books"][0]
+    user = catalog["user"]
+    token = auth_service.create_access_token({"sub": user["username"], "id": user["id"], "is_admin": False})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    result = await client.get(f"/books/{book['id']}", headers=headers)
+    assert result.status_code == 200
+    last_modified = result.headers["Last-Modified"]
+
+    result = await client.get(f"/books/{book['id']}", headers={**headers, "If-Modified-Since": last_modified})
+    assert result.status_code == 304
+    assert result.headers["Last-Modified"] == last_modified
+
+    result = await client.get(f"/books/{book['id']}", headers={**headers, "If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"})
+    assert result.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_list_books_etag_follows_committed_writes(catalog, client):
+    limiter.reset()
+    user = catalog["user"]
+    token = auth_service.create_access_token({"sub": user["username"], "id": user["id"], "is_admin": False})
+    headers = {"Authorization": f"Bearer {token}"}
+    params = {"title": catalog["prefix"]}
+
+    result = await client.get("/books/", params=params, headers=headers)
+    assert result.status_code == 200
+    etag = result.headers["ETag"]
+
+    result = await client.get("/books/", params=params, headers={**headers, "If-None-Match": etag})
+    assert result.status_code == 304
+
+    await book_service.delete_book(catalog["books"][0]["id"])
+    result = await client.get("/books/", params=params, headers={**headers, "If-None-Match": etag})
+    assert result.status_code == 200
+    assert result.json()["total"] == 4
+
+
+@pytest.mark.asyncio
+async def test_service_calls_share_request_connection(catalog):
+    user_id = catalog["user"]["id"]
+    author_id = catalog["author"]["author_id"]
+
+    async with get_database().get_pool().acquire() as conn:
+        transaction = conn.transaction()
+        await transaction.start()
+
+        try:
+            assert (await book_service.get_user_author(user_id, conn=conn))["id"] == author_id
+            book = await book_service.create_book("Shared Connection", None, 2001, [author_id], user_id, conn=conn)
+            assert await book_service.check_book_creator(book["id"], user_id, conn=conn)
+            assert (await book_service.get_book(book["id"], conn=conn))["title"] == "Shared Connection"
+
+        finally:
+            await transaction.rollback()
+
+    assert await book_service.get_book(book["id"]) is None
+
+
+@pytest.mark.asyncio
+async def test_list_filters_share_bounded_statement_shapes(catalog):
+    registry = get_query_registry()
+    shapes = len(registry.queries)
+
+    for year_from in (None, 2001, 2002, 2003):
+        await list_catalog(catalog, year_from=year_from, genre_id=1 if year_from else None)
+
+    name = "books.list:substring+title:title:asc:page"
+    assert len(registry.queries) <= shapes + 1
+    assert registry.stats()["statements"][name]["executions"] >= 4
+
+
+@pytest.mark.asyncio
+async def test_get_books_keeps_request_order_and_coalesces_lookups(catalog):
+    book_ids = [book["id"] for book in catalog["books"]]
+    books = await book_service.get_books([book_ids[2], 0, book_ids[0]])
+
+    assert list(books) == [book_ids[2], book_ids[0]]
+
+    book_service.book_cache.clear()
+    registry = get_query_registry()
+    batches = registry.executions["books.get_many"]
+
+    found = await asyncio.gather(*(book_service.get_book(book_id) for book_id in book_ids + [0]))
+
+    assert [book["id"] for book in found[:-1]] == book_ids
+    assert found[-1] is None
+    assert registry.executions["books.get_many"] == batches + 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_operations_report_and_apply_changes(catalog):
+    book_ids = [book["id"] for book in catalog["books"]]
+    await book_service.get_books(book_ids)
+
+    owner = await auth_service.create_user(f"{catalog['prefix']}_owner", "Password1")
+    preview = await book_service.bulk_set_created_by(owner["id"], None, catalog["prefix"], None, None, 2002, None, dry_run=True)
+    assert preview == book_ids[2:]
+    assert (await book_service.get_book(book_ids[2]))["created_by"] == catalog["user"]["id"]
+
+    assert await book_service.bulk_set_created_by(owner["id"], None, catalog["prefix"], None, None, 2002, None) == book_ids[2:]
+    assert (await book_service.get_book(book_ids[2]))["created_by"] == owner["id"]
+    assert (await book_service.get_book(book_ids[0]))["created_by"] == catalog["user"]["id"]
+    assert await book_service.bulk_set_created_by(owner["id"], book_ids[2:], None, None, None, None, None) == []
+
+    with pytest.raises(ValueError, match="Genre does not exist"):
+        await book_service.bulk_update_genre(2147483647, book_ids[:2], None, None, None, None, None)
+    assert (await book_service.get_book(book_ids[0]))["genre_id"] is None
+
+    assert await book_service.bulk_delete_books(book_ids[:2], None, None, None, None, None, dry_run=True) == book_ids[:2]
+    assert len(await book_service.get_books(book_ids)) == 5
+
+    assert await book_service.bulk_delete_books(book_ids[:2], catalog["prefix"], None, None, None, None) == book_ids[:2]
+    assert list(await book_service.get_books(book_ids)) == book_ids[2:]
+    assert (await book_service.count_books(catalog["prefix"], None, None, None, None))[0] == 3
+
+    with pytest.raises(ValueError):
+        await book_service.bulk_delete_books(None, None, None, None, None, None)
+
+
+@pytest.mark.asyncio
+async def test_list_author_books_walks_author_books_by_cursor(catalog):
+    author_id = catalog["author"]["author_id"]
+    for sort_by, sort_order in [("year", "desc"), ("title", "asc"), ("id", "asc")]:
+        seen = []
+        cursor = None
+
+        while True:
+            books, cursor = await book_service.list_author_books(author_id, 2, sort_by, sort_order, cursor)
+            seen.extend(book["id"] for book in books)
+            if not cursor:
+                break
+
+        expected = [book["id"] for book in catalog["books"]]
+        assert seen == (expected[::-1] if sort_order == "desc" else expected)
+
+    _, cursor = await book_service.list_author_books(author_id, 2, "year", "asc")
+    with pytest.raises(ValueError):
+        await book_service.list_author_books(author_id, 2, "title", "asc", cursor)
\ No newline at end of file
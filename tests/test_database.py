@@ -0,0 +1,108 @@
+import os
+import uuid
+
+import pytest
+
+from app.database import get_database
+from app.queries import get_query_registry
+from app.services import auth_service, author_service, book_service
+
+
+@pytest.mark.asyncio
+async def test_reads_use_replica_until_session_writes(monkeypatch):
+    db = get_database()
+    await db.disconnect()
+    monkeypatch.setenv("DB_REPLICA_HOSTS", os.environ.get("DB_HOST") or "localhost")
+    await db.connect()
+
+    db.begin_session(424242)
+    read_pool = db.get_read_pool()
+    assert read_pool is not db.get_pool()
+
+    async with read_pool.acquire() as conn:
+        assert await conn.fetchval("SHOW default_transaction_read_only") == "on"
+
+    assert db.get_write_pool() is db.get_pool()
+    assert db.get_read_pool() is db.get_pool()
+
+    db.begin_session(434343)
+    assert db.get_read_pool() is read_pool
+
+
+@pytest.mark.asyncio
+async def test_reads_use_primary_without_replicas():
+    db = get_database()
+    db.begin_session(424242)
+
+    assert db.get_read_pool() is db.get_pool()
+
+
+@pytest.mark.asyncio
+async def test_replica_reads_do_not_fill_caches(monkeypatch):
+    user = await auth_service.create_user(f"{uuid.uuid4().hex[:8]}_replica", "Password1")
+    author = await author_service.create_author("Replica Author", user["id"])
+    book = await book_service.create_book("Replica Book", None, 2001, [author["author_id"]], user["id"])
+
+    db = get_database()
+    await db.disconnect()
+    monkeypatch.setenv("DB_REPLICA_HOSTS", os.environ.get("DB_HOST") or "localhost")
+    await db.connect()
+
+    db.begin_session(454545)
+    book_service.book_cache.clear()
+    author_service.author_cache.clear()
+
+    assert (await book_service.get_book(book["id"]))["title"] == "Replica Book"
+    assert await author_service.select_author(author["author_id"]) is not None
+    assert book_service.book_cache.get(book["id"]) is None
+    assert author_service.author_cache.get(author["author_id"]) is None
+
+    db.mark_write()
+    await book_service.get_book(book["id"])
+    assert book_service.book_cache.get(book["id"]) is not None
+
+
+@pytest.mark.asyncio
+async def test_hot_statements_are_prepared_when_a_connection_opens():
+    registry = get_query_registry()
+    if not registry.prepare_statements:
+        pytest.skip("statement preparation is disabled")
+
+    name = "genres.get"
+    prepares, executions = registry.prepares[name], registry.executions[name]
+
+    db = get_database()
+    await db.disconnect()
+    await db.connect()
+    assert registry.prepares[name] > prepares
+    assert registry.executions[name] == executions
+
+    async with db.acquire() as conn:
+        await registry.fetchrow(conn, name, 0)
+        await registry.fetchrow(conn, name, 0)
+        runs = await conn.fetch("SELECT generic_plans + custom_plans AS runs FROM pg_prepared_statements WHERE statement = $1", registry.queries[name])
+
+    assert [row["runs"] for row in runs] == [2]
+    assert registry.executions[name] == executions + 2
+
+
+@pytest.mark.asyncio
+async def test_author_caches_are_invalidated_after_commit():
+    prefix = uuid.uuid4().hex[:8]
+    user = await auth_service.create_user(f"{prefix}_user", "Password1")
+    author = await author_service.create_author("Before Commit", user["id"])
+    book = await book_service.create_book(f"{prefix} Book", None, 2001, [author["author_id"]], user["id"])
+
+    db = get_database()
+    async with db.acquire(write=True) as conn:
+        async with db.transaction(conn):
+            await author_service.update_author(author["author_id"], "After Commit", conn=conn)
+
+            assert (await author_service.select_author(author["author_id"]))["author_name"] == "Before Commit"
+            assert (await book_service.get_book(book["id"]))["authors"][0]["name"] == "Before Commit"
+
+        assert author_service.author_cache.get(author["author_id"]) is None
+        assert book_service.book_cache.get(book["id"]) is None
+
+    assert (await author_service.select_author(author["author_id"]))["author_name"] == "After Commit"
+    assert (await book_service.get_book(book["id"]))["authors"][0]["name"] == "After Commit"
\ No newline at end of file
@@ -0,0 +1,148 @@
+import io
+import os
+import json
+import uuid
+import asyncio
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+
+from app.database import get_database
+from app.services import auth_service, author_service, book_service, import_service
+
+
+def ndjson(prefix: str, author_id: int, count: int, invalid: tuple = ()) -> io.BytesIO:
+    rows = [
+        {"title": f"{prefix} {i}", "published_year": 2000 + i, "author_ids": [author_id if i not in invalid else -1]}
+        for i in range(count)
+    ]
+    return io.BytesIO("\n".join(json.dumps(row) for row in rows).encode())
+
+
+async def titles(prefix: str) -> list[str]:
+    async with get_database().acquire() as conn:
+        rows = await conn.fetch("SELECT title FROM books WHERE title LIKE $1 ORDER BY published_year", f"{prefix} %")
+    return [row["title"] for row in rows]
+
+
+@pytest_asyncio.fixture
+async def importer():
+    prefix = uuid.uuid4().hex[:8]
+    user = await auth_service.create_user(f"{prefix}_importer", "Password1")
+    author = await author_service.create_author("Import Author", user["id"])
+    return {"prefix": prefix, "user": user, "author_id": author["author_id"]}
+
+
+@pytest.mark.asyncio
+async def test_import_job_runs_to_completion(importer):
+    job = await import_service.create_job(
+        ndjson(importer["prefix"], importer["author_id"], 5, invalid=(3,)), "books.ndjson",
+        author_id=importer["author_id"], user_id=importer["user"]["id"]
+    )
+    assert job["status"] in ("queued", "running")
+    await import_service.tasks[job["id"]]
+
+    job = await import_service.get_job(job["id"])
+    assert job["status"] == "completed"
+    assert (job["rows_done"], job["rows_failed"]) == (4, 1)
+    assert job["bytes_done"] == job["bytes_total"]
+    assert job["errors"][0]["error"] == "Author must be one of the authors of the book"
+    assert job["finished_at"] is not None and job["eta_seconds"] is None
+    assert len(await titles(importer["prefix"])) == 4
+
+
+@pytest.mark.asyncio
+async def test_import_job_cancelled_mid_run(importer, monkeypatch):
+    monkeypatch.setattr(import_service, "batch_size", 2)
+    first_batch_saved = asyncio.Event()
+    save_batch = import_service.save_batch
+
+    async def blocking_save_batch(job, books, errors, bytes_done):
+        if first_batch_saved.is_set():
+            await asyncio.Event().wait()
+
+        saved = await save_batch(job, books, errors, bytes_done)
+        first_batch_saved.set()
+        return saved
+
+    monkeypatch.setattr(import_service, "save_batch", blocking_save_batch)
+
+    job = await import_service.create_job(
+        ndjson(importer["prefix"], importer["author_id"], 6), "books.ndjson",
+        author_id=importer["author_id"], user_id=importer["user"]["id"]
+    )
+    task = import_service.tasks[job["id"]]
+    await asyncio.wait_for(first_batch_saved.wait(), 5)
+
+    running = await import_service.get_job(job["id"])
+    assert running["status"] == "running" and running["rows_done"] == 2
+    assert 0 < running["bytes_done"] <= running["bytes_total"]
+
+    cancelled = await import_service.cancel_job(job["id"])
+    assert cancelled["status"] == "cancelled"
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    job = await import_service.get_job(job["id"])
+    assert job["status"] == "cancelled" and job["rows_done"] == 2
+    assert await titles(importer["prefix"]) == [f"{importer['prefix']} 0", f"{importer['prefix']} 1"]
+
+    async with get_database().acquire() as conn:
+        assert not os.path.exists(await conn.fetchval("SELECT file_path FROM import_jobs WHERE id = $1", job["id"]))
+
+
+@pytest.mark.asyncio
+async def test_stale_running_job_resumes_after_processed_rows(importer, tmp_path):
+    file_path = tmp_path / "books.ndjson"
+    file_path.write_bytes(ndjson(importer["prefix"], importer["author_id"], 5).getvalue())
+
+    async with get_database().acquire() as conn:
+        job_id = await conn.fetchval(
+            """
+            INSERT INTO import_jobs (user_id, author_id, filename, file_path, status, rows_done, rows_failed,
+                                     bytes_total, started_at, heartbeat_at)
+            VALUES ($1, $2, 'books.ndjson', $3, 'running', 2, 1, $4,
+                    CURRENT_TIMESTAMP - interval '1 hour', CURRENT_TIMESTAMP - interval '1 hour')
+            RETURNING id
+            """,
+            importer["user"]["id"], importer["author_id"], str(file_path), file_path.stat().st_size
+        )
+
+    await import_service.resume_jobs()
+    await import_service.tasks[job_id]
+
+    job = await import_service.get_job(job_id)
+    assert job["status"] == "completed"
+    assert (job["rows_done"], job["rows_failed"]) == (4, 1)
+    assert await titles(importer["prefix"]) == [f"{importer['prefix']} 3", f"{importer['prefix']} 4"]
+    assert not file_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_import_job_is_visible_to_owner_and_admin_only(importer, client: AsyncClient):
+    job = await import_service.create_job(
+        ndjson(importer["prefix"], importer["author_id"], 1), "books.ndjson",
+        author_id=importer["author_id"], user_id=importer["user"]["id"]
+    )
+    await import_service.tasks[job["id"]]
+    other = await auth_service.create_user(f"{importer['prefix']}_other", "Password1")
+
+    def headers(user: dict, is_admin: bool = False) -> dict:
+        token = auth_service.create_access_token({"sub": user["username"], "id": user["id"], "is_admin": is_admin})
+        return {"Authorization": f"Bearer {token}"}
+
+    result = await client.get(f"/books/import/{job['id']}", headers=headers(other))
+    assert result.status_code == 404
+
+    result = await client.get(f"/books/import/{job['id']}", headers=headers(importer["user"]))
+    assert result.status_code == 200 and result.json()["status"] == "completed"
+
+    async with get_database().acquire() as conn:
+        await conn.execute("UPDATE users SET is_admin = TRUE WHERE id = $1", other["id"])
+    result = await client.get(f"/books/import/{job['id']}", headers=headers(other, is_admin=True))
+    assert result.status_code == 200
+
+    result = await client.post(f"/books/import/{job['id']}/cancel", headers=headers(importer["user"]))
+    assert result.status_code == 409
\ No newline at end of file
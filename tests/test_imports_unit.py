@@ -0,0 +1,86 @@
+import io
+
+from app.services import import_service
+
+
+def read_rows(content: str, filename: str, chunk_size: int = 7) -> list:
+    default_chunk_size = import_service.read_chunk_size
+    import_service.read_chunk_size = chunk_size
+
+    try:
+        return list(import_service.iter_rows(io.StringIO(content), filename))
+
+    finally:
+        import_service.read_chunk_size = default_chunk_size
+
+
+def test_iter_json_rows_reads_array_in_small_chunks():
+    content = '[{"title": "A", "published_year": 2001, "author_ids": [1]},\n {"title": "B \\u00e9", "published_year": 12345}, 42]'
+    rows = read_rows(content, "books.json")
+
+    assert rows == [
+        {"title": "A", "published_year": 2001, "author_ids": [1]},
+        {"title": "B é", "published_year": 12345},
+        42
+    ]
+
+
+def test_iter_json_rows_reads_ndjson():
+    content = '{"title": "A"}\n{"title": "B"}\n\n{"title": "C"}\n'
+
+    assert [row["title"] for row in read_rows(content, "books.ndjson")] == ["A", "B", "C"]
+
+
+def test_iter_json_rows_reports_broken_file_and_keeps_parsed_rows():
+    rows = read_rows('[{"title": "A"}, {"title": ', "books.json")
+
+    assert rows[0] == {"title": "A"}
+    assert rows[-1]["error"].startswith("Invalid JSON file")
+
+
+def test_iter_json_rows_rejects_oversized_book_without_buffering_the_file():
+    default_max_row_size = import_service.max_row_size
+    import_service.max_row_size = 20
+
+    try:
+        rows = read_rows('[{"title": "A"}, {"title": "' + "x" * 1000 + '"}]', "books.json")
+
+    finally:
+        import_service.max_row_size = default_max_row_size
+
+    assert rows[0] == {"title": "A"}
+    assert rows[1] == {"title": None, "error": "Invalid JSON file: book at character 17 is larger than 20 characters"}
+    assert len(rows) == 2
+
+
+def test_iter_csv_rows_handles_quoted_newlines():
+    content = 'title,genre_id,published_year,author_ids\n"Multi\nline",,2001,[1]\nPlain,2,2002,"[1, 2]"\n'
+    rows = read_rows(content, "books.csv")
+
+    assert [row["title"] for row in rows] == ["Multi\nline", "Plain"]
+
+
+def test_validate_row_collects_errors():
+    assert import_service.validate_row({"title": "A", "published_year": "2001", "genre_id": "", "author_ids": "[1]"}, 1) == (
+        {"title": "A", "genre_id": None, "published_year": 2001, "author_ids": [1]}, None
+    )
+    assert import_service.validate_row({"title": "A", "published_year": 2001, "author_ids": [2]}, 1)[1]["error"] == "Author must be one of the authors of the book"
+    assert import_service.validate_row({"title": "A", "author_ids": [1]}, 1)[1]["error"] == "Title and published_year are required"
+    assert import_service.validate_row({"title": "A", "published_year": 2001, "author_ids": "1,2"}, 1)[1]["error"] == "Invalid author_ids format"
+    assert import_service.validate_row(42, 1)[1]["error"] == "Invalid book format"
+
+
+def test_generate_job_response_reports_progress_and_eta():
+    job = {
+        "id": 1, "user_id": 2, "filename": "books.csv", "status": "running",
+        "rows_done": 80, "rows_failed": 20, "bytes_done": 250, "bytes_total": 1000, "elapsed": 10.0,
+        "errors": None, "error": None, "created_at": None, "started_at": None, "finished_at": None
+    }
+    response = import_service.generate_job_response(job)
+
+    assert response["throughput"] == 10.0
+    assert response["eta_seconds"] == 30.0
+    assert response["errors"] == []
+
+    assert import_service.generate_job_response({**job, "status": "completed"})["eta_seconds"] is None
+    assert import_service.generate_job_response({**job, "elapsed": None})["throughput"] is None
\ No newline at end of file
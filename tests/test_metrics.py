@@ -0,0 +1,30 @@
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from app.database import get_database
+from app.services import auth_service
+
+
+@pytest.mark.asyncio
+async def test_metrics_expose_routes_queries_and_pools(client: AsyncClient):
+    user = await auth_service.create_user(f"{uuid.uuid4().hex[:8]}_metrics", "Password1")
+    token = auth_service.create_access_token({"sub": user["username"], "id": user["id"], "is_admin": False})
+
+    result = await client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+    assert result.status_code == 403
+
+    async with get_database().acquire() as conn:
+        await conn.execute("UPDATE users SET is_admin = TRUE WHERE id = $1", user["id"])
+
+    token = auth_service.create_access_token({"sub": user["username"], "id": user["id"], "is_admin": True})
+    result = await client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+    assert result.status_code == 200
+    assert result.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    body = result.text
+    assert 'http_requests_total{method="GET",route="/metrics",status="403"} 1' in body
+    assert 'db_query_duration_seconds_count{statement="insert:users"}' in body
+    assert 'db_pool_size{pool="primary"}' in body
+    assert "http_requests_in_flight 1" in body
\ No newline at end of file
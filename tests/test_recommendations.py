@@ -0,0 +1,51 @@
+import uuid
+
+import pytest
+import pytest_asyncio
+
+from app.database import get_database
+from app.services import auth_service, author_service, book_service, recommendation_service
+
+
+pytest.importorskip("scipy")
+
+
+@pytest_asyncio.fixture
+async def readers():
+    prefix = uuid.uuid4().hex[:8]
+    users = [await auth_service.create_user(f"{prefix}_reader{i}", "Password1") for i in range(3)]
+    author = await author_service.create_author("Recommended Author", users[0]["id"])
+    books = [
+        await book_service.create_book(f"{prefix} {i}", None, 1990 + i * 10, [author["author_id"]] if i == 3 else [], users[0]["id"])
+        for i in range(4)
+    ]
+    return {"users": users, "books": books, "author": author}
+
+
+async def log_activity(*events: tuple[int, int, str]) -> None:
+    async with get_database().acquire() as conn:
+        await conn.executemany("INSERT INTO user_activity (user_id, book_id, action) VALUES ($1, $2, $3)", events)
+
+
+@pytest.mark.asyncio
+async def test_recommendations_come_from_precomputed_neighbours(readers):
+    first, second, third = [user["id"] for user in readers["users"]]
+    a, b, c, d = [book["id"] for book in readers["books"]]
+
+    await log_activity((first, a, "view"), (first, b, "favorite"), (second, a, "view"), (second, b, "view"), (second, c, "view"))
+    stats = await recommendation_service.rebuild(full=True)
+    assert stats["full"] and stats["neighbours"] > 0
+
+    await log_activity((third, a, "open"))
+    recommendations = await recommendation_service.recommend(third, 10)
+    assert recommendations[0]["book"]["id"] == b
+    assert a not in [item["book"]["id"] for item in recommendations]
+    assert d not in [item["book"]["id"] for item in recommendations]
+
+    await log_activity((third, d, "view"), (first, d, "view"))
+    stats = await recommendation_service.rebuild()
+    assert not stats["full"] and stats["books"] == 3
+
+    recommendations = await recommendation_service.recommend(third, 10)
+    assert {item["book"]["id"] for item in recommendations} == {b, c}
+    assert (await recommendation_service.rebuild())["books"] == 0
\ No newline at end of file
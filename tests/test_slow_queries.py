@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from app.database import get_database
+from app.services import book_service
+from app.slow_queries import get_slow_query_log
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_capture_shape_params_and_plan():
+    log = get_slow_query_log()
+    threshold, sample_rate = log.threshold, log.sample_rate
+    log.clear()
+    log.threshold, log.sample_rate = 0.0, 1.0
+
+    try:
+        await book_service.list_books(
+            page=1, limit=5, sort_by="id", sort_order="asc", title="slowlog",
+            author_name=None, genre_id=None, year_from=None, year_to=None
+        )
+        async with get_database().acquire() as conn:
+            await conn.execute("UPDATE users SET is_admin = is_admin WHERE username = $1", "slowlog")
+
+        for _ in range(50):
+            if not log.explaining:
+                break
+            await asyncio.sleep(0.05)
+
+        stats = log.stats()
+
+    finally:
+        log.threshold, log.sample_rate = threshold, sample_rate
+
+    entries = [entry for entry in stats["entries"] if entry["statement"].startswith("books.list:substring+title:id:asc")]
+    assert entries
+    assert "'%slowlog%'" in entries[-1]["params"]
+    assert "actual time" in entries[-1]["plan"] and "Execution Time" in entries[-1]["plan"]
+
+    update = next(entry for entry in stats["entries"] if entry["statement"] == "update:users")
+    assert update["params"] is None and update["plan"] is None
+    assert any(shape["statement"] == "update:users" for shape in stats["shapes"])
\ No newline at end of file
@@ -0,0 +1,134 @@
+import time
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+from starlette.requests import Request
+
+from app.utils import LRUCache, BoundedExecutor, ExecutorFull, DataLoader, Histogram, encode_cursor, decode_cursor, make_etag, is_not_modified, cache_headers
+
+
+def test_cursor_round_trip():
+    data = {"sort_by": "title", "order": "ASC", "key": "Dune", "id": 42}
+
+    assert decode_cursor(encode_cursor(data)) == data
+
+    with pytest.raises(ValueError):
+        decode_cursor("%%%")
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_expires_entries():
+    cache = LRUCache(maxsize=2, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_cache_skips_stale_writes_after_invalidation():
+    cache = LRUCache()
+    generation = cache.generation
+    cache.delete_where(lambda value: value == 1)
+    cache.set("a", 1, generation=generation)
+
+    assert cache.get("a") is None
+
+
+def make_request(headers: dict) -> Request:
+    return Request({"type": "http", "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()]})
+
+
+def test_etag_matches_if_none_match():
+    etag = make_etag({"id": 1, "updated_at": datetime(2024, 5, 1, 12, 0, 0)})
+
+    assert etag == make_etag({"updated_at": datetime(2024, 5, 1, 12, 0, 0), "id": 1})
+    assert is_not_modified(make_request({"If-None-Match": f'"other", W/{etag}'}), etag)
+    assert not is_not_modified(make_request({"If-None-Match": '"other"'}), etag)
+    assert not is_not_modified(make_request({}), etag)
+
+
+def test_if_modified_since_uses_second_precision():
+    last_modified = datetime(2024, 5, 1, 12, 0, 0, 500000)
+    header = cache_headers('"x"', last_modified)["Last-Modified"]
+
+    assert header == "Wed, 01 May 2024 12:00:00 GMT"
+    assert is_not_modified(make_request({"If-Modified-Since": header}), '"x"', last_modified)
+    assert not is_not_modified(make_request({"If-Modified-Since": "Wed, 01 May 2024 11:59:59 GMT"}), '"x"', last_modified)
+    assert not is_not_modified(make_request({"If-Modified-Since": "garbage"}), '"x"', last_modified)
+    assert not is_not_modified(make_request({"If-None-Match": '"y"', "If-Modified-Since": header}), '"x"', last_modified)
+
+
+@pytest.mark.asyncio
+async def test_bounded_executor_rejects_when_queue_is_full():
+    executor = BoundedExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    running = asyncio.ensure_future(executor.run(release.wait))
+    queued = asyncio.ensure_future(executor.run(lambda: "done"))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(ExecutorFull):
+        await executor.run(lambda: "rejected")
+
+    assert executor.stats()["running"] == 1
+    assert executor.stats()["queued"] == 1
+
+    release.set()
+    assert await running is True
+    assert await queued == "done"
+    assert executor.stats()["completed"] == 2
+    assert executor.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_data_loader_coalesces_concurrent_loads():
+    batches = []
+
+    async def batch_fn(keys):
+        batches.append(keys)
+        return {key: key * 10 for key in keys if key != 3}
+
+    loader = DataLoader(batch_fn, max_batch_size=3)
+    results = await asyncio.gather(*(loader.load(key) for key in [1, 2, 1, 3, 4]))
+
+    assert results == [10, 20, 10, None, 40]
+    assert batches == [[1, 2, 3], [4]]
+    assert await loader.load(5) == 50
+
+
+@pytest.mark.asyncio
+async def test_data_loader_batches_per_group():
+    batches = []
+
+    async def batch_fn(keys, group):
+        batches.append((group, keys))
+        return {key: f"{group}:{key}" for key in keys}
+
+    loader = DataLoader(batch_fn)
+    results = await asyncio.gather(loader.load(1, "primary"), loader.load(2, "replica"), loader.load(3, "primary"))
+
+    assert results == ["primary:1", "replica:2", "primary:3"]
+    assert sorted(batches) == [("primary", [1, 3]), ("replica", [2])]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.count == 4 and histogram.sum == pytest.approx(2.65)
\ No newline at end of file